@@ -1,140 +1,326 @@
 import os
 from datetime import datetime, timezone
-from flask import Flask, request, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
-from flask_cors import CORS
-from flask_mail import Mail
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# Configuration
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///placement_portal.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_pre_ping': True,
-    'pool_recycle': 3600,
-}
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-string-change-in-production')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 86400  # 24 hours
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
-app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
-app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
-app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
-app.config['OPENAI_API_KEY'] = os.getenv('OPENAI_API_KEY')
-
-# Import models and routes first to get the db instance
-from models import db
-from models import User, StudentProfile, HodProfile, Department, EmailTemplate, EmailLog, Company, StudentApplication, PlacementDrive, RoundResult, OfferLetter, RecruitmentRound
-
-# Initialize the database with the app
-db.init_app(app)
-
-# Initialize extensions
-jwt = JWTManager(app)
-cors = CORS(app, origins=["http://localhost:3000", "http://localhost:3001"])
-mail = Mail(app)
-
-# Create upload directory
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'resumes'), exist_ok=True)
-os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'offer_letters'), exist_ok=True)
-os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'reports'), exist_ok=True)
-os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'company_logos'), exist_ok=True)
-os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'profile_images'), exist_ok=True)
-from routes.auth_routes import auth_bp
-from routes.student_routes import student_bp
-from routes.hod_routes import hod_bp
-from routes.tpo_routes import tpo_bp
-from routes.company_routes import company_bp
-from routes.drive_routes import drive_bp
-from routes.dashboard_routes import dashboard_bp
-from routes.ai_routes import ai_routes_bp
-from services.email_service import email_service
-from services.ai_service import ai_service
-from services.file_service import file_service
-from services.report_service import report_service
-
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(student_bp, url_prefix='/api/student')
-app.register_blueprint(hod_bp, url_prefix='/api/hod')
-app.register_blueprint(tpo_bp, url_prefix='/api/tpo')
-app.register_blueprint(company_bp, url_prefix='/api/companies')
-app.register_blueprint(drive_bp, url_prefix='/api/drives')
-app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
-app.register_blueprint(ai_routes_bp, url_prefix='/api/ai')
-
-# Initialize services
-email_service.init_app(app)
-ai_service.init_app(app)
-file_service.init_app(app)
-report_service.init_app(app)
-
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now(timezone.utc).isoformat(),
-        'version': '1.0.0'
-    })
-
-@app.route('/api/docs', methods=['GET'])
-def api_docs():
-    """API documentation endpoint"""
-    return jsonify({
-        'message': 'Placement Management Portal API',
-        'version': '1.0.0',
-        'endpoints': {
-            'Authentication': {
-                'POST /api/auth/register': 'User registration',
-                'POST /api/auth/login': 'User login',
-                'POST /api/auth/logout': 'User logout',
-                'GET /api/auth/profile': 'Get user profile'
-            },
-            'Student': {
-                'GET /api/student/profile': 'Get student profile',
-                'PUT /api/student/profile': 'Update student profile',
-                'POST /api/student/upload-resume': 'Upload resume',
-                'GET /api/student/applications': 'Get student applications',
-                'POST /api/student/apply-drive': 'Apply to drive'
-            },
-            'HOD': {
-                'GET /api/hod/students': 'Get department students',
-                'PUT /api/hod/approve-student': 'Approve student',
-                'GET /api/hod/analytics': 'Get department analytics',
-                'GET /api/hod/reports': 'Generate reports'
-            },
-            'TPO': {
-                'GET /api/tpo/drives': 'Get all drives',
-                'POST /api/tpo/drives': 'Create new drive',
-                'PUT /api/tpo/drives/<id>': 'Update drive',
-                'GET /api/tpo/companies': 'Get companies',
-                'POST /api/tpo/companies': 'Add company'
+from flask import Flask, jsonify
+
+
+def load_config():
+    """Build the default configuration from environment variables"""
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv()
+
+    return {
+        'SECRET_KEY': os.getenv('SECRET_KEY', 'your-secret-key-change-in-production'),
+        'SQLALCHEMY_DATABASE_URI': os.getenv('DATABASE_URL', 'sqlite:///placement_portal.db'),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SQLALCHEMY_ENGINE_OPTIONS': {
+            'pool_pre_ping': True,
+            'pool_recycle': 3600,
+        },
+        'JWT_SECRET_KEY': os.getenv('JWT_SECRET_KEY', 'jwt-secret-string-change-in-production'),
+        'JWT_ACCESS_TOKEN_EXPIRES': 86400,  # 24 hours
+        'MAX_CONTENT_LENGTH': 16 * 1024 * 1024,  # 16MB max file size
+        'UPLOAD_FOLDER': 'uploads',
+        'MAIL_SERVER': os.getenv('MAIL_SERVER', 'smtp.gmail.com'),
+        'MAIL_PORT': int(os.getenv('MAIL_PORT', 587)),
+        'MAIL_USERNAME': os.getenv('MAIL_USERNAME'),
+        'MAIL_PASSWORD': os.getenv('MAIL_PASSWORD'),
+        'MAIL_USE_TLS': os.getenv('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1'],
+        'OPENAI_API_KEY': os.getenv('OPENAI_API_KEY'),
+        'OPENAI_BASE_URL': os.getenv('OPENAI_BASE_URL'),
+        'OPENAI_MODEL': os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo'),
+        'CORS_ORIGINS': ["http://localhost:3000", "http://localhost:3001"],
+        'COMPRESS_MIN_SIZE': int(os.getenv('COMPRESS_MIN_SIZE', 1024)),
+        'REDIS_URL': os.getenv('REDIS_URL'),
+        'CACHE_DEFAULT_TTL': int(os.getenv('CACHE_DEFAULT_TTL', 300)),
+        'AI_CACHE_TTL': int(os.getenv('AI_CACHE_TTL', 6 * 3600)),
+        'RESUME_EXTRACTION_WORKERS': int(os.getenv('RESUME_EXTRACTION_WORKERS', 2)),
+        'RESUME_EXTRACTION_TIMEOUT': float(os.getenv('RESUME_EXTRACTION_TIMEOUT', 20)),
+        'RESUME_TEXT_MAX_CHARS': int(os.getenv('RESUME_TEXT_MAX_CHARS', 20000)),
+        'RESUME_MAX_PAGES': int(os.getenv('RESUME_MAX_PAGES', 10)),
+        'PDF_BACKEND': os.getenv('PDF_BACKEND', 'auto'),
+        'SKILL_TAXONOMY_PATH': os.getenv('SKILL_TAXONOMY_PATH'),
+        'RESUME_IMPORT_MAX_SIZE': int(os.getenv('RESUME_IMPORT_MAX_SIZE', 256 * 1024 * 1024)),
+        'RESUME_IMPORT_WORKERS': int(os.getenv('RESUME_IMPORT_WORKERS', 4)),
+        'RESUME_IMPORT_MAX_FILES': int(os.getenv('RESUME_IMPORT_MAX_FILES', 2000)),
+        'ROUND_RESULTS_MAX_ROWS': int(os.getenv('ROUND_RESULTS_MAX_ROWS', 20000)),
+        'APPLICATION_TRANSITION_MAX_BATCH': int(os.getenv('APPLICATION_TRANSITION_MAX_BATCH', 20000)),
+        'SEMANTIC_HASH_BITS': int(os.getenv('SEMANTIC_HASH_BITS', 18)),
+        'SEMANTIC_MAX_TERMS': int(os.getenv('SEMANTIC_MAX_TERMS', 256)),
+        'SEMANTIC_REFRESH_INTERVAL': int(os.getenv('SEMANTIC_REFRESH_INTERVAL', 60)),
+        'SEMANTIC_WARM_UP': os.getenv('SEMANTIC_WARM_UP', 'false').lower() in ['true', 'on', '1'],
+        'AUTOCOMPLETE_REFRESH_INTERVAL': int(os.getenv('AUTOCOMPLETE_REFRESH_INTERVAL', 300)),
+        'AUTOCOMPLETE_MIN_COUNT': int(os.getenv('AUTOCOMPLETE_MIN_COUNT', 2)),
+        'COALESCE_WAIT_TIMEOUT': float(os.getenv('COALESCE_WAIT_TIMEOUT', 10)),
+        'SEARCH_TITLE_WEIGHT': float(os.getenv('SEARCH_TITLE_WEIGHT', 5)),
+        'SEARCH_INDEX_DELAY': float(os.getenv('SEARCH_INDEX_DELAY', 1)),
+        'SEARCH_RESUME_MAX_CHARS': int(os.getenv('SEARCH_RESUME_MAX_CHARS', 20000)),
+        'RECOMMENDATION_CACHE_TTL': int(os.getenv('RECOMMENDATION_CACHE_TTL', 24 * 3600)),
+        'RECOMMENDATION_STATS_TTL': int(os.getenv('RECOMMENDATION_STATS_TTL', 3600)),
+        'PLACEMENT_MODEL_PATH': os.getenv('PLACEMENT_MODEL_PATH'),
+        'PLACEMENT_MODEL_RETRAIN_INTERVAL': int(os.getenv('PLACEMENT_MODEL_RETRAIN_INTERVAL', 6 * 3600)),
+        'PLACEMENT_TARGET_RATE': float(os.getenv('PLACEMENT_TARGET_RATE', 0.8)),
+        'LLM_DEADLINE': float(os.getenv('LLM_DEADLINE', 30)),
+        'LLM_ATTEMPT_TIMEOUT': float(os.getenv('LLM_ATTEMPT_TIMEOUT', 20)),
+        'LLM_MAX_CONCURRENCY': int(os.getenv('LLM_MAX_CONCURRENCY', 4)),
+        'LLM_QUEUE_TIMEOUT': float(os.getenv('LLM_QUEUE_TIMEOUT', 0.5)),
+        'LLM_MAX_RETRIES': int(os.getenv('LLM_MAX_RETRIES', 2)),
+        'LLM_BREAKER_ERROR_RATE': float(os.getenv('LLM_BREAKER_ERROR_RATE', 0.5)),
+        'LLM_BREAKER_COOLDOWN': float(os.getenv('LLM_BREAKER_COOLDOWN', 30)),
+        'AI_USAGE_FLUSH_INTERVAL': float(os.getenv('AI_USAGE_FLUSH_INTERVAL', 10)),
+        'AI_DAILY_TOKEN_BUDGET': int(os.getenv('AI_DAILY_TOKEN_BUDGET', 0)),
+        'AI_USER_DAILY_TOKEN_BUDGET': int(os.getenv('AI_USER_DAILY_TOKEN_BUDGET', 0)),
+        'AI_ENDPOINT_TOKEN_BUDGETS': os.getenv('AI_ENDPOINT_TOKEN_BUDGETS', ''),
+        'AI_PROMPT_DATA_TOKENS': int(os.getenv('AI_PROMPT_DATA_TOKENS', 1200)),
+        'SCORING_CHECKPOINT_PATH': os.getenv('SCORING_CHECKPOINT_PATH'),
+        'SCORING_BATCH_SIZE': int(os.getenv('SCORING_BATCH_SIZE', 500)),
+        'SCORING_INCREMENTAL': os.getenv('SCORING_INCREMENTAL', 'true').lower() in ['true', 'on', '1'],
+        'SCORING_INCREMENTAL_DELAY': float(os.getenv('SCORING_INCREMENTAL_DELAY', 2)),
+        'SCORING_INCREMENTAL_MODE': os.getenv('SCORING_INCREMENTAL_MODE', 'auto'),
+        'SCHEMA_AUTO_UPGRADE': os.getenv('SCHEMA_AUTO_UPGRADE', 'true').lower() in ['true', 'on', '1'],
+    }
+
+
+def create_app(config=None):
+    """Application factory.
+
+    ``config`` may be a dict or a config object; its values override the
+    defaults loaded from the environment. Heavy optional dependencies
+    (openai, PyPDF2, pdfminer, reportlab, xlsxwriter) are not imported here,
+    the services load them the first time they are needed.
+    """
+    from utils.uploads import UploadLimitRequest
+
+    app = Flask(__name__)
+    # Lets bulk upload endpoints raise MAX_CONTENT_LENGTH for themselves
+    app.request_class = UploadLimitRequest
+
+    # Configuration
+    app.config.update(load_config())
+    if config is not None:
+        if isinstance(config, dict):
+            app.config.update(config)
+        else:
+            app.config.from_object(config)
+
+    # Serialize responses with orjson when available
+    from utils.json_provider import init_json_provider
+    init_json_provider(app)
+
+    # Initialize the database with the app
+    from models import db
+    db.init_app(app)
+    if app.config.get('SCHEMA_AUTO_UPGRADE'):
+        upgrade_database(app)
+
+    # Initialize extensions
+    from flask_jwt_extended import JWTManager
+    from flask_cors import CORS
+    JWTManager(app)
+    CORS(app, origins=app.config['CORS_ORIGINS'])
+
+    # Conditional GET validators and response compression
+    from utils.http_cache import init_compression
+    init_compression(app)
+
+    register_blueprints(app)
+    register_services(app)
+    register_core_routes(app)
+
+    return app
+
+
+def upgrade_database(app):
+    """Add columns that ``create_all()`` cannot add to existing tables"""
+    from models import db
+    from utils.schema_upgrade import upgrade_schema
+
+    with app.app_context():
+        try:
+            added = upgrade_schema(db.engine)
+        except Exception as e:
+            print(f"Schema upgrade skipped: {str(e)}")
+            return
+    if added:
+        print(f"Schema upgraded: added {', '.join(added)}")
+
+
+def register_blueprints(app):
+    """Register the API blueprints"""
+    from routes.auth_routes import auth_bp
+    from routes.student_routes import student_bp
+    from routes.hod_routes import hod_bp
+    from routes.tpo_routes import tpo_bp
+    from routes.company_routes import company_bp
+    from routes.drive_routes import drive_bp
+    from routes.dashboard_routes import dashboard_bp
+    from routes.ai_routes import ai_routes_bp
+    from routes.skill_routes import skill_bp
+    from routes.search_routes import search_bp
+
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(student_bp, url_prefix='/api/student')
+    app.register_blueprint(hod_bp, url_prefix='/api/hod')
+    app.register_blueprint(tpo_bp, url_prefix='/api/tpo')
+    app.register_blueprint(company_bp, url_prefix='/api/companies')
+    app.register_blueprint(drive_bp, url_prefix='/api/drives')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    app.register_blueprint(ai_routes_bp, url_prefix='/api/ai')
+    app.register_blueprint(skill_bp, url_prefix='/api/skills')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+
+
+def register_services(app):
+    """Bind the shared service instances to the app.
+
+    ``init_app`` only records configuration; clients, upload directories and
+    optional libraries are set up lazily on first use.
+    """
+    from services.email_service import email_service
+    from services.llm_gateway import llm_gateway
+    from services.ai_usage import ai_usage
+    from services.prompt_builder import prompt_builder
+    from services.ai_service import ai_service
+    from services.scoring_service import scoring_service
+    from services.file_service import file_service
+    from services.report_service import report_service
+    from services.change_feed import change_feed
+    from services.cache_service import cache_service
+    from services.resume_extraction import resume_extraction_service
+    from services.skill_extractor import skill_extractor
+    from services.skill_autocomplete import skill_autocomplete
+    from services.resume_import import resume_import_service
+    from services.semantic_matcher import semantic_matcher
+    from services.search_service import search_service
+    from services.student_search import student_search
+    from services.recommendation_service import recommendation_service
+    from services.placement_model import placement_predictor
+    from services.application_status import application_status
+    from services.round_results import round_result_importer
+
+    change_feed.init_app(app)
+    cache_service.init_app(app)
+    resume_extraction_service.init_app(app)
+    skill_extractor.init_app(app)
+    skill_autocomplete.init_app(app)
+    resume_import_service.init_app(app)
+    semantic_matcher.init_app(app)
+    search_service.init_app(app)
+    student_search.init_app(app)
+    recommendation_service.init_app(app)
+    placement_predictor.init_app(app)
+    email_service.init_app(app)
+    llm_gateway.init_app(app)
+    ai_usage.init_app(app)
+    prompt_builder.init_app(app)
+    ai_service.init_app(app)
+    scoring_service.init_app(app)
+    file_service.init_app(app)
+    report_service.init_app(app)
+    application_status.init_app(app)
+    round_result_importer.init_app(app)
+
+
+def register_core_routes(app):
+    """Register health, docs and error handlers"""
+    from flask_jwt_extended import get_jwt_identity, jwt_required
+    from models import db
+
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        """Health check endpoint"""
+        return jsonify({
+            'status': 'healthy',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'version': '1.0.0'
+        })
+
+    @app.route('/api/metrics', methods=['GET'])
+    @jwt_required()
+    def metrics_snapshot():
+        """Per-worker counters (single-flight savings, cache hit rate, LLM gateway; TPO only)"""
+        from models import User
+        from services.metrics import metrics
+        from services.cache_service import cache_service
+        from services.llm_gateway import llm_gateway
+
+        user = db.session.get(User, get_jwt_identity())
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+
+        return jsonify({
+            'counters': metrics.snapshot(),
+            'cache': cache_service.get_stats(),
+            'llm': llm_gateway.snapshot()
+        })
+
+    @app.route('/api/docs', methods=['GET'])
+    def api_docs():
+        """API documentation endpoint"""
+        return jsonify({
+            'message': 'Placement Management Portal API',
+            'version': '1.0.0',
+            'endpoints': {
+                'Authentication': {
+                    'POST /api/auth/register': 'User registration',
+                    'POST /api/auth/login': 'User login',
+                    'POST /api/auth/logout': 'User logout',
+                    'GET /api/auth/profile': 'Get user profile'
+                },
+                'Student': {
+                    'GET /api/student/profile': 'Get student profile',
+                    'PUT /api/student/profile': 'Update student profile',
+                    'POST /api/student/upload-resume': 'Upload resume',
+                    'GET /api/student/applications': 'Get student applications',
+                    'POST /api/student/apply-drive': 'Apply to drive'
+                },
+                'HOD': {
+                    'GET /api/hod/students': 'Get department students',
+                    'PUT /api/hod/approve-student': 'Approve student',
+                    'GET /api/hod/analytics': 'Get department analytics',
+                    'GET /api/hod/reports': 'Generate reports'
+                },
+                'TPO': {
+                    'GET /api/tpo/drives': 'Get all drives',
+                    'POST /api/tpo/drives': 'Create new drive',
+                    'PUT /api/tpo/drives/<id>': 'Update drive',
+                    'GET /api/tpo/companies': 'Get companies',
+                    'POST /api/tpo/companies': 'Add company'
+                }
             }
-        }
-    })
+        })
+
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({'error': 'Endpoint not found'}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        db.session.rollback()
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+_default_app = None
+
+
+def __getattr__(name):
+    """Build the default ``app`` on first access.
 
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    Keeps ``from app import app`` and ``gunicorn app:app`` working without
+    constructing an application merely by importing this module.
+    """
+    global _default_app
+    if name == 'app':
+        if _default_app is None:
+            _default_app = create_app()
+        return _default_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-@app.errorhandler(500)
-def internal_error(error):
-    db.session.rollback()
-    return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
+        from models import db
         db.create_all()
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
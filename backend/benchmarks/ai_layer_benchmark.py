@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+AI layer benchmark against the local OpenAI stand-in.
+
+Runs a mix of AIService calls (job fit, email template, company insights,
+drive analysis) from concurrent threads in three scenarios:
+
+* ``uncached`` — every prompt is distinct, so every call reaches the API;
+* ``cached`` — a few distinct prompts repeated, served by the AI cache;
+* ``faulty`` — the mock fails a share of requests, exercising retries, the
+  circuit breaker and the ``_get_fallback_*`` paths.
+
+Reports throughput, latency percentiles, how many results came from the
+model versus fallbacks, API requests made and LLM gateway counters.
+
+Usage:
+    python benchmarks/ai_layer_benchmark.py [--requests 200] [--concurrency 8] [--latency-ms 200]
+        [--error-rate 0.3] [--max-concurrency 4]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_openai_server import MockOpenAIServer
+
+SKILLS = ['python', 'java', 'sql', 'react', 'docker', 'aws', 'machine learning', 'c++']
+
+
+def workload(ai_service, i, distinct):
+    """One AI call; ``distinct`` controls how many different prompts exist"""
+    key = i % distinct
+    kind = i % 4
+    if kind == 0:
+        result = ai_service.calculate_job_fit_score(SKILLS[:3 + key % 4], SKILLS[2:6], 7.0 + key % 30 / 10, 6.5)
+        return result.get('is_ai_generated')
+    if kind == 1:
+        result = ai_service.generate_email_template('shortlisted', {'student_name': f'Student {key}',
+                                                                    'company_name': f'Company {key}'})
+        return result.get('is_ai_generated')
+    if kind == 2:
+        result = ai_service.generate_company_insights({'id': key, 'name': f'Company {key}', 'drives': key % 7})
+        return result.get('is_ai_generated')
+    result = ai_service.analyze_drive_performance({'id': key, 'title': f'Drive {key}', 'applications': key * 3})
+    return result.get('is_ai_generated')
+
+
+def run_scenario(name, server, args, cache_ttl, distinct, error_rate):
+    from app import create_app
+    from models import db
+    from services.ai_service import ai_service
+    from services.cache_service import cache_service
+    from services.llm_gateway import llm_gateway
+    from services.metrics import metrics
+
+    tmp = tempfile.mkdtemp()
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp}/bench.db',
+        'TESTING': True,
+        'OPENAI_API_KEY': 'mock',
+        'OPENAI_BASE_URL': server.base_url,
+        'AI_CACHE_TTL': cache_ttl,
+        'LLM_MAX_CONCURRENCY': args.max_concurrency,
+        'LLM_QUEUE_TIMEOUT': args.queue_timeout,
+        'LLM_DEADLINE': args.deadline,
+        'LLM_BACKOFF_BASE': 0.05,
+        'LLM_BREAKER_COOLDOWN': 2.0
+    })
+    with app.app_context():
+        # ai_usage persists its counters; give it its table
+        db.create_all()
+    metrics.reset()
+    server.error_rate = error_rate
+    requests_before = server.stats['requests']
+    cache_before = dict(cache_service.get_stats())
+
+    latencies = []
+    outcomes = {'ai': 0, 'fallback': 0, 'error': 0}
+    lock = threading.Lock()
+
+    def one(i):
+        started = time.perf_counter()
+        with app.app_context():
+            try:
+                outcome = 'ai' if workload(ai_service, i, distinct) else 'fallback'
+            except Exception:
+                outcome = 'error'
+        with lock:
+            latencies.append(time.perf_counter() - started)
+            outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    counters = metrics.snapshot()
+    print(f"{name:9s} {args.requests / elapsed:7.1f} req/s  p50 {statistics.median(latencies) * 1000:7.1f}ms  "
+          f"p95 {p95 * 1000:7.1f}ms  ai {outcomes['ai']:4d}  fallback {outcomes['fallback']:4d}  "
+          f"error {outcomes['error']:3d}  api calls {server.stats['requests'] - requests_before:4d}")
+    cache_after = cache_service.get_stats()
+    hits, misses = (cache_after[k] - cache_before[k] for k in ('hits', 'misses'))
+    gateway = {k: v for k, v in counters.items() if k.startswith('llm.')}
+    print(f"          cache hits {hits} misses {misses}  gateway {gateway}  breaker {llm_gateway.snapshot()['state']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure AI layer throughput, caching and fallbacks')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=200.0)
+    parser.add_argument('--jitter-ms', type=float, default=30.0)
+    parser.add_argument('--error-rate', type=float, default=0.3)
+    parser.add_argument('--max-concurrency', type=int, default=4)
+    parser.add_argument('--queue-timeout', type=float, default=5.0)
+    parser.add_argument('--deadline', type=float, default=10.0)
+    parser.add_argument('--distinct', type=int, default=8, help='distinct prompts in the cached scenario')
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=42)
+    server.start()
+    print(f"Mock API {server.base_url}, latency {args.latency_ms:.0f}ms, "
+          f"{args.concurrency} client threads, {args.max_concurrency} LLM slots")
+    try:
+        run_scenario('uncached', server, args, cache_ttl=0, distinct=args.requests, error_rate=0.0)
+        run_scenario('cached', server, args, cache_ttl=3600, distinct=args.distinct, error_rate=0.0)
+        run_scenario('faulty', server, args, cache_ttl=0, distinct=args.requests, error_rate=args.error_rate)
+    finally:
+        server.stop()
+    print(f"Fixtures served: {server.stats['fixtures']}")
+
+
+if __name__ == '__main__':
+    main()
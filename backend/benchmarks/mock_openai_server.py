@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers ``POST /v1/chat/completions`` (plain and ``stream: true``) and
+``GET /v1/models`` with canned responses from a fixtures file, so the AI
+layer can be benchmarked without network access or an API key. A fixture
+is picked by matching text in the system and user messages. Its content
+is a string or a JSON value, with ``{{model}}`` and ``{{n}}`` (request
+number) substituted. Fixtures marked ``"skeleton": true`` answer with the
+JSON structure embedded in the prompt, with placeholders such as
+``0-100`` or ``number`` filled in.
+
+Latency, error rate and reported token counts are configurable. Point the
+backend at the server with::
+
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+
+Usage:
+    python benchmarks/mock_openai_server.py [--port 8765] [--latency-ms 300] [--jitter-ms 50]
+        [--ms-per-token 0] [--error-rate 0.0] [--error-status 503] [--fixtures PATH]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures',
+                                'mock_openai_responses.json')
+
+_PLACEHOLDERS = re.compile(r':\s*(\d+-\d+|number|percentage)(?=\s*[,}\n])')
+_ELLIPSIS = re.compile(r',\s*\.\.\.')
+
+
+def fill_skeleton(prompt):
+    """The response format embedded in ``prompt``, with placeholder values filled in.
+
+    Prompts show their input data first and the expected JSON last, so the
+    last top-level object that parses wins.
+    """
+    blocks = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(prompt):
+        if char == '{':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                blocks.append(prompt[start:i + 1])
+    for block in reversed(blocks):
+        try:
+            return json.loads(_ELLIPSIS.sub('', _PLACEHOLDERS.sub(': 75', block)))
+        except ValueError:
+            continue
+    return None
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class MockOpenAIServer:
+    """Threaded mock server; also usable in-process from benchmarks"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=300.0, jitter_ms=50.0, ms_per_token=0.0,
+                 error_rate=0.0, error_status=503, completion_tokens=None, fixtures=DEFAULT_FIXTURES, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_token = ms_per_token
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.completion_tokens = completion_tokens
+        with open(fixtures, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        self.fixtures = data.get('responses', [])
+        self.default = data.get('default', '')
+        self.stats = {'requests': 0, 'errors': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'fixtures': {}}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='mock-openai', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # --- Responses ------------------------------------------------------------
+
+    def respond(self, body):
+        """(status, payload, headers) for a chat completion request"""
+        with self._lock:
+            self.stats['requests'] += 1
+            n = self.stats['requests']
+            failed = self._random.random() < self.error_rate
+            delay = max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms)) / 1000.0
+
+        if failed:
+            with self._lock:
+                self.stats['errors'] += 1
+            time.sleep(delay)
+            headers = {'Retry-After': '1'} if self.error_status == 429 else {}
+            return self.error_status, {'error': {'message': 'Injected failure', 'type': 'server_error',
+                                                 'code': self.error_status}}, headers
+
+        model = body.get('model', 'mock-model')
+        messages = body.get('messages', [])
+        text = '\n'.join(str(message.get('content', '')) for message in messages)
+        name, content = self._content(text, model, n)
+        prompt_tokens = sum(estimate_tokens(str(message.get('content', ''))) + 4 for message in messages)
+        completion_tokens = self.completion_tokens or estimate_tokens(content)
+
+        time.sleep(delay + completion_tokens * self.ms_per_token / 1000.0)
+        with self._lock:
+            self.stats['prompt_tokens'] += prompt_tokens
+            self.stats['completion_tokens'] += completion_tokens
+            self.stats['fixtures'][name] = self.stats['fixtures'].get(name, 0) + 1
+
+        max_tokens = body.get('max_tokens')
+        return 200, {
+            'id': f'chatcmpl-mock-{n}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'length' if max_tokens and completion_tokens > max_tokens else 'stop'
+            }],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens}
+        }, {}
+
+    def _content(self, text, model, n):
+        lowered = text.lower()
+        for fixture in self.fixtures:
+            patterns = fixture.get('match', [])
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            if not any(pattern.lower() in lowered for pattern in patterns):
+                continue
+            if fixture.get('skeleton'):
+                filled = fill_skeleton(text)
+                if filled is None:
+                    continue
+                return fixture['name'], json.dumps(filled)
+            content = fixture.get('content', '')
+            if not isinstance(content, str):
+                content = json.dumps(content)
+            return fixture['name'], content.replace('{{model}}', model).replace('{{n}}', str(n))
+        return 'default', self.default.replace('{{model}}', model).replace('{{n}}', str(n))
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip('/').endswith('/models'):
+                    self._json(200, {'object': 'list', 'data': [{'id': 'mock-model', 'object': 'model'}]})
+                else:
+                    self._json(404, {'error': {'message': 'Not found'}})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    return self._json(400, {'error': {'message': 'Invalid JSON body'}})
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    return self._json(404, {'error': {'message': 'Not found'}})
+
+                status, payload, headers = server.respond(body)
+                if status == 200 and body.get('stream'):
+                    return self._stream(payload)
+                self._json(status, payload, headers)
+
+            def _json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, payload):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                content = payload['choices'][0]['message']['content']
+                chunks = re.findall(r'\S+\s*|\s+', content) or ['']
+                for i, piece in enumerate(chunks):
+                    event = {
+                        'id': payload['id'], 'object': 'chat.completion.chunk', 'created': payload['created'],
+                        'model': payload['model'],
+                        'choices': [{'index': 0, 'delta': ({'role': 'assistant'} if i == 0 else {}) | {'content': piece},
+                                     'finish_reason': None}]
+                    }
+                    self.wfile.write(f'data: {json.dumps(event)}\n\n'.encode('utf-8'))
+                done = dict(event, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+                self.wfile.write(f'data: {json.dumps(done)}\n\ndata: [DONE]\n\n'.encode('utf-8'))
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve canned OpenAI chat completions locally')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--jitter-ms', type=float, default=50.0)
+    parser.add_argument('--ms-per-token', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--completion-tokens', type=int, default=None)
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.ms_per_token,
+                              args.error_rate, args.error_status, args.completion_tokens, args.fixtures, args.seed)
+    print(f"Mock OpenAI server on {server.base_url} "
+          f"(latency {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms, error rate {args.error_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+PDF extraction benchmark: full-document extraction versus the lazy,
+budgeted page generator, for each installed PDF backend.
+
+Generates a corpus of multi-page resumes with reportlab (or uses the PDFs
+in ``--corpus``) and reports the best-of-N time per document.
+
+Usage:
+    python benchmarks/pdf_extraction_benchmark.py [--pages 1 2 5 20 60] [--max-chars 20000]
+    python benchmarks/pdf_extraction_benchmark.py --corpus path/to/pdfs
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.text_extraction import PDF_BACKENDS, extract_pdf_text, select_pdf_backend
+
+WORDS = ('python java sql react docker kubernetes aws machine learning data analysis '
+         'project internship developer team lead university award hackathon api design').split()
+
+
+def make_resume(path, pages, seed):
+    """Write a synthetic resume of ``pages`` pages"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    rnd = random.Random(seed)
+    pdf = canvas.Canvas(path, pagesize=A4)
+    for page in range(pages):
+        y = 800
+        pdf.drawString(50, y, f'Candidate {seed} - page {page + 1} - candidate{seed}@example.com')
+        for _ in range(60):
+            y -= 12
+            pdf.drawString(50, y, ' '.join(rnd.choice(WORDS) for _ in range(14)))
+        pdf.showPage()
+    pdf.save()
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full and budgeted PDF extraction')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 2, 5, 20, 60])
+    parser.add_argument('--corpus', help='Directory of PDFs to use instead of generated resumes')
+    parser.add_argument('--max-chars', type=int, default=20000)
+    parser.add_argument('--max-pages', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    backends = [name for name in PDF_BACKENDS if select_pdf_backend(name) == name]
+    if not backends:
+        sys.exit('No PDF backend installed (PyPDF2 or pdfminer.six)')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            files = sorted(glob.glob(os.path.join(args.corpus, '*.pdf')))
+        else:
+            files = []
+            for pages in args.pages:
+                path = os.path.join(tmp, f'resume_{pages:03d}p.pdf')
+                make_resume(path, pages, pages)
+                files.append(path)
+
+        print(f"Budget: {args.max_chars} chars / {args.max_pages} pages, best of {args.repeat}")
+        for backend in backends:
+            print(f"\n{backend}")
+            print(f"  {'document':24s} {'full':>10s} {'budgeted':>10s} {'chars':>9s} {'speedup':>8s}")
+            total_full = total_lazy = 0
+            for path in files:
+                full = best_of(lambda: extract_pdf_text(path, backend=backend), args.repeat)
+                lazy = best_of(lambda: extract_pdf_text(path, args.max_chars, args.max_pages, backend), args.repeat)
+                chars = len(extract_pdf_text(path, args.max_chars, args.max_pages, backend))
+                total_full += full
+                total_lazy += lazy
+                print(f"  {os.path.basename(path):24s} {full:8.1f}ms {lazy:8.1f}ms {chars:9d} x{full / lazy:7.1f}")
+            print(f"  {'total':24s} {total_full:8.1f}ms {total_lazy:8.1f}ms {'':9s} x{total_full / total_lazy:7.1f}")
+
+
+if __name__ == '__main__':
+    main()
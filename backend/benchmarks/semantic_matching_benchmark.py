@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Semantic matching benchmark: index build time, memory and top-k query
+latency of the hashed TF-IDF index for a synthetic cohort.
+
+Usage:
+    python benchmarks/semantic_matching_benchmark.py [--students 20000] [--drives 300] [--words 700]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.semantic_matcher import build_index, document_features
+from services.skill_extractor import skill_extractor
+
+VOCABULARY = ('developed implemented designed built optimized deployed tested analysed led managed '
+              'application system service platform pipeline dashboard model api database interface '
+              'scalable secure distributed realtime responsive automated internship project team '
+              'university hackathon research paper award club volunteer startup client product').split()
+
+
+def make_document(rnd, skills, words):
+    chosen = rnd.sample(skills, 8)
+    tokens = [rnd.choice(chosen) if rnd.random() < 0.15 else rnd.choice(VOCABULARY) for _ in range(words)]
+    return ' '.join(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure semantic index build and query cost')
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--drives', type=int, default=300)
+    parser.add_argument('--words', type=int, default=700)
+    parser.add_argument('--hash-bits', type=int, default=18)
+    parser.add_argument('--max-terms', type=int, default=256)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    skills = sorted(skill_extractor.taxonomy.categories)
+
+    student_texts = [make_document(rnd, skills, args.words) for _ in range(args.students)]
+    drive_texts = [make_document(rnd, skills, args.words // 4) for _ in range(args.drives)]
+
+    start = time.perf_counter()
+    students = [(i, *document_features(np, text, args.hash_bits, args.max_terms))
+                for i, text in enumerate(student_texts)]
+    drives = [(i, *document_features(np, text, args.hash_bits, args.max_terms))
+              for i, text in enumerate(drive_texts)]
+    featurize = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = build_index(np, students, drives, args.hash_bits)
+    build = time.perf_counter() - start
+    stats = index.stats()
+
+    def timed(fn, ids):
+        start = time.perf_counter()
+        for doc_id in ids:
+            fn(doc_id, 10)
+        return (time.perf_counter() - start) * 1000 / len(ids)
+
+    per_drive = timed(index.top_students, rnd.sample(range(args.drives), min(args.queries, args.drives)))
+    per_student = timed(index.top_drives, rnd.sample(range(args.students), min(args.queries, args.students)))
+
+    print(f"Cohort: {args.students} students x {args.words} words, {args.drives} drives")
+    print(f"  featurize        {featurize:8.2f}s ({featurize * 1000 / (args.students + args.drives):.2f}ms/doc)")
+    print(f"  build index      {build * 1000:8.1f}ms")
+    print(f"  index memory     {stats['memory_bytes'] / 1024 / 1024:8.1f}MB ({stats['nnz']} non-zeros)")
+    print(f"  top-10 students  {per_drive:8.2f}ms/drive")
+    print(f"  top-10 drives    {per_student:8.2f}ms/student")
+
+
+if __name__ == '__main__':
+    main()
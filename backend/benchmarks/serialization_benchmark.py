@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark: ORM ``to_dict()`` + stdlib json versus projected
+Core rows + the orjson provider.
+
+Seeds an in-memory SQLite database and times the two large listings that
+hurt most in production: all drives, and HOD applications joined with
+their student and drive. Also reports peak traced allocations.
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--drives 5000] [--applications 20000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, Department, Company, PlacementDrive, StudentProfile, StudentApplication, User
+from read_models import drive_projection, application_projection, student_projection, fetch, fetch_nested
+from utils.json_provider import dumps_bytes
+
+
+def seed(drive_count, application_count):
+    """Populate the database with synthetic rows"""
+    rnd = random.Random(42)
+    department = Department(name='Computer Science', code='CSE')
+    company = Company(name='Acme', industry='Software')
+    db.session.add_all([department, company])
+    db.session.flush()
+
+    drives = []
+    for i in range(drive_count):
+        drive = PlacementDrive(
+            company_id=company.id, title=f'Drive {i}', job_role='Engineer',
+            description='Build and run backend services ' * 4, requirements='Python, SQL',
+            min_cgpa=rnd.choice([6.0, 6.5, 7.0]), status='active',
+            salary_package_min=400000, salary_package_max=1200000
+        )
+        drive.set_required_skills(rnd.sample(['python', 'java', 'sql', 'react', 'aws', 'docker'], 3))
+        drives.append(drive)
+    db.session.add_all(drives)
+
+    students = []
+    for i in range(max(1, application_count // 5)):
+        user = User(email=f'student{i}@example.com', role='student', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        student = StudentProfile(
+            user_id=user.id, student_id=f'S{i:06d}', first_name='Student', last_name=str(i),
+            department_id=department.id, batch_year=2026, cgpa=round(rnd.uniform(6, 10), 2)
+        )
+        student.set_skills(['python', 'sql'])
+        student.set_education([{'degree': 'B.Tech', 'institution': 'College', 'year': '2026'}])
+        students.append(student)
+    db.session.add_all(students)
+    db.session.flush()
+
+    db.session.add_all([
+        StudentApplication(student_id=students[i % len(students)].id, drive_id=drives[i % len(drives)].id,
+                           application_status='applied', ai_score=rnd.uniform(40, 95))
+        for i in range(application_count)
+    ])
+    db.session.commit()
+    return department.id
+
+
+def measure(label, fn, repeat=3):
+    """Time a callable and record peak allocations of one run"""
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(timings) * 1000
+    print(f"  {label:30s} {best:9.1f} ms   peak alloc {peak / 1024 / 1024:7.1f} MB")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare list serialization paths')
+    parser.add_argument('--drives', type=int, default=5000)
+    parser.add_argument('--applications', type=int, default=20000)
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        department_id = seed(args.drives, args.applications)
+
+        print(f"All drives ({args.drives} rows)")
+        legacy = measure('to_dict + json', lambda: json.dumps(
+            {'drives': [d.to_dict() for d in PlacementDrive.query.all()]}).encode())
+        fast = measure('projection + orjson', lambda: dumps_bytes(
+            {'drives': fetch(drive_projection)}))
+        print(f"  speedup x{legacy / fast:.1f}")
+
+        def legacy_applications():
+            students = StudentProfile.query.filter_by(department_id=department_id, is_active=True).all()
+            applications = StudentApplication.query.filter(
+                StudentApplication.student_id.in_([s.id for s in students])).all()
+            data = []
+            for application in applications:
+                item = application.to_dict()
+                item['student'] = application.student.to_dict()
+                item['drive'] = application.drive.to_dict()
+                data.append(item)
+            return json.dumps({'applications': data}).encode()
+
+        def projected_applications():
+            data = fetch_nested(
+                application_projection,
+                {'student': student_projection, 'drive': drive_projection},
+                StudentProfile.department_id == department_id,
+                joins=[
+                    (StudentProfile, StudentApplication.student_id == StudentProfile.id),
+                    (PlacementDrive, StudentApplication.drive_id == PlacementDrive.id),
+                ]
+            )
+            return dumps_bytes({'applications': data})
+
+        print(f"HOD applications ({args.applications} rows, joined)")
+        legacy = measure('to_dict + json', legacy_applications, repeat=1)
+        fast = measure('projection + orjson', projected_applications, repeat=1)
+        print(f"  speedup x{legacy / fast:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Skill extraction benchmark: one substring test per taxonomy term (the old
+keyword loop, scaled to the full taxonomy) versus the single-pass
+Aho-Corasick matcher. ``--extra-skills`` pads the taxonomy with synthetic
+entries to show how each approach scales with dictionary size.
+
+Usage:
+    python benchmarks/skill_extraction_benchmark.py [--resumes 500] [--chars 6000] [--extra-skills 5000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_extractor import DEFAULT_TAXONOMY_PATH, SkillTaxonomy
+
+FILLER = ('worked on a team project for the university with responsible for design and '
+          'implementation of features improved performance led internship award').split()
+
+
+def make_resume(rnd, terms, chars):
+    words = []
+    size = 0
+    while size < chars:
+        word = rnd.choice(terms) if rnd.random() < 0.08 else rnd.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return ' '.join(words)
+
+
+def naive_extract(text, terms):
+    lowered = text.lower()
+    return [term for term in terms if term in lowered]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare keyword loop and automaton skill extraction')
+    parser.add_argument('--resumes', type=int, default=500)
+    parser.add_argument('--chars', type=int, default=6000)
+    parser.add_argument('--taxonomy', default=DEFAULT_TAXONOMY_PATH)
+    parser.add_argument('--extra-skills', type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.taxonomy, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    rnd = random.Random(42)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    data['categories']['synthetic'] = {
+        ''.join(rnd.choice(letters) for _ in range(rnd.randint(5, 12))): []
+        for _ in range(args.extra_skills)
+    }
+
+    start = time.perf_counter()
+    taxonomy = SkillTaxonomy(data['categories'], data.get('case_sensitive', []))
+    build_ms = (time.perf_counter() - start) * 1000
+    terms = sorted(taxonomy.aliases)
+
+    corpus = [make_resume(rnd, terms, args.chars) for _ in range(args.resumes)]
+
+    start = time.perf_counter()
+    for text in corpus:
+        naive_extract(text, terms)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in corpus:
+        taxonomy.extract(text)
+    automaton = time.perf_counter() - start
+
+    print(f"Taxonomy: {len(taxonomy.categories)} skills, {len(terms)} terms, compiled in {build_ms:.1f}ms")
+    print(f"Corpus: {args.resumes} resumes x {args.chars} chars")
+    print(f"  keyword loop  {naive * 1000 / args.resumes:8.2f}ms/resume")
+    print(f"  aho-corasick  {automaton * 1000 / args.resumes:8.2f}ms/resume  x{naive / automaton:.1f}")
+
+
+if __name__ == '__main__':
+    main()
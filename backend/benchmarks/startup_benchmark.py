@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the Flask application factory.
+
+Each sample runs in a fresh interpreter so import caches are cold, the same
+way a newly forked gunicorn worker starts. Reports import time, create_app()
+time, peak RSS and which heavy optional dependencies ended up loaded.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 5] [--apps 20] [--eager]
+
+--eager additionally imports the heavy optional libraries after boot, to show
+what the lazy loading saves per worker.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['openai', 'PyPDF2', 'pdfminer', 'reportlab', 'xlsxwriter']
+
+PROBE = r'''
+import json, os, resource, sys, time
+sys.path.insert(0, {backend_dir!r})
+os.chdir({backend_dir!r})
+
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+application = app_module.create_app({{'SQLALCHEMY_DATABASE_URI': 'sqlite://'}})
+t2 = time.perf_counter()
+for _ in range({apps}):
+    app_module.create_app({{'SQLALCHEMY_DATABASE_URI': 'sqlite://'}})
+t3 = time.perf_counter()
+
+if {eager}:
+    import importlib
+    for name in {heavy!r}:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+t4 = time.perf_counter()
+
+print(json.dumps({{
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'extra_app_ms': ((t3 - t2) * 1000 / {apps}) if {apps} else 0.0,
+    'eager_import_ms': (t4 - t3) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy_loaded': [m for m in {heavy!r} if m in sys.modules],
+}}))
+'''
+
+
+def run_sample(apps, eager):
+    """Run one cold-start sample in a subprocess"""
+    code = PROBE.format(backend_dir=BACKEND_DIR, apps=apps, eager=eager, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=BACKEND_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure application startup cost')
+    parser.add_argument('--runs', type=int, default=5, help='number of cold-start samples')
+    parser.add_argument('--apps', type=int, default=20, help='extra create_app() calls per sample')
+    parser.add_argument('--eager', action='store_true', help='also import heavy optional deps')
+    args = parser.parse_args()
+
+    samples = [run_sample(args.apps, args.eager) for _ in range(args.runs)]
+
+    print("=" * 60)
+    print(f"Startup benchmark ({args.runs} cold starts)")
+    print("=" * 60)
+    for key, label in [
+        ('import_ms', 'import app module'),
+        ('create_app_ms', 'first create_app()'),
+        ('extra_app_ms', 'each further create_app()'),
+        ('eager_import_ms', 'heavy optional imports'),
+        ('max_rss_mb', 'peak RSS (MB)'),
+    ]:
+        values = [s[key] for s in samples]
+        print(f"{label:28s} median {statistics.median(values):8.2f}   min {min(values):8.2f}")
+    print(f"{'heavy modules loaded':28s} {', '.join(samples[-1]['heavy_loaded']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
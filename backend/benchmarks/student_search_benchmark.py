@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+TPO student search benchmark: the indexed filter query against the old way
+of shortlisting (load each department's students and filter in Python),
+on a synthetic cohort in an in-memory SQLite database.
+
+Usage:
+    python benchmarks/student_search_benchmark.py [--students 100000] [--applications 3]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+from app import create_app
+from models import db, Department, PlacementDrive, StudentApplication, StudentProfile, User, Company
+from services.application_status import SELECTED_STATUSES
+from services.student_search import student_search
+
+SKILLS = ['python', 'java', 'sql', 'react', 'javascript', 'docker', 'aws', 'c++', 'machine learning',
+          'node.js', 'kubernetes', 'html', 'css', 'git', 'linux', 'mongodb', 'tensorflow', 'go']
+STATUSES = ['applied', 'under_review', 'shortlisted', 'rejected', 'rejected', 'selected', 'offer_accepted']
+FILTERS = {'departments': ['CSE', 'ECE'], 'batches': [2026], 'min_cgpa': 7.5, 'skills': ['Python', 'SQL'],
+           'placed': False}
+
+
+def seed(students, applications_per_student):
+    rnd = random.Random(42)
+    codes = ['CSE', 'ECE', 'ME', 'CE', 'IT', 'EE']
+    db.session.add_all([Department(name=code, code=code) for code in codes])
+    company = Company(name='Acme')
+    db.session.add(company)
+    db.session.flush()
+    db.session.add_all([PlacementDrive(company_id=company.id, title=f'Drive {i}', job_role='SDE', status='active')
+                        for i in range(50)])
+    db.session.commit()
+
+    users, profiles, applications = [], [], []
+    for i in range(1, students + 1):
+        users.append({'id': i, 'email': f's{i}@example.com', 'password_hash': 'x', 'role': 'student'})
+        profiles.append({
+            'id': i, 'user_id': i, 'student_id': f'S{i:07d}', 'first_name': 'Student', 'last_name': str(i),
+            'department_id': rnd.randint(1, len(codes)), 'batch_year': rnd.choice([2025, 2026, 2027]),
+            'cgpa': round(rnd.uniform(5.5, 9.9), 2), 'is_active': True,
+            'skills': json.dumps(rnd.sample(SKILLS, rnd.randint(2, 6))),
+        })
+        for drive_id in rnd.sample(range(1, 51), applications_per_student):
+            applications.append({'student_id': i, 'drive_id': drive_id, 'application_status': rnd.choice(STATUSES)})
+    db.session.execute(insert(User), users)
+    db.session.execute(insert(StudentProfile), profiles)
+    db.session.execute(insert(StudentApplication), applications)
+    db.session.commit()
+
+
+def legacy_search():
+    """One department listing at a time, filtered in Python"""
+    matches = []
+    for code in FILTERS['departments']:
+        department = Department.query.filter_by(code=code).first()
+        for student in StudentProfile.query.filter_by(department_id=department.id, is_active=True).all():
+            skills = {skill.lower() for skill in student.get_skills()}
+            if student.batch_year not in FILTERS['batches'] or float(student.cgpa or 0) < FILTERS['min_cgpa']:
+                continue
+            if not {'python', 'sql'} <= skills:
+                continue
+            if any(a.application_status in SELECTED_STATUSES for a in student.applications):
+                continue
+            matches.append(student.to_dict())
+    return matches
+
+
+def measure(label, fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    best = min(timings) * 1000
+    print(f"  {label:34s} {best:9.1f} ms")
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure TPO student search latency')
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--applications', type=int, default=3, help='applications per student')
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        seed(args.students, args.applications)
+        print(f"Seeded {args.students} students in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        student_search.ensure_synced()
+        print(f"Skill index built in {time.perf_counter() - start:.1f}s")
+
+        print(f"Shortlist query: {FILTERS}")
+        fast, result = measure('indexed query (counts + page of 50)', lambda: student_search.search(FILTERS))
+        measure('page 20', lambda: student_search.search(FILTERS, page=20))
+        measure('counts for all active students', lambda: student_search.search({}, per_page=1))
+        legacy, matches = measure('per-department load + Python filter', legacy_search, repeat=1)
+        print(f"  {result['total']} matches (legacy {len(matches)}), speedup x{legacy / fast:.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Build the full-text search index.
+
+Indexes every placement drive, company and student profile (including
+resume text) into ``search_documents`` and drops documents of deleted rows.
+The running app keeps the index current afterwards; use this after a bulk
+import or to rebuild from scratch.
+
+Usage:
+    python build_search_index.py [--kind drive|company|student ...]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app
+from services.search_service import KINDS, search_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the full-text search index')
+    parser.add_argument('--kind', choices=KINDS, action='append', default=[],
+                        help='only this kind of document (repeatable)')
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(f"Search backend: {search_service.backend}")
+
+        def progress(kind, indexed):
+            print(f"  {kind:8s} {indexed:8d} indexed", flush=True)
+
+        indexed = search_service.rebuild(args.kind or KINDS, progress=progress)
+
+    print('Done: ' + ', '.join(f'{count} {kind}' for kind, count in indexed.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,18 @@ from werkzeug.security import generate_password_hash, check_password_hash
 # Initialize database instance
 db = SQLAlchemy()
 
+
+def parse_json_list(raw):
+    """Non-empty items of a JSON array column as strings ([] for NULL, bad JSON or a non-array)"""
+    if not raw:
+        return []
+    try:
+        value = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+    except ValueError:
+        return []
+    return [str(item) for item in value if item] if isinstance(value, list) else []
+
+
 class User(db.Model):
     __tablename__ = 'users'
 
@@ -62,7 +74,11 @@ class Department(db.Model):
 
 class StudentProfile(db.Model):
     __tablename__ = 'student_profiles'
-    
+    __table_args__ = (
+        # TPO student search filters on department, batch and CGPA together
+        db.Index('idx_student_search', 'department_id', 'batch_year', 'cgpa'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     student_id = db.Column(db.String(50), unique=True, nullable=False)
@@ -83,9 +99,12 @@ class StudentProfile(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    user = db.relationship('User', backref=db.backref('student_profile', uselist=False))
     
     def get_skills(self):
-        return json.loads(self.skills) if self.skills else []
+        return parse_json_list(self.skills)
     
     def set_skills(self, skills):
         self.skills = json.dumps(skills)
@@ -141,7 +160,7 @@ class HodProfile(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
-    user = db.relationship('User', backref='hod_profile')
+    user = db.relationship('User', backref=db.backref('hod_profile', uselist=False))
     department = db.relationship('Department', backref='hod_profiles')
     
     def to_dict(self):
@@ -268,7 +287,7 @@ class PlacementDrive(db.Model):
     creator = db.relationship('User', backref='created_drives')
     
     def get_required_skills(self):
-        return json.loads(self.required_skills) if self.required_skills else []
+        return parse_json_list(self.required_skills)
     
     def set_required_skills(self, skills):
         self.required_skills = json.dumps(skills)
@@ -297,12 +316,17 @@ class PlacementDrive(db.Model):
 
 class StudentApplication(db.Model):
     __tablename__ = 'student_applications'
+    __table_args__ = (
+        db.Index('idx_application_student_status', 'student_id', 'application_status'),
+        db.Index('idx_application_status', 'application_status'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('student_profiles.id'), nullable=False)
     drive_id = db.Column(db.Integer, db.ForeignKey('placement_drives.id'), nullable=False)
-    application_status = db.Column(db.String(20), default='applied')  # applied, under_review, interview_scheduled, interview_completed, offer_sent, accepted, rejected
+    application_status = db.Column(db.String(20), default='applied')  # see services/application_status.py for states and transitions
     ai_score = db.Column(db.Numeric(5, 2))
+    score_version = db.Column(db.String(40))  # scorer that produced ai_score, see services/scoring_service.py
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -317,6 +341,7 @@ class StudentApplication(db.Model):
             'drive_id': self.drive_id,
             'application_status': self.application_status,
             'ai_score': float(self.ai_score) if self.ai_score else None,
+            'score_version': self.score_version,
             'applied_at': self.applied_at.isoformat() if self.applied_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -326,6 +351,7 @@ class RoundResult(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     application_id = db.Column(db.Integer, db.ForeignKey('student_applications.id'), nullable=False)
+    round_id = db.Column(db.Integer, db.ForeignKey('recruitment_rounds.id'), index=True)
     round_name = db.Column(db.String(100), nullable=False)
     round_type = db.Column(db.String(50))  # online_test, technical, hr, coding, etc.
     score = db.Column(db.Numeric(5, 2))
@@ -339,6 +365,7 @@ class RoundResult(db.Model):
         return {
             'id': self.id,
             'application_id': self.application_id,
+            'round_id': self.round_id,
             'round_name': self.round_name,
             'round_type': self.round_type,
             'score': float(self.score) if self.score else None,
@@ -427,4 +454,158 @@ class RecruitmentRound(db.Model):
             'is_mandatory': self.is_mandatory,
             'order': self.order,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+class DataVersion(db.Model):
+    """Per-table change counter, bumped after every committed write.
+
+    Used to build cache validators (ETags) and cache keys without scanning
+    the data itself.
+    """
+    __tablename__ = 'data_versions'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'table_name': self.table_name,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class AIUsage(db.Model):
+    """Daily AI token and latency totals per endpoint, user and model.
+
+    One row per (day, endpoint, user, model); ``user_id`` 0 stands for calls
+    made outside an authenticated request.
+    """
+    __tablename__ = 'ai_usage'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'endpoint', 'user_id', 'model', name='uq_ai_usage_bucket'),
+        db.Index('idx_ai_usage_user_day', 'user_id', 'day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    endpoint = db.Column(db.String(100), nullable=False)
+    user_id = db.Column(db.Integer, nullable=False, default=0)
+    model = db.Column(db.String(50), nullable=False)
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    cache_hits = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.Integer, nullable=False, default=0)
+    throttled = db.Column(db.Integer, nullable=False, default=0)
+    prompt_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    completion_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    latency_ms = db.Column(db.BigInteger, nullable=False, default=0)  # total over the calls
+    max_latency_ms = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'endpoint': self.endpoint,
+            'user_id': self.user_id,
+            'model': self.model,
+            'calls': self.calls,
+            'cache_hits': self.cache_hits,
+            'errors': self.errors,
+            'throttled': self.throttled,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'avg_latency_ms': round(self.latency_ms / self.calls) if self.calls else None,
+            'max_latency_ms': self.max_latency_ms
+        }
+
+
+class SearchDocument(db.Model):
+    """Searchable text of a drive, company or student profile.
+
+    Maintained by the search service from model change events. MySQL
+    searches it through the FULLTEXT index; on SQLite an FTS5 table over
+    these rows is kept in sync by triggers (see ``services/search_service``).
+    """
+    __tablename__ = 'search_documents'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'ref_id', name='uq_search_document'),
+        db.Index('ft_search_documents', 'title', 'body', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # drive, company, student
+    ref_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(300), nullable=False)
+    body = db.Column(db.Text)
+    status = db.Column(db.String(20))  # drive status; 'active'/'inactive' for companies and students
+    department_id = db.Column(db.Integer)  # students only
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'id': self.ref_id,
+            'title': self.title,
+            'status': self.status,
+            'department_id': self.department_id,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class StudentSkill(db.Model):
+    """One row per (student, canonical skill), mirrored from ``StudentProfile.skills``.
+
+    Lets the TPO student search filter on skills with an index instead of
+    parsing every profile's JSON; kept in sync by ``services/student_search``.
+    """
+    __tablename__ = 'student_skills'
+    __table_args__ = (
+        db.Index('idx_student_skills_skill', 'skill', 'student_id'),
+    )
+
+    student_id = db.Column(db.Integer, db.ForeignKey('student_profiles.id', ondelete='CASCADE'), primary_key=True)
+    skill = db.Column(db.String(100), primary_key=True)
+
+
+class ApplicationStatusHistory(db.Model):
+    """One row per application status change, appended by ``services/application_status``"""
+    __tablename__ = 'application_status_history'
+    __table_args__ = (
+        db.Index('idx_status_history_application', 'application_id', 'changed_at'),
+        db.Index('idx_status_history_status', 'to_status', 'changed_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('student_applications.id', ondelete='CASCADE'), nullable=False)
+    from_status = db.Column(db.String(20))
+    to_status = db.Column(db.String(20), nullable=False)
+    changed_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'application_id': self.application_id,
+            'from_status': self.from_status,
+            'to_status': self.to_status,
+            'changed_by': self.changed_by,
+            'changed_at': self.changed_at.isoformat() if self.changed_at else None
+        }
+
+
+class ResumeImportJob(db.Model):
+    """Progress and report of a bulk resume import, see ``services/resume_import``"""
+    __tablename__ = 'resume_import_jobs'
+
+    job_id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    archive_name = db.Column(db.String(255))
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id'))
+    total = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    matched = db.Column(db.Integer, nullable=False, default=0)
+    updated = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    report = db.Column(db.Text)  # JSON: unmatched files, errors and the job error
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Normalize application statuses.
+
+Rewrites status values outside the application state machine (legacy
+'placed' / 'accepted', typos, NULL) to their canonical state, recording
+each change in ``application_status_history``. Run once after upgrading a
+database written by older versions; dashboards and reports only count the
+canonical states.
+
+Usage:
+    python normalize_application_statuses.py [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, select
+
+from app import app
+from models import db, StudentApplication
+from services.application_status import LEGACY_STATUSES, STATUSES, application_status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Map legacy application statuses onto the state machine')
+    parser.add_argument('--dry-run', action='store_true', help='only report what would change')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.dry_run:
+            counts = db.session.execute(
+                select(StudentApplication.application_status, func.count())
+                .where((StudentApplication.application_status.notin_(STATUSES)) |
+                       (StudentApplication.application_status.is_(None)))
+                .group_by(StudentApplication.application_status)
+            ).all()
+        else:
+            counts = application_status.normalize().items()
+
+    counts = list(counts)
+    for status, count in counts:
+        target = LEGACY_STATUSES.get((status or '').lower(), 'applied')
+        print(f"  {str(status):20s} -> {target:15s} {count:8d}")
+    print(('Would change ' if args.dry_run else 'Changed ') + f"{sum(count for _, count in counts)} applications")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Column-projected read models for list endpoints.
+
+List endpoints used to load full ORM instances and call ``to_dict()`` on each
+one, which builds identity-map state per row and runs ``isoformat``,
+``float(Decimal)`` and ``json.loads`` in Python. The projections here select
+only the needed columns with a Core ``select()``, turn the result tuples into
+plain dicts and leave datetime/Decimal encoding to the JSON provider.
+
+Projections produce the same keys as the corresponding ``to_dict()`` and
+support sparse fieldsets (``?fields=id,title``).
+"""
+from sqlalchemy import select, Float, type_coerce
+
+from models import db, Department, Company, PlacementDrive, StudentProfile, StudentApplication
+from services.cache_service import cache_service
+from utils.json_provider import loads
+
+
+def parse_fields(value):
+    """Parse a ``?fields=a,b,c`` value into a set, or None for all fields"""
+    if not value:
+        return None
+    fields = {f.strip() for f in value.split(',') if f.strip()}
+    return fields or None
+
+
+class Projection:
+    """A named set of model columns serialized straight from Core rows"""
+
+    def __init__(self, model, fields, json_fields=(), numeric_fields=()):
+        self.model = model
+        self.fields = tuple(fields)
+        self.json_fields = frozenset(json_fields)
+        self.numeric_fields = frozenset(numeric_fields)
+
+    def select_fields(self, requested=None):
+        """Resolve a sparse fieldset; unknown names are ignored, order is kept"""
+        if not requested:
+            return self.fields
+        fields = tuple(f for f in self.fields if f in requested)
+        return fields or ('id',)
+
+    def columns(self, fields, prefix=''):
+        """Labeled columns for the given fields"""
+        columns = []
+        for name in fields:
+            column = getattr(self.model, name)
+            if name in self.numeric_fields:
+                # Let the driver value come back as float instead of Decimal
+                column = type_coerce(column, Float)
+            columns.append(column.label(prefix + name))
+        return columns
+
+    def row_converter(self, fields, offset=0):
+        """Build a function turning a result row slice into a dict"""
+        end = offset + len(fields)
+        json_positions = [i for i, name in enumerate(fields) if name in self.json_fields]
+
+        if not json_positions:
+            def convert(row):
+                return dict(zip(fields, row[offset:end]))
+            return convert
+
+        def convert(row):
+            values = list(row[offset:end])
+            for i in json_positions:
+                raw = values[i]
+                values[i] = loads(raw) if raw else []
+            return dict(zip(fields, values))
+        return convert
+
+
+department_projection = Projection(
+    Department,
+    ['id', 'name', 'code', 'description', 'is_active', 'created_at'],
+)
+
+company_projection = Projection(
+    Company,
+    ['id', 'name', 'industry', 'website', 'description', 'logo', 'contact_person',
+     'contact_email', 'contact_phone', 'is_active', 'created_at'],
+)
+
+drive_projection = Projection(
+    PlacementDrive,
+    ['id', 'company_id', 'title', 'job_role', 'description', 'requirements', 'min_cgpa',
+     'max_backlogs', 'required_skills', 'salary_package_min', 'salary_package_max',
+     'location', 'drive_date', 'application_deadline', 'status', 'total_vacancies',
+     'created_by', 'created_at'],
+    json_fields=['required_skills'],
+    numeric_fields=['min_cgpa', 'salary_package_min', 'salary_package_max'],
+)
+
+student_projection = Projection(
+    StudentProfile,
+    ['id', 'user_id', 'student_id', 'first_name', 'last_name', 'department_id', 'batch_year',
+     'cgpa', 'phone', 'date_of_birth', 'gender', 'address', 'profile_image', 'resume_file',
+     'skills', 'experience', 'education', 'is_active', 'created_at'],
+    json_fields=['skills', 'experience', 'education'],
+    numeric_fields=['cgpa'],
+)
+
+application_projection = Projection(
+    StudentApplication,
+    ['id', 'student_id', 'drive_id', 'application_status', 'ai_score', 'score_version', 'applied_at',
+     'updated_at'],
+    numeric_fields=['ai_score'],
+)
+
+
+def fetch(projection, *criteria, fields=None, order_by=None):
+    """Run a projected select and return a list of dicts"""
+    selected = projection.select_fields(fields)
+    stmt = select(*projection.columns(selected)).where(*criteria)
+    stmt = stmt.order_by(order_by if order_by is not None else projection.model.id)
+    convert = projection.row_converter(selected)
+    return [convert(row) for row in db.session.execute(stmt)]
+
+
+def active_drives():
+    """All active drives, shared across requests through the cache.
+
+    Concurrent misses (e.g. when a drive goes live) share one query.
+    """
+    return cache_service.get_or_compute(
+        'drives:active',
+        lambda: fetch(drive_projection, PlacementDrive.status == 'active'),
+        tags=['placement_drives']
+    )
+
+
+def fetch_nested(projection, nested, *criteria, joins=(), fields=None, order_by=None):
+    """Projected select over a join, nesting related rows under their keys.
+
+    ``nested`` maps a key (e.g. ``'student'``) to the projection of the joined
+    model; ``joins`` are ``(model, onclause)`` pairs applied in order.
+    """
+    selected = projection.select_fields(fields)
+    columns = projection.columns(selected)
+    converters = []
+    offset = len(selected)
+    for key, related in nested.items():
+        related_fields = related.fields
+        columns.extend(related.columns(related_fields, prefix=f'{key}_'))
+        converters.append((key, related.row_converter(related_fields, offset)))
+        offset += len(related_fields)
+
+    stmt = select(*columns).select_from(projection.model)
+    for model, onclause in joins:
+        stmt = stmt.join(model, onclause)
+    stmt = stmt.where(*criteria)
+    stmt = stmt.order_by(order_by if order_by is not None else projection.model.id)
+
+    convert = projection.row_converter(selected)
+    results = []
+    for row in db.session.execute(stmt):
+        item = convert(row)
+        for key, convert_related in converters:
+            item[key] = convert_related(row)
+        results.append(item)
+    return results
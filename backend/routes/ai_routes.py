@@ -1,7 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.ai_service import ai_service
-from models import db, User, StudentProfile
+from services.llm_gateway import LLMUnavailable, unavailable_response
+from services.semantic_matcher import SemanticIndexBuilding, semantic_matcher
+from services.application_status import SELECTED_STATUSES
+from services.recommendation_service import recommendation_service
+from services.placement_model import placement_predictor
+from services.prompt_builder import prompt_builder
+from models import db, User, StudentProfile, StudentApplication
+from read_models import active_drives, fetch, student_projection
+from utils.streaming import parse_json, static_stream, stream_format, stream_response
+from sqlalchemy import case, func, select
+from datetime import date, timedelta
 import json
 
 ai_routes_bp = Blueprint('ai', __name__)
@@ -40,7 +50,7 @@ def get_profile_insights():
         # Generate AI insights
         prompt = f"""
         Analyze this student profile and provide actionable insights:
-        Profile Data: {json.dumps(profile_data, indent=2)}
+        Profile Data: {prompt_builder.data('profile', profile_data)}
         
         Provide a comprehensive analysis with:
         1. Overall summary and key observations
@@ -59,18 +69,13 @@ def get_profile_insights():
         }}
         """
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a career counselor and placement expert. Provide detailed, actionable insights for student profile optimization."},
-                {"role": "user", "content": prompt}
-            ],
+        insights_text = ai_service.complete(
+            "You are a career counselor and placement expert. Provide detailed, actionable insights for student profile optimization.",
+            prompt,
             max_tokens=800,
             temperature=0.7
         )
         
-        insights_text = response.choices[0].message.content
-        
         try:
             insights = json.loads(insights_text)
             return jsonify({'insights': insights}), 200
@@ -86,6 +91,8 @@ def get_profile_insights():
                 }
             }), 200
             
+    except LLMUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -116,66 +123,108 @@ def calculate_job_fit_score():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@ai_routes_bp.route('/placement-recommendations', methods=['POST'])
+def _index_building_response(error: SemanticIndexBuilding):
+    """503 with ``Retry-After`` while the semantic index is first built"""
+    response = jsonify({'error': str(error), 'status': 'building', 'retry_after': error.retry_after})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
+@ai_routes_bp.route('/drives/<int:drive_id>/matching-students', methods=['GET'])
 @jwt_required()
-def get_placement_recommendations():
-    """Get AI-powered placement recommendations"""
+def get_matching_students(drive_id):
+    """Students whose resume and profile best match a drive (TPO/HOD)"""
     try:
         current_user_id = get_jwt_identity()
         user = User.query.get(current_user_id)
         
-        if not user or user.role != 'student':
+        if not user or user.role not in ['tpo', 'hod']:
             return jsonify({'error': 'Access denied'}), 403
         
-        data = request.get_json()
-        drives = data.get('drives', [])
+        if not semantic_matcher.is_available():
+            return jsonify({'error': 'Semantic matching is not available'}), 503
+        
+        k = min(request.args.get('k', 10, type=int), 100)
+        student_ids = None
+        if user.role == 'hod':
+            if not user.hod_profile:
+                return jsonify({'error': 'HOD profile not found'}), 404
+            student_ids = db.session.scalars(select(StudentProfile.id).where(
+                StudentProfile.department_id == user.hod_profile.department_id)).all()
+        
+        matches = semantic_matcher.top_students_for_drive(drive_id, k, student_ids)
+        students = {
+            student['id']: student
+            for student in fetch(
+                student_projection, StudentProfile.id.in_([m['student_id'] for m in matches]),
+                fields={'id', 'student_id', 'first_name', 'last_name', 'department_id', 'batch_year', 'cgpa', 'skills'}
+            )
+        }
+        
+        return jsonify({
+            'drive_id': drive_id,
+            'matches': [
+                dict(students[m['student_id']], score=m['score'])
+                for m in matches if m['student_id'] in students
+            ]
+        }), 200
+        
+    except SemanticIndexBuilding as e:
+        return _index_building_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@ai_routes_bp.route('/matching-drives', methods=['GET'])
+@jwt_required()
+def get_matching_drives():
+    """Active drives that best match the student's resume and profile"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
         
-        if not ai_service.is_enabled():
-            # Return mock recommendations
-            return jsonify({
-                'recommendations': ['Google', 'Microsoft', 'Amazon', 'Netflix', 'Adobe'],
-                'reasoning': 'Based on your technical skills and CGPA, these companies align well with your profile.'
-            }), 200
+        if not user or user.role != 'student':
+            return jsonify({'error': 'Access denied'}), 403
         
-        # Generate AI recommendations
-        prompt = f"""
-        Based on the available placement drives, recommend the top 5 companies for a student.
+        profile = user.student_profile
+        if not profile:
+            return jsonify({'error': 'Profile not found'}), 404
         
-        Drives: {json.dumps(drives, indent=2)}
+        if not semantic_matcher.is_available():
+            return jsonify({'error': 'Semantic matching is not available'}), 503
         
-        Consider:
-        1. Student skills alignment
-        2. CGPA requirements
-        3. Industry fit
-        4. Career growth potential
+        k = min(request.args.get('k', 10, type=int), 50)
+        drives = {drive['id']: drive for drive in active_drives()}
+        matches = semantic_matcher.top_drives_for_student(profile.id, k, drives.keys())
         
-        Provide recommendations in JSON format:
-        {{
-            "recommendations": ["Company1", "Company2", "Company3", "Company4", "Company5"],
-            "reasoning": "Brief explanation of recommendations"
-        }}
-        """
+        return jsonify({
+            'matches': [dict(drives[m['drive_id']], score=m['score']) for m in matches]
+        }), 200
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a placement consultant. Provide strategic recommendations for student placement success."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
+    except SemanticIndexBuilding as e:
+        return _index_building_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@ai_routes_bp.route('/placement-recommendations', methods=['POST'])
+@jwt_required()
+def get_placement_recommendations():
+    """Recommend open drives for the current student.
+
+    Ranked locally from skill overlap, CGPA margin, past selections of
+    similar students and deadlines; the request body is no longer needed.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
         
-        recommendations_text = response.choices[0].message.content
+        if not user or user.role != 'student':
+            return jsonify({'error': 'Access denied'}), 403
         
-        try:
-            recommendations = json.loads(recommendations_text)
-            return jsonify(recommendations), 200
-        except json.JSONDecodeError:
-            return jsonify({
-                'recommendations': ['Top Tech Companies', 'Start-ups', 'Fortune 500'],
-                'reasoning': 'AI analysis suggests focusing on companies that match your skill set.'
-            }), 200
+        student_id = db.session.scalar(select(StudentProfile.id).where(StudentProfile.user_id == user.id))
+        if student_id is None:
+            return jsonify({'error': 'Student profile not found'}), 404
+        
+        limit = min(request.args.get('limit', 5, type=int), 20)
+        return jsonify(recommendation_service.recommend_drives(student_id, limit=limit)), 200
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -211,8 +260,8 @@ def analyze_application():
         prompt = f"""
         Analyze this job application and provide insights:
         
-        Application: {json.dumps(application, indent=2)}
-        Student Profile: {json.dumps(student_profile, indent=2)}
+        Application: {prompt_builder.data('application', application, prompt_builder.max_tokens // 2)}
+        Student Profile: {prompt_builder.data('profile', student_profile, prompt_builder.max_tokens // 2)}
         
         Provide analysis in JSON format:
         {{
@@ -224,18 +273,13 @@ def analyze_application():
         }}
         """
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a recruitment expert. Analyze job applications and provide strategic insights."},
-                {"role": "user", "content": prompt}
-            ],
+        analysis_text = ai_service.complete(
+            "You are a recruitment expert. Analyze job applications and provide strategic insights.",
+            prompt,
             max_tokens=600,
             temperature=0.7
         )
         
-        analysis_text = response.choices[0].message.content
-        
         try:
             analysis = json.loads(analysis_text)
             return jsonify({'analysis': analysis}), 200
@@ -250,6 +294,8 @@ def analyze_application():
                 }
             }), 200
             
+    except LLMUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -285,7 +331,7 @@ def get_application_insights():
         prompt = f"""
         Analyze these student applications and provide insights:
         
-        Applications: {json.dumps(applications, indent=2)}
+        Applications: {prompt_builder.data('applications', applications)}
         
         Provide analysis in JSON format:
         {{
@@ -297,18 +343,13 @@ def get_application_insights():
         }}
         """
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a placement analyst. Provide insights on application patterns and success factors."},
-                {"role": "user", "content": prompt}
-            ],
+        insights_text = ai_service.complete(
+            "You are a placement analyst. Provide insights on application patterns and success factors.",
+            prompt,
             max_tokens=500,
             temperature=0.7
         )
         
-        insights_text = response.choices[0].message.content
-        
         try:
             insights = json.loads(insights_text)
             return jsonify(insights), 200
@@ -321,13 +362,15 @@ def get_application_insights():
                 'recommendations': ['Practice interviews', 'Improve communication']
             }), 200
             
+    except LLMUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @ai_routes_bp.route('/placement-insights', methods=['POST'])
 @jwt_required()
 def get_placement_insights():
-    """Get AI insights for placement analytics"""
+    """Placement insights for the current student from the prediction model"""
     try:
         current_user_id = get_jwt_identity()
         user = User.query.get(current_user_id)
@@ -335,64 +378,34 @@ def get_placement_insights():
         if not user or user.role != 'student':
             return jsonify({'error': 'Access denied'}), 403
         
-        data = request.get_json()
-        student_data = data.get('student_data', {})
-        time_range = data.get('time_range', '3months')
-        
-        if not ai_service.is_enabled():
-            # Return mock insights
-            return jsonify({
-                'performance_score': 85,
-                'placement_probability': 78,
-                'rank_percentile': 72,
-                'trends': 'positive',
-                'recommendations': [
-                    'Continue current application strategy',
-                    'Focus on skill development in trending technologies',
-                    'Network with industry professionals'
-                ]
-            }), 200
-        
-        # Generate AI insights
-        prompt = f"""
-        Analyze this student's placement data and provide insights:
-        
-        Student Data: {json.dumps(student_data, indent=2)}
-        Time Range: {time_range}
-        
-        Provide insights in JSON format:
-        {{
-            "performance_score": 0-100,
-            "placement_probability": 0-100,
-            "rank_percentile": 1-100,
-            "trends": "positive/negative/stable",
-            "recommendations": ["rec1", "rec2", "rec3"]
-        }}
-        """
-        
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a placement analyst and career counselor. Provide data-driven insights and recommendations."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
-        
-        insights_text = response.choices[0].message.content
-        
-        try:
-            insights = json.loads(insights_text)
-            return jsonify(insights), 200
-        except json.JSONDecodeError:
-            return jsonify({
-                'performance_score': 80,
-                'placement_probability': 75,
-                'rank_percentile': 70,
-                'trends': 'positive',
-                'recommendations': ['Continue current strategy', 'Focus on skill development']
-            }), 200
+        student_id = db.session.scalar(select(StudentProfile.id).where(StudentProfile.user_id == user.id))
+        prediction = placement_predictor.predict_student(student_id) if student_id else None
+        if prediction is None:
+            return jsonify({'error': 'Student profile not found'}), 404
+        
+        probability = prediction['probability']
+        base_rate = prediction['model'].get('placed_rate') or 0.5
+        # Relative to the historical placement rate of students with a known outcome
+        if probability >= base_rate + 0.05:
+            trend = 'positive'
+        elif probability <= base_rate - 0.05:
+            trend = 'negative'
+        else:
+            trend = 'stable'
+        
+        insights = {
+            'performance_score': round(100 * (prediction['rounds_passed'] + 1) / (prediction['rounds_taken'] + 2)),
+            'placement_probability': round(100 * probability),
+            'rank_percentile': prediction['rank_percentile'],
+            'trends': trend,
+            'recommendations': _prediction_advice(prediction['factors']),
+            'factors': prediction['factors'],
+            'model': prediction['model']
+        }
+        data = request.get_json(silent=True) or {}
+        if data.get('narrate'):
+            insights['narrative'] = _narrate(insights)
+        return jsonify(insights), 200
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -400,72 +413,155 @@ def get_placement_insights():
 @ai_routes_bp.route('/placement-predictions', methods=['POST'])
 @jwt_required()
 def get_placement_predictions():
-    """Get AI-powered placement predictions"""
+    """Placement predictions for a student, or for an HOD's department"""
     try:
         current_user_id = get_jwt_identity()
         user = User.query.get(current_user_id)
         
-        if not user or user.role != 'student':
+        data = request.get_json(silent=True) or {}
+        if user and user.role == 'student':
+            predictions = _student_placement_predictions(user)
+        elif user and user.role == 'hod':
+            if not user.hod_profile:
+                return jsonify({'error': 'HOD profile not found'}), 404
+            predictions = {'predictions': _department_placement_predictions(user.hod_profile.department_id)}
+        else:
             return jsonify({'error': 'Access denied'}), 403
         
-        data = request.get_json()
-        student_data = data.get('student_data', {})
-        historical_trends = data.get('historical_trends', {})
-        
-        if not ai_service.is_enabled():
-            # Return mock predictions
-            return jsonify({
-                'next_month_applications': 25,
-                'interview_rate': 72,
-                'placement_timeline': '3-4 months',
-                'confidence_score': 85,
-                'key_factors': ['CGPA', 'Skills', 'Interview Performance']
-            }), 200
-        
-        # Generate AI predictions
-        prompt = f"""
-        Predict this student's placement outcome based on data:
-        
-        Student Data: {json.dumps(student_data, indent=2)}
-        Historical Trends: {json.dumps(historical_trends, indent=2)}
-        
-        Provide predictions in JSON format:
-        {{
-            "next_month_applications": number,
-            "interview_rate": percentage,
-            "placement_timeline": "timeframe",
-            "confidence_score": 0-100,
-            "key_factors": ["factor1", "factor2", "factor3"]
-        }}
-        """
-        
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a placement prediction expert. Use data to make accurate predictions about student placement outcomes."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=400,
-            temperature=0.7
-        )
+        if predictions is None:
+            return jsonify({'error': 'Student profile not found'}), 404
+        if data.get('narrate'):
+            predictions['narrative'] = _narrate(predictions)
+        return jsonify(predictions), 200
+            
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@ai_routes_bp.route('/placement-model', methods=['GET'])
+@jwt_required()
+def get_placement_model():
+    """Training summary and calibration of the placement prediction model"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
         
-        predictions_text = response.choices[0].message.content
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
         
-        try:
-            predictions = json.loads(predictions_text)
-            return jsonify(predictions), 200
-        except json.JSONDecodeError:
-            return jsonify({
-                'next_month_applications': 20,
-                'interview_rate': 70,
-                'placement_timeline': '4-5 months',
-                'confidence_score': 80,
-                'key_factors': ['CGPA', 'Skills', 'Interview Skills']
-            }), 200
+        return jsonify({'model': placement_predictor.describe()}), 200
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+PROGRESSED_STATUSES = ('shortlisted', 'interview_scheduled', 'interview_completed') + SELECTED_STATUSES
+
+FACTOR_ADVICE = {
+    'cgpa': 'Keep your CGPA up; it carries a lot of weight in past selections',
+    'skills': 'Add in-demand skills to your profile',
+    'applications': 'Apply to more drives you are eligible for',
+    'rounds_cleared': 'Practice aptitude, coding and interview rounds'
+}
+
+def _prediction_advice(factors):
+    """Advice for the factors that pull a student's probability down"""
+    advice = [FACTOR_ADVICE[f['feature']] for f in factors if f['effect'] < 0 and f['feature'] in FACTOR_ADVICE]
+    return advice[:3] or ['Keep applying to drives that match your profile']
+
+def _student_placement_predictions(user):
+    student = db.session.execute(
+        select(StudentProfile.id, StudentProfile.cgpa).where(StudentProfile.user_id == user.id)).one_or_none()
+    if student is None:
+        return None
+    prediction = placement_predictor.predict_student(student.id)
+    
+    applications, progressed = db.session.execute(
+        select(func.count(StudentApplication.id),
+               func.sum(case((StudentApplication.application_status.in_(PROGRESSED_STATUSES), 1), else_=0)))
+        .where(StudentApplication.student_id == student.id)
+    ).one()
+    applied = set(db.session.scalars(
+        select(StudentApplication.drive_id).where(StudentApplication.student_id == student.id)))
+    today = date.today().isoformat()
+    month_end = (date.today() + timedelta(days=30)).isoformat()
+    cgpa = float(student.cgpa) if student.cgpa is not None else None
+    upcoming = [
+        drive for drive in active_drives()
+        if drive['id'] not in applied
+        and (not drive['application_deadline'] or today <= str(drive['application_deadline'])[:10] <= month_end)
+        and (not drive['min_cgpa'] or (cgpa is not None and cgpa >= drive['min_cgpa']))
+    ]
+    
+    probability = prediction['probability']
+    if probability >= 0.75:
+        timeline = '1-2 months'
+    elif probability >= 0.5:
+        timeline = '2-3 months'
+    elif probability >= 0.25:
+        timeline = '3-4 months'
+    else:
+        timeline = '4-6 months'
+    auc = prediction['model'].get('auc')
+    
+    return {
+        'placement_probability': round(100 * probability),
+        'next_month_applications': len(upcoming),
+        'interview_rate': round(100 * (progressed or 0) / applications) if applications else 0,
+        'placement_timeline': timeline,
+        'confidence_score': round(100 * auc) if auc else 50,
+        'key_factors': [f['label'] for f in prediction['factors'][:3]],
+        'factors': prediction['factors'],
+        'model': prediction['model']
+    }
+
+def _department_placement_predictions(department_id):
+    students = placement_predictor.predict_students(StudentProfile.department_id == department_id)
+    model = placement_predictor.describe()
+    target = current_app.config.get('PLACEMENT_TARGET_RATE', 0.8)
+    
+    total = len(students)
+    placed = sum(1 for s in students if s['placed'])
+    open_probabilities = [s['probability'] for s in students if not s['placed']]
+    # Expected further placements among students not yet placed
+    expected = sum(open_probabilities)
+    at_risk = sum(1 for p in open_probabilities if p < 0.3)
+    success_rate = 100 * (placed + expected) / total if total else 0
+    
+    recommendations = []
+    if at_risk:
+        recommendations.append(f'{at_risk} students are below a 30% placement probability; prioritize them for training')
+    if success_rate < 100 * target:
+        recommendations.append(f'Projected placement rate {success_rate:.0f}% is below the {100 * target:.0f}% target')
+    if model['top_features']:
+        recommendations.append(f"{model['top_features'][0]['label']} is the strongest predictor in past outcomes")
+    
+    return {
+        'next_quarter_placements': round(expected),
+        'target_achievement': round(min(100, success_rate / target)) if target else None,
+        'success_rate': round(success_rate),
+        'confidence_score': round(100 * model['auc']) if model.get('auc') else 50,
+        'key_factors': [f['label'] for f in model['top_features'][:3]],
+        'recommendations': recommendations,
+        'students': total,
+        'current_placements': placed,
+        'at_risk_students': at_risk,
+        'model': model
+    }
+
+def _narrate(result):
+    """Short plain-language summary of a prediction, when the LLM is configured"""
+    if not ai_service.is_enabled():
+        return None
+    facts = {k: v for k, v in result.items() if k not in ('model', 'factors')}
+    try:
+        return ai_service.complete(
+            "You are a placement counselor. Explain the given model prediction in two or three sentences. Do not change the numbers.",
+            json.dumps(facts),
+            max_tokens=200,
+            temperature=0.3
+        )
+    except LLMUnavailable:
+        return None
+
 @ai_routes_bp.route('/resume-analysis', methods=['POST'])
 @jwt_required()
 def analyze_resume():
@@ -502,7 +598,7 @@ def analyze_resume():
         prompt = f"""
         Analyze this resume/profile and provide comprehensive analysis:
         
-        Profile Data: {json.dumps(profile_data, indent=2)}
+        Profile Data: {prompt_builder.data('profile', profile_data)}
         
         Provide analysis in JSON format:
         {{
@@ -516,18 +612,13 @@ def analyze_resume():
         }}
         """
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a resume expert and ATS specialist. Provide detailed analysis and improvement recommendations."},
-                {"role": "user", "content": prompt}
-            ],
+        analysis_text = ai_service.complete(
+            "You are a resume expert and ATS specialist. Provide detailed analysis and improvement recommendations.",
+            prompt,
             max_tokens=600,
             temperature=0.7
         )
         
-        analysis_text = response.choices[0].message.content
-        
         try:
             analysis = json.loads(analysis_text)
             return jsonify({'analysis': analysis}), 200
@@ -544,6 +635,8 @@ def analyze_resume():
                 }
             }), 200
             
+    except LLMUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -579,9 +672,9 @@ def get_interview_feedback():
         prompt = f"""
         Provide feedback for this interview result:
         
-        Result: {json.dumps(result, indent=2)}
-        Company: {json.dumps(company, indent=2)}
-        Round Info: {json.dumps(round_info, indent=2)}
+        Result: {prompt_builder.data('interview', result, prompt_builder.max_tokens // 3)}
+        Company: {prompt_builder.data('company', company, prompt_builder.max_tokens // 3)}
+        Round Info: {prompt_builder.data('interview', round_info, prompt_builder.max_tokens // 3)}
         
         Provide feedback in JSON format:
         {{
@@ -593,18 +686,13 @@ def get_interview_feedback():
         }}
         """
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an interview coach and career counselor. Provide constructive feedback and actionable advice."},
-                {"role": "user", "content": prompt}
-            ],
+        feedback_text = ai_service.complete(
+            "You are an interview coach and career counselor. Provide constructive feedback and actionable advice.",
+            prompt,
             max_tokens=600,
             temperature=0.7
         )
         
-        feedback_text = response.choices[0].message.content
-        
         try:
             feedback = json.loads(feedback_text)
             return jsonify({'feedback': feedback}), 200
@@ -619,9 +707,16 @@ def get_interview_feedback():
                 }
             }), 200
             
+    except LLMUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _parsed_or(text, default):
+    """Completion text parsed as JSON, or ``default`` when it is not valid JSON"""
+    parsed = parse_json(text)
+    return default if parsed is None else parsed
+
 # HOD-specific AI routes
 @ai_routes_bp.route('/department-insights', methods=['POST'])
 @jwt_required()
@@ -636,10 +731,11 @@ def get_department_insights():
         
         data = request.get_json()
         department_data = data.get('department_data', {})
+        fmt = stream_format()
         
         if not ai_service.is_enabled():
             # Return mock insights
-            return jsonify({
+            mock = {
                 'insights': {
                     'performance_score': 85,
                     'trends': 'positive',
@@ -651,13 +747,14 @@ def get_department_insights():
                         'Enhance placement preparation'
                     ]
                 }
-            }), 200
+            }
+            return static_stream(fmt, mock) if fmt else (jsonify(mock), 200)
         
         # Generate AI insights
         prompt = f"""
         Analyze this department's placement data and provide strategic insights:
         
-        Department Data: {json.dumps(department_data, indent=2)}
+        Department Data: {prompt_builder.data('department', department_data)}
         
         Provide analysis in JSON format:
         {{
@@ -669,32 +766,24 @@ def get_department_insights():
         }}
         """
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a placement analytics expert for academic departments. Provide strategic insights and recommendations."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
-        
-        insights_text = response.choices[0].message.content
-        
-        try:
-            insights = json.loads(insights_text)
-            return jsonify({'insights': insights}), 200
-        except json.JSONDecodeError:
-            return jsonify({
-                'insights': {
-                    'performance_score': 80,
-                    'trends': 'positive',
-                    'top_strengths': ['Good placement rate', 'Student engagement'],
-                    'improvement_areas': ['Industry partnerships'],
-                    'recommendations': ['Increase collaboration', 'Enhance programs']
-                }
-            }), 200
+        system_prompt = "You are a placement analytics expert for academic departments. Provide strategic insights and recommendations."
+        unparsed = {
+            'performance_score': 80,
+            'trends': 'positive',
+            'top_strengths': ['Good placement rate', 'Student engagement'],
+            'improvement_areas': ['Industry partnerships'],
+            'recommendations': ['Increase collaboration', 'Enhance programs']
+        }
+        
+        if fmt:
+            return stream_response(fmt, ai_service.stream(system_prompt, prompt, max_tokens=500, temperature=0.7),
+                                   lambda text: {'insights': _parsed_or(text, unparsed)})
+        
+        insights_text = ai_service.complete(system_prompt, prompt, max_tokens=500, temperature=0.7)
+        return jsonify({'insights': _parsed_or(insights_text, unparsed)}), 200
             
+    except LLMUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -733,7 +822,7 @@ def analyze_student_data():
         prompt = f"""
         Analyze this student cohort data and provide insights:
         
-        Students Data: {json.dumps(students_data, indent=2)}
+        Students Data: {prompt_builder.data('students', students_data)}
         
         Provide analysis in JSON format:
         {{
@@ -746,18 +835,13 @@ def analyze_student_data():
         }}
         """
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a student performance analyst. Analyze cohort data and provide actionable insights."},
-                {"role": "user", "content": prompt}
-            ],
+        analysis_text = ai_service.complete(
+            "You are a student performance analyst. Analyze cohort data and provide actionable insights.",
+            prompt,
             max_tokens=500,
             temperature=0.7
         )
         
-        analysis_text = response.choices[0].message.content
-        
         try:
             analysis = json.loads(analysis_text)
             return jsonify({'analysis': analysis}), 200
@@ -773,86 +857,8 @@ def analyze_student_data():
                 }
             }), 200
             
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@ai_routes_bp.route('/placement-predictions', methods=['POST'])
-@jwt_required()
-def get_hod_placement_predictions():
-    """Get AI-powered placement predictions for department"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.role != 'hod':
-            return jsonify({'error': 'Access denied'}), 403
-        
-        data = request.get_json()
-        department_data = data.get('department_data', {})
-        historical_trends = data.get('historical_trends', {})
-        
-        if not ai_service.is_enabled():
-            # Return mock predictions
-            return jsonify({
-                'predictions': {
-                    'next_quarter_placements': 45,
-                    'target_achievement': 85,
-                    'success_rate': 78,
-                    'confidence_score': 82,
-                    'key_factors': ['Student preparation', 'Industry demand', 'Skills alignment'],
-                    'recommendations': [
-                        'Focus on skill development',
-                        'Increase industry partnerships',
-                        'Improve placement training'
-                    ]
-                }
-            }), 200
-        
-        # Generate AI predictions
-        prompt = f"""
-        Predict department placement outcomes based on current data:
-        
-        Department Data: {json.dumps(department_data, indent=2)}
-        Historical Trends: {json.dumps(historical_trends, indent=2)}
-        
-        Provide predictions in JSON format:
-        {{
-            "next_quarter_placements": number,
-            "target_achievement": 0-100,
-            "success_rate": 0-100,
-            "confidence_score": 0-100,
-            "key_factors": ["factor1", "factor2", "factor3"],
-            "recommendations": ["rec1", "rec2", "rec3"]
-        }}
-        """
-        
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a placement prediction expert for academic departments. Use data to make accurate predictions."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
-        
-        predictions_text = response.choices[0].message.content
-        
-        try:
-            predictions = json.loads(predictions_text)
-            return jsonify({'predictions': predictions}), 200
-        except json.JSONDecodeError:
-            return jsonify({
-                'predictions': {
-                    'next_quarter_placements': 40,
-                    'target_achievement': 80,
-                    'success_rate': 75,
-                    'confidence_score': 78,
-                    'key_factors': ['Student skills', 'Industry demand'],
-                    'recommendations': ['Enhance training', 'Increase partnerships']
-                }
-            }), 200
-            
+    except LLMUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -869,10 +875,11 @@ def get_report_insights():
         
         data = request.get_json()
         report_data = data.get('report_data', {})
+        fmt = stream_format()
         
         if not ai_service.is_enabled():
             # Return mock insights
-            return jsonify({
+            mock = {
                 'insights': {
                     'report_score': 88,
                     'key_metrics': ['Placement rate', 'Student satisfaction', 'Industry feedback'],
@@ -883,13 +890,14 @@ def get_report_insights():
                         'Set realistic targets'
                     ]
                 }
-            }), 200
+            }
+            return static_stream(fmt, mock) if fmt else (jsonify(mock), 200)
         
         # Generate AI insights
         prompt = f"""
         Analyze this placement report and provide insights:
         
-        Report Data: {json.dumps(report_data, indent=2)}
+        Report Data: {prompt_builder.data('report', report_data)}
         
         Provide insights in JSON format:
         {{
@@ -900,30 +908,22 @@ def get_report_insights():
         }}
         """
         
-        response = ai_service.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a placement report analyst. Provide insights and recommendations for improvement."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=400,
-            temperature=0.7
-        )
+        system_prompt = "You are a placement report analyst. Provide insights and recommendations for improvement."
+        unparsed = {
+            'report_score': 85,
+            'key_metrics': ['Placement rate', 'Student performance'],
+            'trends': 'stable',
+            'recommendations': ['Focus on improvement areas', 'Highlight strengths']
+        }
         
-        insights_text = response.choices[0].message.content
+        if fmt:
+            return stream_response(fmt, ai_service.stream(system_prompt, prompt, max_tokens=400, temperature=0.7),
+                                   lambda text: {'insights': _parsed_or(text, unparsed)})
         
-        try:
-            insights = json.loads(insights_text)
-            return jsonify({'insights': insights}), 200
-        except json.JSONDecodeError:
-            return jsonify({
-                'insights': {
-                    'report_score': 85,
-                    'key_metrics': ['Placement rate', 'Student performance'],
-                    'trends': 'stable',
-                    'recommendations': ['Focus on improvement areas', 'Highlight strengths']
-                }
-            }), 200
+        insights_text = ai_service.complete(system_prompt, prompt, max_tokens=400, temperature=0.7)
+        return jsonify({'insights': _parsed_or(insights_text, unparsed)}), 200
             
+    except LLMUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
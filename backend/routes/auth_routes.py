@@ -15,6 +15,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import from models (db and all models are defined in models.py)
 from models import db, User, StudentProfile, HodProfile, Department
 from services.email_service import email_service
+from read_models import department_projection, fetch, parse_fields
+from utils.http_cache import conditional
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -283,12 +285,17 @@ def change_password():
         return jsonify({'error': f'Password change failed: {str(e)}'}), 500
 
 @auth_bp.route('/departments', methods=['GET'])
+@conditional(['departments'])
 def get_departments():
     """Get all departments (for registration dropdown)"""
     try:
-        departments = Department.query.filter_by(is_active=True).all()
+        departments = fetch(
+            department_projection,
+            Department.is_active == True,
+            fields=parse_fields(request.args.get('fields'))
+        )
         return jsonify({
-            'departments': [dept.to_dict() for dept in departments]
+            'departments': departments
         }), 200
     except Exception as e:
         return jsonify({'error': f'Failed to get departments: {str(e)}'}), 500
\ No newline at end of file
@@ -1,16 +1,23 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, User, Company
+from read_models import company_projection, fetch, parse_fields
+from utils.http_cache import conditional
 
 company_bp = Blueprint('company', __name__)
 
 @company_bp.route('/', methods=['GET'])
+@conditional(['companies'])
 def get_companies():
     """Get all active companies"""
     try:
-        companies = Company.query.filter_by(is_active=True).all()
+        companies = fetch(
+            company_projection,
+            Company.is_active == True,
+            fields=parse_fields(request.args.get('fields'))
+        )
         return jsonify({
-            'companies': [company.to_dict() for company in companies]
+            'companies': companies
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
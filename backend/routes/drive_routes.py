@@ -2,16 +2,24 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, User, PlacementDrive, RecruitmentRound, StudentApplication, RoundResult
 from services.email_service import email_service
+from read_models import drive_projection, active_drives, fetch, parse_fields
+from utils.http_cache import conditional, coalesce
 
 drive_bp = Blueprint('drive', __name__)
 
 @drive_bp.route('/', methods=['GET'])
+@conditional(['placement_drives'])
+@coalesce(['placement_drives'])
 def get_drives():
     """Get all active placement drives"""
     try:
-        drives = PlacementDrive.query.filter_by(status='active').all()
+        fields = parse_fields(request.args.get('fields'))
+        if fields:
+            drives = fetch(drive_projection, PlacementDrive.status == 'active', fields=fields)
+        else:
+            drives = active_drives()
         return jsonify({
-            'drives': [drive.to_dict() for drive in drives]
+            'drives': drives
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -31,7 +39,7 @@ def get_drive(drive_id):
 def get_drive_rounds(drive_id):
     """Get recruitment rounds for a drive"""
     try:
-        rounds = RecruitmentRound.query.filter_by(drive_id=drive_id).order_by(RecruitmentRound.order_sequence).all()
+        rounds = RecruitmentRound.query.filter_by(drive_id=drive_id).order_by(RecruitmentRound.order).all()
         return jsonify({
             'rounds': [round.to_dict() for round in rounds]
         }), 200
@@ -2,6 +2,14 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, User, StudentProfile, HodProfile, Department, StudentApplication, PlacementDrive
 from services.report_service import report_service
+from services.resume_import import resume_import_service
+from utils.uploads import max_upload_size
+from read_models import (
+    application_projection, student_projection, drive_projection,
+    fetch, fetch_nested, parse_fields
+)
+from collections import defaultdict
+from sqlalchemy import select
 
 hod_bp = Blueprint('hod', __name__)
 
@@ -20,19 +28,23 @@ def get_department_students():
         if not hod_profile:
             return jsonify({'error': 'HOD profile not found'}), 404
 
-        students = StudentProfile.query.filter_by(
-            department_id=hod_profile.department_id,
-            is_active=True
-        ).all()
+        in_department = (
+            StudentProfile.department_id == hod_profile.department_id,
+            StudentProfile.is_active == True
+        )
+        fields = parse_fields(request.args.get('fields'))
+        if fields:
+            fields.add('id')  # needed to attach applications
+        students_data = fetch(student_projection, *in_department, fields=fields)
 
-        # Include application information for each student
-        students_data = []
-        for student in students:
-            student_dict = student.to_dict()
-            # Get applications for this student
-            applications = StudentApplication.query.filter_by(student_id=student.id).all()
-            student_dict['applications'] = [app.to_dict() for app in applications]
-            students_data.append(student_dict)
+        # Include application information for each student, fetched in one query
+        applications_by_student = defaultdict(list)
+        department_student_ids = select(StudentProfile.id).where(*in_department)
+        for app in fetch(application_projection, StudentApplication.student_id.in_(department_student_ids)):
+            applications_by_student[app['student_id']].append(app)
+
+        for student_dict in students_data:
+            student_dict['applications'] = applications_by_student.get(student_dict['id'], [])
 
         return jsonify({
             'students': students_data
@@ -115,30 +127,75 @@ def get_department_applications():
         if not hod_profile:
             return jsonify({'error': 'HOD profile not found'}), 404
 
-        # Get all students in the department
-        students = StudentProfile.query.filter_by(
-            department_id=hod_profile.department_id,
-            is_active=True
-        ).all()
+        # Applications with student and drive information in a single joined query
+        applications_data = fetch_nested(
+            application_projection,
+            {'student': student_projection, 'drive': drive_projection},
+            StudentProfile.department_id == hod_profile.department_id,
+            StudentProfile.is_active == True,
+            joins=[
+                (StudentProfile, StudentApplication.student_id == StudentProfile.id),
+                (PlacementDrive, StudentApplication.drive_id == PlacementDrive.id),
+            ],
+            fields=parse_fields(request.args.get('fields'))
+        )
+
+        return jsonify({
+            'applications': applications_data
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@hod_bp.route('/resume-imports', methods=['POST'])
+@max_upload_size('RESUME_IMPORT_MAX_SIZE')
+@jwt_required()
+def import_department_resumes():
+    """Import a ZIP of resumes for students of HOD's department"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
 
-        student_ids = [student.id for student in students]
+        if not user or user.role != 'hod':
+            return jsonify({'error': 'Access denied'}), 403
 
-        # Get all applications from these students
-        applications = StudentApplication.query.filter(
-            StudentApplication.student_id.in_(student_ids)
-        ).all()
+        hod_profile = user.hod_profile
+        if not hod_profile:
+            return jsonify({'error': 'HOD profile not found'}), 404
 
-        # Include drive and student information
-        applications_data = []
-        for app in applications:
-            app_dict = app.to_dict()
-            app_dict['student'] = app.student.to_dict()
-            app_dict['drive'] = app.drive.to_dict()
-            applications_data.append(app_dict)
+        if 'archive' not in request.files:
+            return jsonify({'error': 'No archive provided'}), 400
+
+        result = resume_import_service.start_import(
+            request.files['archive'], user.id, department_id=hod_profile.department_id
+        )
+        if not result['success']:
+            return jsonify({'error': result['error']}), 400
 
         return jsonify({
-            'applications': applications_data
-        }), 200
+            'message': 'Resume import started',
+            'job': result['job']
+        }), 202
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@hod_bp.route('/resume-imports/<job_id>', methods=['GET'])
+@jwt_required()
+def get_department_resume_import(job_id):
+    """Progress of a bulk resume import started by this HOD"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+
+        if not user or user.role != 'hod':
+            return jsonify({'error': 'Access denied'}), 403
+
+        job = resume_import_service.get_job(job_id)
+        if not job or job['created_by'] != user.id:
+            return jsonify({'error': 'Import not found'}), 404
+
+        return jsonify({'job': job}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,45 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import User
+from services.search_service import KINDS, search_service
+
+search_bp = Blueprint('search', __name__)
+
+# Document kinds each role may search
+ROLE_KINDS = {
+    'student': ('drive', 'company'),
+    'hod': KINDS,
+    'tpo': KINDS,
+}
+
+@search_bp.route('', methods=['GET'])
+@jwt_required()
+def search():
+    """Full-text search over drives, companies and student profiles"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+
+        if not user or user.role not in ROLE_KINDS:
+            return jsonify({'error': 'Access denied'}), 403
+
+        allowed = ROLE_KINDS[user.role]
+        types = request.args.get('types')
+        kinds = [kind for kind in types.split(',') if kind in allowed] if types else list(allowed)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+
+        department_id = None
+        if user.role == 'hod':
+            # HODs only find students of their own department
+            if not user.hod_profile:
+                return jsonify({'error': 'Profile not found'}), 404
+            department_id = user.hod_profile.department_id
+
+        return jsonify(search_service.search(
+            request.args.get('q', ''), kinds, page=page, per_page=per_page,
+            active_only=user.role != 'tpo', department_id=department_id
+        )), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,19 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from services.skill_autocomplete import skill_autocomplete
+
+skill_bp = Blueprint('skills', __name__)
+
+@skill_bp.route('/autocomplete', methods=['GET'])
+@jwt_required()
+def autocomplete_skills():
+    """Skill suggestions for a typed prefix, most used first"""
+    try:
+        query = request.args.get('q', '')
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        return jsonify({
+            'query': query,
+            'suggestions': skill_autocomplete.suggest(query, limit)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,8 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, User, StudentProfile, Department, StudentApplication, PlacementDrive, RoundResult, OfferLetter
 from services.ai_service import ai_service
+from services.scoring_service import scoring_service
 from services.file_service import file_service
 from services.email_service import email_service
+from read_models import application_projection, active_drives, fetch, parse_fields
 from datetime import datetime
 import json
 
@@ -142,10 +144,14 @@ def get_student_applications():
         if not profile:
             return jsonify({'error': 'Profile not found'}), 404
         
-        applications = StudentApplication.query.filter_by(student_id=profile.id).all()
+        applications = fetch(
+            application_projection,
+            StudentApplication.student_id == profile.id,
+            fields=parse_fields(request.args.get('fields'))
+        )
         
         return jsonify({
-            'applications': [app.to_dict() for app in applications]
+            'applications': applications
         }), 200
         
     except Exception as e:
@@ -197,18 +203,10 @@ def apply_to_drive():
             application_status='applied'
         )
         
-        # Calculate AI score if service is available
-        if ai_service.is_enabled() and profile.skills and drive.required_skills:
+        # Fit score (LLM when available, otherwise the local scorer)
+        if profile.skills and drive.required_skills:
             try:
-                student_skills = profile.get_skills()
-                job_requirements = drive.get_required_skills()
-                score_result = ai_service.calculate_job_fit_score(
-                    student_skills, job_requirements, 
-                    float(profile.cgpa) if profile.cgpa else 0,
-                    float(drive.min_cgpa) if drive.min_cgpa else 0
-                )
-                if score_result.get('success'):
-                    application.ai_score = score_result['ai_score']['total_score']
+                application.ai_score, application.score_version = scoring_service.score_application(profile, drive)
             except Exception as e:
                 print(f"AI scoring failed: {str(e)}")
         
@@ -280,21 +278,21 @@ def get_available_drives():
         if not profile:
             return jsonify({'error': 'Profile not found'}), 404
         
-        # Get active drives that student hasn't applied to yet
-        applied_drive_ids = [app.drive_id for app in profile.applications]
-        
-        drives = PlacementDrive.query.filter(
-            PlacementDrive.status == 'active',
-            ~PlacementDrive.id.in_(applied_drive_ids)
-        ).all()
+        # Active drives are shared by every student; only the filtering below is per student
+        applied_drive_ids = set(db.session.scalars(
+            db.select(StudentApplication.drive_id).where(StudentApplication.student_id == profile.id)
+        ))
+        cgpa = float(profile.cgpa) if profile.cgpa else None
         
-        # Check eligibility for each drive
+        # Check eligibility for each drive the student hasn't applied to yet
         eligible_drives = []
-        for drive in drives:
-            drive_data = drive.to_dict()
+        for drive in active_drives():
+            if drive['id'] in applied_drive_ids:
+                continue
+            drive_data = dict(drive)
             
             # Check CGPA eligibility
-            if drive.min_cgpa and profile.cgpa and profile.cgpa < drive.min_cgpa:
+            if drive['min_cgpa'] and cgpa and cgpa < drive['min_cgpa']:
                 drive_data['eligible'] = False
                 drive_data['ineligibility_reason'] = 'CGPA below minimum requirement'
             else:
@@ -1,8 +1,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Company, PlacementDrive
+from models import db, User, Company, PlacementDrive, StudentApplication
 from services.file_service import file_service
 from services.ai_service import ai_service
+from services.ai_usage import GROUPINGS, ai_usage
+from services.application_status import STATUSES, TRANSITIONS, application_status
+from services.resume_import import resume_import_service
+from services.round_results import round_result_importer
+from services.student_search import parse_filters, student_search
+from utils.streaming import parse_json, static_stream, stream_format, stream_response
+from utils.uploads import max_upload_size
+from read_models import drive_projection, company_projection, fetch, parse_fields
 from datetime import datetime
 
 tpo_bp = Blueprint('tpo', __name__)
@@ -18,9 +26,9 @@ def get_drives():
         if not user or user.role != 'tpo':
             return jsonify({'error': 'Access denied'}), 403
         
-        drives = PlacementDrive.query.all()
+        drives = fetch(drive_projection, fields=parse_fields(request.args.get('fields')))
         return jsonify({
-            'drives': [drive.to_dict() for drive in drives]
+            'drives': drives
         }), 200
         
     except Exception as e:
@@ -72,6 +80,84 @@ def create_drive():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@tpo_bp.route('/drives/<int:drive_id>', methods=['PUT'])
+@jwt_required()
+def update_drive(drive_id):
+    """Update placement drive (TPO only)"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+
+        drive = PlacementDrive.query.get(drive_id)
+        if not drive:
+            return jsonify({'error': 'Drive not found'}), 404
+
+        data = request.get_json()
+
+        # Update allowed fields
+        allowed_fields = ['title', 'job_role', 'description', 'requirements', 'min_cgpa', 'max_backlogs',
+                          'salary_package_min', 'salary_package_max', 'location', 'status', 'total_vacancies']
+        for field in allowed_fields:
+            if field in data:
+                setattr(drive, field, data[field])
+        for field in ['drive_date', 'application_deadline']:
+            if field in data:
+                setattr(drive, field, datetime.strptime(data[field], '%Y-%m-%d').date() if data[field] else None)
+
+        # Changing required skills or min CGPA re-scores the drive's applications in the background
+        if 'required_skills' in data:
+            drive.set_required_skills(data['required_skills'])
+
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Drive updated successfully',
+            'drive': drive.to_dict()
+        }), 200
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tpo_bp.route('/students/search', methods=['GET', 'POST'])
+@jwt_required()
+def search_students():
+    """Filter students across departments for shortlisting (TPO only).
+
+    Filters: departments (ids or codes), batch, min_cgpa, max_cgpa, skills
+    (all of), any_skills, placed, active; as query parameters with
+    comma-separated lists, or as a JSON body.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+
+        args = request.args
+        if request.method == 'POST':
+            args = request.get_json(silent=True) or request.args
+        filters = parse_filters(args)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+
+        return jsonify(student_search.search(
+            filters, page=page, per_page=per_page, sort=request.args.get('sort', 'cgpa'),
+            fields=parse_fields(request.args.get('fields'))
+        )), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # AI-powered TPO Quick Action Endpoints
 
 @tpo_bp.route('/ai/company-insights', methods=['POST'])
@@ -296,6 +382,10 @@ def get_comprehensive_reports():
             'include_predictions': data.get('include_predictions', True)
         }
         
+        fmt = stream_format()
+        if fmt:
+            return _stream_comprehensive_report(fmt, report_params)
+        
         # Generate AI report
         report = ai_service.generate_comprehensive_reports(report_params)
         
@@ -308,6 +398,49 @@ def get_comprehensive_reports():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _stream_comprehensive_report(fmt, report_params):
+    """Streamed ``/ai/comprehensive-reports``; ends with the same body as the JSON response"""
+    def body(report):
+        return {'success': True, 'data': report, 'timestamp': datetime.utcnow().isoformat()}
+    
+    def fallback():
+        return body(ai_service._get_fallback_reports(report_params))
+    
+    if not ai_service.is_enabled():
+        return static_stream(fmt, fallback())
+    
+    def assemble(text):
+        report = parse_json(text)
+        if report is None:
+            return fallback()
+        return body({'success': True, 'report': report, 'is_ai_generated': True})
+    
+    system_prompt, prompt = ai_service.comprehensive_report_prompt(report_params)
+    pieces = ai_service.stream(system_prompt, prompt, max_tokens=1000, temperature=0.3)
+    return stream_response(fmt, pieces, assemble, fallback=fallback)
+
+@tpo_bp.route('/ai/usage', methods=['GET'])
+@jwt_required()
+def get_ai_usage():
+    """AI token usage and today's budget status (TPO only)"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+        
+        group_by = request.args.get('group_by', 'endpoint')
+        if group_by not in GROUPINGS:
+            return jsonify({'error': f"group_by must be one of: {', '.join(GROUPINGS)}"}), 400
+        days = min(max(request.args.get('days', 7, type=int), 1), 90)
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        
+        return jsonify(ai_usage.usage(days=days, group_by=group_by, limit=limit)), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @tpo_bp.route('/ai/system-optimization', methods=['POST'])
 @jwt_required()
 def get_system_optimization():
@@ -389,9 +522,9 @@ def get_companies():
         if not user or user.role != 'tpo':
             return jsonify({'error': 'Access denied'}), 403
         
-        companies = Company.query.all()
+        companies = fetch(company_projection, fields=parse_fields(request.args.get('fields')))
         return jsonify({
-            'companies': [company.to_dict() for company in companies]
+            'companies': companies
         }), 200
         
     except Exception as e:
@@ -431,4 +564,183 @@ def create_company():
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@tpo_bp.route('/resume-imports', methods=['POST'])
+@max_upload_size('RESUME_IMPORT_MAX_SIZE')
+@jwt_required()
+def import_resumes():
+    """Import a ZIP of resumes named by student id (TPO only)"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+        
+        if 'archive' not in request.files:
+            return jsonify({'error': 'No archive provided'}), 400
+        
+        result = resume_import_service.start_import(request.files['archive'], user.id)
+        if not result['success']:
+            return jsonify({'error': result['error']}), 400
+        
+        return jsonify({
+            'message': 'Resume import started',
+            'job': result['job']
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@tpo_bp.route('/resume-imports/<job_id>', methods=['GET'])
+@jwt_required()
+def get_resume_import(job_id):
+    """Progress of a bulk resume import (TPO only)"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+        
+        job = resume_import_service.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Import not found'}), 404
+        
+        return jsonify({'job': job}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@tpo_bp.route('/rounds/<int:round_id>/results', methods=['POST'])
+@jwt_required()
+def upload_round_results(round_id):
+    """Upload a round's scores as CSV/XLSX and move candidates on (TPO only)"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+        
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file provided'}), 400
+        
+        upload = request.files['file']
+        flags = {name: request.form.get(name, '').lower() in ('true', '1', 'yes')
+                 for name in ('partial', 'dry_run', 'replace')}
+        summary = round_result_importer.import_results(
+            round_id,
+            upload.stream,
+            upload.filename or '',
+            partial=flags['partial'],
+            dry_run=flags['dry_run'],
+            replace=flags['replace'],
+            notify=request.form.get('notify', 'true').lower() not in ('false', '0', 'no'),
+            changed_by=user.id
+        )
+        if summary['error_count'] and not summary['applied'] and not flags['dry_run']:
+            return jsonify({'error': 'The file has errors; fix them or upload with partial=true',
+                            'summary': summary}), 400
+        
+        return jsonify({
+            'message': 'Results recorded' if summary['applied'] else 'Results validated',
+            'summary': summary
+        }), 200
+        
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tpo_bp.route('/applications/status', methods=['POST'])
+@jwt_required()
+def transition_applications():
+    """Move many applications to a new status in one step (TPO only)
+
+    Body: ``{"status": "shortlisted", "application_ids": [...]}`` and/or
+    ``"drive_id"``, optionally ``"from": [...]`` to limit the source states.
+    Applications the state machine does not allow to move are skipped.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+        
+        data = request.get_json() or {}
+        if not data.get('status'):
+            return jsonify({'error': 'status is required'}), 400
+        application_ids = data.get('application_ids')
+        if application_ids is not None and not isinstance(application_ids, list):
+            return jsonify({'error': 'application_ids must be a list'}), 400
+        from_statuses = data.get('from')
+        if isinstance(from_statuses, str):
+            from_statuses = from_statuses.split(',')
+        
+        result = application_status.transition(
+            data['status'],
+            application_ids=application_ids,
+            drive_id=data.get('drive_id'),
+            from_statuses=from_statuses,
+            changed_by=user.id
+        )
+        db.session.commit()
+        
+        result.pop('application_ids')
+        return jsonify(result), 200
+        
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@tpo_bp.route('/applications/statuses', methods=['GET'])
+@jwt_required()
+def get_application_statuses():
+    """Application states and the transitions allowed from each (TPO only)"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+        
+        return jsonify({
+            'statuses': [{'status': status, 'next': list(TRANSITIONS[status])} for status in STATUSES]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@tpo_bp.route('/applications/<int:application_id>/history', methods=['GET'])
+@jwt_required()
+def get_application_history(application_id):
+    """Status changes of an application (TPO only)"""
+    try:
+        current_user_id = get_jwt_identity()
+        user = User.query.get(current_user_id)
+        
+        if not user or user.role != 'tpo':
+            return jsonify({'error': 'Access denied'}), 403
+        
+        application = StudentApplication.query.get(application_id)
+        if not application:
+            return jsonify({'error': 'Application not found'}), 404
+        
+        return jsonify({
+            'application_id': application.id,
+            'application_status': application.application_status,
+            'history': application_status.history(application.id)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Re-score student applications in bulk.
+
+Brings every stale ``ai_score`` (one whose ``score_version`` differs from
+the current scorer's) up to date, in keyset-ordered chunks with a
+checkpoint after each chunk. Re-running after a crash or Ctrl-C continues
+where the previous run stopped.
+
+Usage:
+    python score_applications.py [--mode auto|local|llm] [--batch-size 500] [--concurrency N]
+        [--drive ID ...] [--student ID ...] [--limit N] [--force] [--no-resume] [--status]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app
+from services.scoring_service import SCORE_MODES, scoring_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute stale application fit scores')
+    parser.add_argument('--mode', choices=SCORE_MODES, default='auto',
+                        help='llm, local, or auto (llm when AI is configured)')
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='parallel LLM calls (default: LLM_MAX_CONCURRENCY)')
+    parser.add_argument('--drive', type=int, action='append', default=[], help='only this drive (repeatable)')
+    parser.add_argument('--student', type=int, action='append', default=[],
+                        help='only this student profile (repeatable)')
+    parser.add_argument('--limit', type=int, default=None, help='stop after this many applications')
+    parser.add_argument('--force', action='store_true', help='also re-score applications already up to date')
+    parser.add_argument('--no-resume', action='store_true', help='ignore a saved checkpoint')
+    parser.add_argument('--status', action='store_true', help='show unfinished runs and exit')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.status:
+            print(json.dumps(scoring_service.checkpoints(), indent=2))
+            return
+
+        print(f"Scoring to version {scoring_service.target_version(args.mode)}")
+
+        def progress(stats):
+            rate = (stats['scored'] + stats['unscored']) / stats['elapsed'] if stats['elapsed'] else 0
+            print(f"  batch {stats['batches']:5d}  last id {stats['last_id']:8d}  scored {stats['scored']:7d}  "
+                  f"unscored {stats['unscored']:5d}  fallbacks {stats['downgraded']:5d}  {rate:8.1f}/s", flush=True)
+
+        try:
+            stats = scoring_service.rescore(
+                mode=args.mode, batch_size=args.batch_size, concurrency=args.concurrency,
+                drive_ids=args.drive, student_ids=args.student, force=args.force,
+                resume=not args.no_resume, limit=args.limit, progress=progress)
+        except KeyboardInterrupt:
+            print("Interrupted; run again to continue from the last checkpoint")
+            sys.exit(1)
+
+    if stats['resumed']:
+        print("Resumed from checkpoint")
+    print(f"Done: {stats['scored']} scored, {stats['unscored']} without score, "
+          f"{stats['downgraded']} fell back to the local scorer, {stats['elapsed']}s"
+          + ('' if stats['finished'] else ' (more applications remain)'))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,55 +2,187 @@ from flask import Flask
 import os
 import json
 import re
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional
+from utils.lazy_imports import optional_import
+from services.cache_service import cache_service, make_key
+from services.ai_usage import ai_usage, estimate_tokens
+from services.llm_gateway import llm_gateway
+from services.prompt_builder import prompt_builder
+from services.resume_extraction import resume_extraction_service
+from services.skill_extractor import skill_extractor
 
-# Try to import optional dependencies
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    openai = None
-
-try:
-    import PyPDF2
-    PYPDF2_AVAILABLE = True
-except ImportError:
-    PYPDF2_AVAILABLE = False
-    PyPDF2 = None
-
-try:
-    from pdfminer.high_level import extract_text
-    PDFMINER_AVAILABLE = True
-except ImportError:
-    PDFMINER_AVAILABLE = False
-    extract_text = None
+ai_cache = cache_service.namespace('ai')
+resume_data_cache = cache_service.namespace('resume_data')
 
 class AIService:
     def __init__(self):
-        self.client = None
         self.app = None
+        self._client = None
+        self._client_initialized = False
+        self._client_lock = threading.Lock()
     
     def init_app(self, app: Flask):
-        """Initialize the AI service with Flask app"""
+        """Initialize the AI service with Flask app.
+
+        The OpenAI SDK is heavy to import, so the client is only created the
+        first time an AI feature is actually used.
+        """
         self.app = app
-        if OPENAI_AVAILABLE:
-            api_key = app.config.get('OPENAI_API_KEY')
-            if api_key:
-                try:
-                    self.client = openai.OpenAI(api_key=api_key)
-                except Exception as e:
-                    print(f"Failed to initialize OpenAI client: {e}")
-                    self.client = None
-        else:
+        self._client = None
+        self._client_initialized = False
+        app.extensions['ai_service'] = self
+    
+    @property
+    def client(self):
+        """OpenAI client, created on first access"""
+        if not self._client_initialized:
+            with self._client_lock:
+                if not self._client_initialized:
+                    self._client = self._create_client()
+                    self._client_initialized = True
+        return self._client
+    
+    @client.setter
+    def client(self, value):
+        self._client = value
+        self._client_initialized = True
+    
+    def _create_client(self):
+        """Create the OpenAI client if the SDK and an API key are available"""
+        api_key = self.app.config.get('OPENAI_API_KEY') if self.app else None
+        if not api_key:
+            return None
+        
+        openai = optional_import('openai')
+        if openai is None:
             print("OpenAI not available - AI features will be disabled")
-            self.client = None
+            return None
+        
+        try:
+            # Timeouts and retries are handled by the LLM gateway. OPENAI_BASE_URL
+            # points at any OpenAI-compatible server, e.g. benchmarks/mock_openai_server.py
+            return openai.OpenAI(api_key=api_key, base_url=self.app.config.get('OPENAI_BASE_URL') or None,
+                                 max_retries=0)
+        except Exception as e:
+            print(f"Failed to initialize OpenAI client: {e}")
+            return None
     
     def is_enabled(self):
-        """Check if AI service is enabled"""
-        return self.client is not None
-    
+        """Check if AI service is enabled (not paused by the circuit breaker and
+        within the caller's daily token budgets)"""
+        return self.client is not None and llm_gateway.available() and ai_usage.allows()
+
+    def complete(self, system_prompt: str, prompt: str, max_tokens: int = 800, temperature: float = 0.4) -> str:
+        """Run a chat completion and return the message text.
+
+        Identical requests are served from the shared cache for
+        ``AI_CACHE_TTL`` seconds (0 disables), so repeated insight and
+        report requests over unchanged data do not pay for another call.
+        Calls go through the LLM gateway and raise ``LLMUnavailable`` when
+        it is saturated, paused or out of time, or when the caller's token
+        budget is spent. Tokens, latency and cache hits are recorded in
+        ``ai_usage``.
+        """
+        config = self.app.config if self.app else {}
+        model = config.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+        ttl = config.get('AI_CACHE_TTL', 6 * 3600)
+        ai_usage.check()
+        started = time.perf_counter()
+        called = []
+
+        def request(timeout):
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=timeout
+            )
+            return response
+
+        def call():
+            called.append(True)
+            try:
+                response = llm_gateway.run(request)
+            except Exception:
+                ai_usage.record(model, latency=time.perf_counter() - started, error=True)
+                raise
+            text = response.choices[0].message.content
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+            else:
+                prompt_tokens, completion_tokens = estimate_tokens(system_prompt + prompt), estimate_tokens(text)
+            ai_usage.record(model, prompt_tokens, completion_tokens, time.perf_counter() - started)
+            return text
+
+        if not ttl:
+            return call()
+        key = make_key(model, system_prompt, prompt, max_tokens, temperature)
+        text = ai_cache.get_or_compute(key, call, ttl=ttl)
+        if not called:
+            ai_usage.record(model, latency=time.perf_counter() - started, cache_hit=True)
+        return text
+
+    def stream(self, system_prompt: str, prompt: str, max_tokens: int = 800, temperature: float = 0.4):
+        """Like ``complete``, but yield the message text piece by piece as it is generated.
+
+        A cached completion is yielded in one piece; a stream that runs to
+        the end is cached under the same key ``complete`` uses. The API
+        reports no token usage for streams, so it is estimated.
+        """
+        config = self.app.config if self.app else {}
+        model = config.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+        ttl = config.get('AI_CACHE_TTL', 6 * 3600)
+        ai_usage.check()
+        started = time.perf_counter()
+        key = make_key(model, system_prompt, prompt, max_tokens, temperature)
+        if ttl:
+            cached = ai_cache.get(key)
+            if cached is not None:
+                ai_usage.record(model, latency=time.perf_counter() - started, cache_hit=True)
+                yield cached
+                return
+
+        def request(timeout):
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=timeout,
+                stream=True
+            )
+            try:
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                response.response.close()
+
+        parts = []
+        finished = False
+        try:
+            for piece in llm_gateway.stream(request):
+                parts.append(piece)
+                yield piece
+            finished = True
+        finally:
+            # Also charges streams cut short by an error or a client disconnect
+            ai_usage.record(model, estimate_tokens(system_prompt + prompt) if parts or finished else 0,
+                            estimate_tokens(''.join(parts)), time.perf_counter() - started, error=not finished)
+        if ttl:
+            ai_cache.set(key, ''.join(parts), ttl=ttl)
+
     def generate_email_template(self, template_type: str, context: Dict[str, Any]) -> Dict[str, str]:
         """Generate AI-powered email template"""
         if not self.is_enabled():
@@ -59,18 +191,13 @@ class AIService:
         try:
             prompt = self._build_email_prompt(template_type, context)
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a professional email template generator for placement management. Create clear, professional, and engaging email templates."},
-                    {"role": "user", "content": prompt}
-                ],
+            generated_content = self.complete(
+                "You are a professional email template generator for placement management. Create clear, professional, and engaging email templates.",
+                prompt,
                 max_tokens=500,
                 temperature=0.7
             )
             
-            generated_content = response.choices[0].message.content
-            
             # Parse the response to extract subject and content
             lines = generated_content.split('\n')
             subject = ""
@@ -79,7 +206,7 @@ class AIService:
             in_content = False
             for line in lines:
                 if line.lower().startswith('subject:'):
-                    subject = line.replace('subject:', '').strip()
+                    subject = line.split(':', 1)[1].strip()
                 elif line.lower().startswith('content:') or line.lower().startswith('message:'):
                     in_content = True
                     content = line.split(':', 1)[1].strip() if ':' in line else ""
@@ -181,16 +308,33 @@ class AIService:
         }
     
     def extract_resume_data(self, resume_file_path: str) -> Dict[str, Any]:
+        """Extract structured data from resume, reusing results for identical files"""
+        method = 'ai' if self.is_enabled() else 'basic'
+        try:
+            content_hash = resume_extraction_service.file_hash(resume_file_path)
+        except OSError as e:
+            return {'success': False, 'error': str(e), 'data': {}}
+        
+        content_key = resume_extraction_service.content_key(resume_file_path, content_hash)
+        return resume_data_cache.get_or_compute(
+            f'{method}:{content_key}:skills-v{skill_extractor.taxonomy.version}',
+            lambda: self._extract_resume_data(resume_file_path, content_hash),
+            ttl=resume_extraction_service.cache_ttl,
+            # A basic fallback after an AI failure is not cached as the AI result
+            should_cache=lambda result: result.get('success') and result.get('extraction_method') == method
+        )
+    
+    def _extract_resume_data(self, resume_file_path: str, content_hash: str = None) -> Dict[str, Any]:
         """Extract structured data from resume using AI"""
         if not self.is_enabled():
-            return self._extract_basic_resume_data(resume_file_path)
+            return self._extract_basic_resume_data(resume_file_path, content_hash)
         
         try:
             # Extract text from resume
-            resume_text = self._extract_text_from_file(resume_file_path)
+            resume_text = resume_extraction_service.extract_text(resume_file_path, content_hash)
             
             if not resume_text:
-                return self._extract_basic_resume_data(resume_file_path)
+                return self._extract_basic_resume_data(resume_file_path, content_hash)
             
             prompt = f"""
             Extract structured information from this resume text. Provide a JSON response with the following structure:
@@ -229,71 +373,44 @@ class AIService:
             {resume_text[:3000]}  # Limit to avoid token limits
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert resume parser. Extract structured information from resumes and return valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
+            extracted_data = self.complete(
+                "You are an expert resume parser. Extract structured information from resumes and return valid JSON only.",
+                prompt,
                 max_tokens=1500,
                 temperature=0.3
             )
             
-            extracted_data = response.choices[0].message.content
-            
             # Parse JSON response
             try:
                 data = json.loads(extracted_data)
                 return {
                     'success': True,
                     'data': data,
-                    'raw_text': resume_text
+                    'raw_text': resume_text,
+                    'extraction_method': 'ai'
                 }
             except json.JSONDecodeError:
-                return self._extract_basic_resume_data(resume_file_path)
+                return self._extract_basic_resume_data(resume_file_path, content_hash)
             
         except Exception as e:
             print(f"AI resume extraction failed: {str(e)}")
-            return self._extract_basic_resume_data(resume_file_path)
+            return self._extract_basic_resume_data(resume_file_path, content_hash)
     
     def _extract_text_from_file(self, file_path: str) -> str:
-        """Extract text from various file formats"""
-        try:
-            if file_path.lower().endswith('.pdf'):
-                if PYPDF2_AVAILABLE:
-                    # Extract text from PDF using PyPDF2
-                    text = ""
-                    with open(file_path, 'rb') as file:
-                        pdf_reader = PyPDF2.PdfReader(file)
-                        for page in pdf_reader.pages:
-                            text += page.extract_text() + "\n"
-                    return text
-                else:
-                    print("PyPDF2 not available - cannot extract PDF text")
-                    return ""
-            elif file_path.lower().endswith(('.txt', '.doc', '.docx')):
-                # For simplicity, handle text files
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                    return file.read()
-            else:
-                return ""
-        except Exception as e:
-            print(f"Error extracting text from {file_path}: {str(e)}")
-            return ""
+        """Extract text from various file formats (cached, off the request thread)"""
+        return resume_extraction_service.extract_text(file_path)
     
-    def _extract_basic_resume_data(self, resume_file_path: str) -> Dict[str, Any]:
+    def _extract_basic_resume_data(self, resume_file_path: str, content_hash: str = None) -> Dict[str, Any]:
         """Basic resume data extraction without AI"""
         try:
-            text = self._extract_text_from_file(resume_file_path)
+            text = resume_extraction_service.extract_text(resume_file_path, content_hash)
             
             # Basic pattern matching for common fields
             email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
             phone_match = re.search(r'\b\d{10,15}\b', text)
             
-            # Extract skills (simple keyword matching)
-            skill_keywords = ['python', 'java', 'javascript', 'react', 'node.js', 'mysql', 'html', 'css', 
-                            'machine learning', 'data science', 'web development', 'android', 'ios']
-            found_skills = [skill for skill in skill_keywords if skill.lower() in text.lower()]
+            # Extract skills from the taxonomy in a single pass
+            found_skills = skill_extractor.extract(text)
             
             return {
                 'success': True,
@@ -348,18 +465,13 @@ class AIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert recruitment consultant. Calculate precise job fit scores and provide detailed analysis."},
-                    {"role": "user", "content": prompt}
-                ],
+            response_text = self.complete(
+                "You are an expert recruitment consultant. Calculate precise job fit scores and provide detailed analysis.",
+                prompt,
                 max_tokens=800,
                 temperature=0.3
             )
             
-            response_text = response.choices[0].message.content
-            
             try:
                 score_data = json.loads(response_text)
                 return {
@@ -377,9 +489,9 @@ class AIService:
     def _calculate_basic_fit_score(self, student_skills: List[str], job_requirements: List[str], student_cgpa: float, min_cgpa: float) -> Dict[str, Any]:
         """Calculate basic job fit score without AI"""
         try:
-            # Skill matching
-            student_skills_lower = [s.lower() for s in student_skills]
-            job_requirements_lower = [j.lower() for j in job_requirements]
+            # Skill matching on canonical names, so "ReactJS" counts as "react"
+            student_skills_lower = skill_extractor.canonical_set(student_skills)
+            job_requirements_lower = [skill_extractor.canonical(j) for j in job_requirements]
             
             matched_skills = [skill for skill in job_requirements_lower if skill in student_skills_lower]
             skill_match_score = (len(matched_skills) / len(job_requirements)) * 100 if job_requirements else 0
@@ -390,7 +502,7 @@ class AIService:
             # Total score
             total_score = (skill_match_score * 0.6) + (cgpa_score * 0.4)
             
-            missing_skills = [req for req in job_requirements if req.lower() not in student_skills_lower]
+            missing_skills = [req for req in job_requirements if skill_extractor.canonical(req) not in student_skills_lower]
             
             recommendation = "Recommended" if total_score >= 70 else "Not Recommended" if total_score < 50 else "Consider"
             
@@ -444,18 +556,13 @@ class AIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a career counselor and resume expert. Provide actionable advice for resume improvement."},
-                    {"role": "user", "content": prompt}
-                ],
+            suggestions_text = self.complete(
+                "You are a career counselor and resume expert. Provide actionable advice for resume improvement.",
+                prompt,
                 max_tokens=600,
                 temperature=0.7
             )
             
-            suggestions_text = response.choices[0].message.content
-            
             try:
                 suggestions = json.loads(suggestions_text)
                 return {
@@ -494,7 +601,7 @@ class AIService:
             prompt = f"""
             Analyze company data and provide actionable insights for TPO management:
             
-            Company Data: {json.dumps(company_data, indent=2)}
+            Company Data: {prompt_builder.data('company', company_data)}
             
             Provide JSON response:
             {{
@@ -516,18 +623,13 @@ class AIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a placement management expert. Analyze company data and provide actionable insights for TPOs."},
-                    {"role": "user", "content": prompt}
-                ],
+            insights_text = self.complete(
+                "You are a placement management expert. Analyze company data and provide actionable insights for TPOs.",
+                prompt,
                 max_tokens=800,
                 temperature=0.4
             )
             
-            insights_text = response.choices[0].message.content
-            
             try:
                 insights = json.loads(insights_text)
                 return {
@@ -574,7 +676,7 @@ class AIService:
             prompt = f"""
             Analyze placement drive performance and provide insights:
             
-            Drive Data: {json.dumps(drive_data, indent=2)}
+            Drive Data: {prompt_builder.data('drive', drive_data)}
             
             Provide JSON response:
             {{
@@ -609,18 +711,13 @@ class AIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a placement analytics expert. Analyze drive data and provide performance insights."},
-                    {"role": "user", "content": prompt}
-                ],
+            analysis_text = self.complete(
+                "You are a placement analytics expert. Analyze drive data and provide performance insights.",
+                prompt,
                 max_tokens=1000,
                 temperature=0.4
             )
             
-            analysis_text = response.choices[0].message.content
-            
             try:
                 analysis = json.loads(analysis_text)
                 return {
@@ -683,7 +780,7 @@ class AIService:
             
             Total Applications: {total_apps}
             Average CGPA: {avg_cgpa:.2f}
-            Applications: {json.dumps(applications_data[:10], indent=2)}  # Limit for token efficiency
+            Applications: {prompt_builder.data('applications', applications_data)}
             
             Provide JSON response:
             {{
@@ -718,18 +815,13 @@ class AIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a recruitment analytics expert. Analyze application data and provide actionable insights for TPOs."},
-                    {"role": "user", "content": prompt}
-                ],
+            insights_text = self.complete(
+                "You are a recruitment analytics expert. Analyze application data and provide actionable insights for TPOs.",
+                prompt,
                 max_tokens=800,
                 temperature=0.4
             )
             
-            insights_text = response.choices[0].message.content
-            
             try:
                 insights = json.loads(insights_text)
                 return {
@@ -793,7 +885,7 @@ class AIService:
             prompt = f"""
             Analyze recruitment round data and provide optimization recommendations:
             
-            Round Data: {json.dumps(round_data, indent=2)}
+            Round Data: {prompt_builder.data('rounds', round_data)}
             
             Provide JSON response:
             {{
@@ -831,18 +923,13 @@ class AIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a recruitment optimization expert. Analyze round data and provide efficiency recommendations."},
-                    {"role": "user", "content": prompt}
-                ],
+            optimization_text = self.complete(
+                "You are a recruitment optimization expert. Analyze round data and provide efficiency recommendations.",
+                prompt,
                 max_tokens=800,
                 temperature=0.4
             )
             
-            optimization_text = response.choices[0].message.content
-            
             try:
                 optimization = json.loads(optimization_text)
                 return {
@@ -903,74 +990,12 @@ class AIService:
             return self._get_fallback_reports(report_params)
         
         try:
-            prompt = f"""
-            Generate comprehensive placement report with AI insights:
-            
-            Report Parameters: {json.dumps(report_params, indent=2)}
-            
-            Provide JSON response:
-            {{
-                "report_summary": {{
-                    "total_placements": 125,
-                    "success_rate": "78%",
-                    "average_package": "$45,000",
-                    "placement_trend": "increasing"
-                }},
-                "detailed_analytics": {{
-                    "department_wise": {{
-                        "Computer Science": {{"placed": 45, "success_rate": "85%"}},
-                        "Electronics": {{"placed": 30, "success_rate": "75%"}},
-                        "Mechanical": {{"placed": 25, "success_rate": "70%"}},
-                        "Civil": {{"placed": 25, "success_rate": "68%"}}
-                    }},
-                    "company_analysis": {{
-                        "top_recruiters": ["Google", "Microsoft", "Amazon"],
-                        "average_package_by_company": {{
-                            "Google": "$65,000",
-                            "Microsoft": "$60,000",
-                            "Amazon": "$55,000"
-                        }}
-                    }},
-                    "skill_demand": {{
-                        "most_requested": ["Python", "Java", "JavaScript"],
-                        "emerging_skills": ["AI/ML", "Cloud Computing", "DevOps"]
-                    }}
-                }},
-                "ai_insights": [
-                    "Strong placement performance this year",
-                    "Increasing demand for technical skills",
-                    "Good industry-academia collaboration"
-                ],
-                "recommendations": [
-                    "Focus on emerging technology training",
-                    "Strengthen industry partnerships",
-                    "Enhance soft skills development"
-                ],
-                "actionable_items": [
-                    "Organize skill development workshops",
-                    "Schedule more company interactions",
-                    "Update curriculum based on industry needs"
-                ],
-                "future_projections": {{
-                    "next_year_target": "150 placements",
-                    "expected_growth": "20%",
-                    "focus_areas": ["AI/ML", "Data Science", "Cloud"]
-                }}
-            }}
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a placement analytics expert. Generate comprehensive reports with actionable insights."},
-                    {"role": "user", "content": prompt}
-                ],
+            report_text = self.complete(
+                *self.comprehensive_report_prompt(report_params),
                 max_tokens=1000,
                 temperature=0.3
             )
             
-            report_text = response.choices[0].message.content
-            
             try:
                 report = json.loads(report_text)
                 return {
@@ -985,6 +1010,66 @@ class AIService:
             print(f"AI report generation failed: {str(e)}")
             return self._get_fallback_reports(report_params)
     
+    def comprehensive_report_prompt(self, report_params: Dict[str, Any]):
+        """(system prompt, prompt) for ``generate_comprehensive_reports``"""
+        prompt = f"""
+        Generate comprehensive placement report with AI insights:
+        
+        Report Parameters: {prompt_builder.data('report', report_params)}
+        
+        Provide JSON response:
+        {{
+            "report_summary": {{
+                "total_placements": 125,
+                "success_rate": "78%",
+                "average_package": "$45,000",
+                "placement_trend": "increasing"
+            }},
+            "detailed_analytics": {{
+                "department_wise": {{
+                    "Computer Science": {{"placed": 45, "success_rate": "85%"}},
+                    "Electronics": {{"placed": 30, "success_rate": "75%"}},
+                    "Mechanical": {{"placed": 25, "success_rate": "70%"}},
+                    "Civil": {{"placed": 25, "success_rate": "68%"}}
+                }},
+                "company_analysis": {{
+                    "top_recruiters": ["Google", "Microsoft", "Amazon"],
+                    "average_package_by_company": {{
+                        "Google": "$65,000",
+                        "Microsoft": "$60,000",
+                        "Amazon": "$55,000"
+                    }}
+                }},
+                "skill_demand": {{
+                    "most_requested": ["Python", "Java", "JavaScript"],
+                    "emerging_skills": ["AI/ML", "Cloud Computing", "DevOps"]
+                }}
+            }},
+            "ai_insights": [
+                "Strong placement performance this year",
+                "Increasing demand for technical skills",
+                "Good industry-academia collaboration"
+            ],
+            "recommendations": [
+                "Focus on emerging technology training",
+                "Strengthen industry partnerships",
+                "Enhance soft skills development"
+            ],
+            "actionable_items": [
+                "Organize skill development workshops",
+                "Schedule more company interactions",
+                "Update curriculum based on industry needs"
+            ],
+            "future_projections": {{
+                "next_year_target": "150 placements",
+                "expected_growth": "20%",
+                "focus_areas": ["AI/ML", "Data Science", "Cloud"]
+            }}
+        }}
+        """
+        return ("You are a placement analytics expert. Generate comprehensive reports with actionable insights.",
+                prompt)
+
     def _get_fallback_reports(self, report_params: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback report generation without AI"""
         return {
@@ -1049,7 +1134,7 @@ class AIService:
             prompt = f"""
             Analyze system configuration and provide optimization recommendations:
             
-            System Data: {json.dumps(system_data, indent=2)}
+            System Data: {prompt_builder.data('system', system_data)}
             
             Provide JSON response:
             {{
@@ -1096,18 +1181,13 @@ class AIService:
             }}
             """
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a system optimization expert. Analyze system data and provide actionable recommendations."},
-                    {"role": "user", "content": prompt}
-                ],
+            optimization_text = self.complete(
+                "You are a system optimization expert. Analyze system data and provide actionable recommendations.",
+                prompt,
                 max_tokens=800,
                 temperature=0.3
             )
             
-            optimization_text = response.choices[0].message.content
-            
             try:
                 optimization = json.loads(optimization_text)
                 return {
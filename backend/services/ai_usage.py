@@ -0,0 +1,376 @@
+"""Token accounting and daily AI budgets.
+
+Every LLM call made through ``AIService`` is recorded with its prompt and
+completion tokens, latency and whether the AI cache answered it, and is
+attributed to the calling endpoint and user. Records are summed in memory
+and written every ``AI_USAGE_FLUSH_INTERVAL`` seconds as one ``ai_usage``
+row per (day, endpoint, user, model), so the table grows with the number
+of distinct callers rather than with the number of calls.
+
+Budgets are tokens per UTC day (0 = unlimited):
+
+* ``AI_DAILY_TOKEN_BUDGET`` — all AI calls together;
+* ``AI_ENDPOINT_TOKEN_BUDGETS`` — per endpoint, as
+  ``ai.get_department_insights=200000,tpo.get_comprehensive_reports=50000``;
+* ``AI_USER_DAILY_TOKEN_BUDGET`` — per user.
+
+Once a budget is spent ``ai_service.is_enabled()`` is false for the
+requests it covers, so they get the local fallbacks while other endpoints
+and users keep their AI features. Cache hits cost nothing and are not
+charged. Totals from other workers are read back at every flush, so a
+budget can be overshot by about one flush interval of traffic.
+"""
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from models import db, AIUsage, User
+from services.llm_gateway import LLMUnavailable
+from services.metrics import metrics
+
+# Endpoint name for calls made outside a request (background jobs, scripts)
+BACKGROUND = 'background'
+
+GROUPINGS = {
+    'endpoint': (AIUsage.endpoint,),
+    'user': (AIUsage.user_id,),
+    'day': (AIUsage.day,),
+    'model': (AIUsage.model,),
+}
+
+_TOKEN_PIECES = re.compile(r'[^\W\d_]+|\d+|[^\w\s]+|_')
+
+# Counter positions in a pending bucket
+_CALLS, _CACHE_HITS, _ERRORS, _THROTTLED, _PROMPT, _COMPLETION, _LATENCY, _MAX_LATENCY = range(8)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without a tokenizer.
+
+    Words count one token per six letters, digit runs one per three digits
+    and punctuation one per two marks, which tracks the GPT tokenizers
+    closely for English text and JSON.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece[0].isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        elif piece[0].isdigit():
+            tokens += 1 + (len(piece) - 1) // 3
+        else:
+            tokens += (len(piece) + 1) // 2
+    return tokens
+
+
+def _seconds_to_midnight() -> float:
+    now = datetime.utcnow()
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (tomorrow - now).total_seconds()
+
+
+def parse_budgets(value) -> Dict[str, int]:
+    """``{endpoint: tokens}`` from a dict or an ``endpoint=tokens,...`` string"""
+    if isinstance(value, dict):
+        return {str(k): int(v) for k, v in value.items() if int(v) > 0}
+    budgets = {}
+    for item in (value or '').split(','):
+        endpoint, _, tokens = item.partition('=')
+        if endpoint.strip() and tokens.strip().isdigit() and int(tokens) > 0:
+            budgets[endpoint.strip()] = int(tokens)
+    return budgets
+
+
+class BudgetExhausted(LLMUnavailable):
+    """A daily AI token budget is used up; use the fallback"""
+
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class AIUsageTracker:
+    def __init__(self):
+        self.app = None
+        self.flush_interval = 10.0
+        self.daily_budget = 0
+        self.user_budget = 0
+        self.endpoint_budgets = {}
+        self._pending = {}
+        self._spent = {}
+        self._spent_day = None
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def init_app(self, app: Flask):
+        """Initialize the tracker with Flask app"""
+        self.app = app
+        self.flush_interval = app.config.get('AI_USAGE_FLUSH_INTERVAL', 10.0)
+        self.daily_budget = app.config.get('AI_DAILY_TOKEN_BUDGET', 0)
+        self.user_budget = app.config.get('AI_USER_DAILY_TOKEN_BUDGET', 0)
+        self.endpoint_budgets = parse_budgets(app.config.get('AI_ENDPOINT_TOKEN_BUDGETS'))
+        self._pending = {}
+        self._spent = {}
+        self._spent_day = None
+        self._last_flush = 0.0
+        app.extensions['ai_usage'] = self
+
+    @property
+    def has_budgets(self) -> bool:
+        return bool(self.daily_budget or self.user_budget or self.endpoint_budgets)
+
+    # --- Recording ------------------------------------------------------------
+
+    def caller(self) -> Tuple[str, int]:
+        """(endpoint, user id) the current call is charged to"""
+        if not has_request_context():
+            return BACKGROUND, 0
+        try:
+            user_id = int(get_jwt_identity() or 0)
+        except Exception:
+            user_id = 0
+        return (request.endpoint or request.path)[:100], user_id
+
+    def record(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0, latency: float = 0.0,
+               cache_hit: bool = False, error: bool = False):
+        """Account for one AI call; ``latency`` in seconds"""
+        endpoint, user_id = self.caller()
+        tokens = 0 if cache_hit else prompt_tokens + completion_tokens
+        latency_ms = int(latency * 1000)
+        with self._lock:
+            day = self._roll()
+            bucket = self._bucket(day, endpoint, user_id, model)
+            bucket[_CALLS] += 1
+            bucket[_CACHE_HITS] += cache_hit
+            bucket[_ERRORS] += error
+            if not cache_hit:
+                bucket[_PROMPT] += prompt_tokens
+                bucket[_COMPLETION] += completion_tokens
+            bucket[_LATENCY] += latency_ms
+            bucket[_MAX_LATENCY] = max(bucket[_MAX_LATENCY], latency_ms)
+            self._charge(endpoint, user_id, tokens)
+        metrics.incr('ai.calls')
+        metrics.incr('ai.tokens', tokens)
+        if cache_hit:
+            metrics.incr('ai.cache_hits')
+        self._maybe_flush()
+
+    def _bucket(self, day, endpoint, user_id, model):
+        key = (day, endpoint, user_id, model or 'unknown')
+        bucket = self._pending.get(key)
+        if bucket is None:
+            bucket = self._pending[key] = [0] * 8
+        return bucket
+
+    def _charge(self, endpoint, user_id, tokens):
+        for scope in ('*', f'endpoint:{endpoint}', f'user:{user_id}'):
+            self._spent[scope] = self._spent.get(scope, 0) + tokens
+
+    def _roll(self):
+        """Today's date; resets the day's totals when the day changes"""
+        today = datetime.utcnow().date()
+        if today != self._spent_day:
+            self._spent_day = today
+            self._spent = {}
+            self._last_flush = 0.0
+        return today
+
+    # --- Budgets --------------------------------------------------------------
+
+    def exhausted(self) -> Optional[str]:
+        """Name of the budget the current caller has used up, if any"""
+        if not self.has_budgets:
+            return None
+        endpoint, user_id = self.caller()
+        self._maybe_flush()
+        with self._lock:
+            self._roll()
+            for name, scope, budget in (
+                    ('daily', '*', self.daily_budget),
+                    ('endpoint', f'endpoint:{endpoint}', self.endpoint_budgets.get(endpoint, 0)),
+                    ('user', f'user:{user_id}', self.user_budget if user_id else 0)):
+                if budget and self._spent.get(scope, 0) >= budget:
+                    return name
+        return None
+
+    def allows(self) -> bool:
+        """Whether the current caller is within its budgets.
+
+        A refusal is counted once per request as ``throttled``.
+        """
+        name = self.exhausted()
+        if name is None:
+            return True
+        if not has_request_context() or not g.get('ai_budget_throttled'):
+            if has_request_context():
+                g.ai_budget_throttled = True
+            endpoint, user_id = self.caller()
+            with self._lock:
+                self._bucket(self._roll(), endpoint, user_id, self._model())[_THROTTLED] += 1
+            metrics.incr(f'ai.budget.{name}_exhausted')
+        return False
+
+    def check(self):
+        """Raise ``BudgetExhausted`` when the current caller is over a budget"""
+        name = self.exhausted()
+        if name is not None:
+            metrics.incr(f'ai.budget.{name}_exhausted')
+            raise BudgetExhausted(f'The {name} AI token budget is used up for today', _seconds_to_midnight())
+
+    def _model(self):
+        return self.app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo') if self.app else 'unknown'
+
+    # --- Persistence ----------------------------------------------------------
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write pending totals and reload today's spend from the database"""
+        if self.app is None or not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            with self.app.app_context():
+                try:
+                    with db.engine.begin() as connection:
+                        for key, counters in pending.items():
+                            self._write(connection, key, counters)
+                    pending = {}
+                    spent = self._load_spent(self._spent_day or datetime.utcnow().date())
+                except SQLAlchemyError as e:
+                    print(f"Error saving AI usage: {str(e)}")
+                    spent = None
+            with self._lock:
+                for key, counters in pending.items():
+                    # Keep what could not be written for the next flush
+                    bucket = self._bucket(*key)
+                    for i, value in enumerate(counters):
+                        bucket[i] = max(bucket[i], value) if i == _MAX_LATENCY else bucket[i] + value
+                if spent is not None:
+                    for (day, endpoint, user_id, _), counters in self._pending.items():
+                        if day == self._spent_day:
+                            spent.append((endpoint, user_id, counters[_PROMPT] + counters[_COMPLETION]))
+                    self._spent = {}
+                    for endpoint, user_id, tokens in spent:
+                        self._charge(endpoint, user_id, int(tokens or 0))
+        finally:
+            self._flush_lock.release()
+
+    def _write(self, connection, key, counters):
+        day, endpoint, user_id, model = key
+        bucket = ((AIUsage.day == day) & (AIUsage.endpoint == endpoint)
+                  & (AIUsage.user_id == user_id) & (AIUsage.model == model))
+        stmt = update(AIUsage).where(bucket).values(
+            calls=AIUsage.calls + counters[_CALLS],
+            cache_hits=AIUsage.cache_hits + counters[_CACHE_HITS],
+            errors=AIUsage.errors + counters[_ERRORS],
+            throttled=AIUsage.throttled + counters[_THROTTLED],
+            prompt_tokens=AIUsage.prompt_tokens + counters[_PROMPT],
+            completion_tokens=AIUsage.completion_tokens + counters[_COMPLETION],
+            latency_ms=AIUsage.latency_ms + counters[_LATENCY],
+            max_latency_ms=case((AIUsage.max_latency_ms < counters[_MAX_LATENCY], counters[_MAX_LATENCY]),
+                                else_=AIUsage.max_latency_ms))
+        if connection.execute(stmt).rowcount:
+            return
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(AIUsage).values(
+                    day=day, endpoint=endpoint, user_id=user_id, model=model,
+                    calls=counters[_CALLS], cache_hits=counters[_CACHE_HITS], errors=counters[_ERRORS],
+                    throttled=counters[_THROTTLED], prompt_tokens=counters[_PROMPT],
+                    completion_tokens=counters[_COMPLETION], latency_ms=counters[_LATENCY],
+                    max_latency_ms=counters[_MAX_LATENCY]))
+        except IntegrityError:
+            # Another worker created the bucket first
+            connection.execute(stmt)
+
+    def _load_spent(self, day):
+        stmt = (select(AIUsage.endpoint, AIUsage.user_id,
+                       func.sum(AIUsage.prompt_tokens + AIUsage.completion_tokens))
+                .where(AIUsage.day == day)
+                .group_by(AIUsage.endpoint, AIUsage.user_id))
+        with db.engine.connect() as connection:
+            return [tuple(row) for row in connection.execute(stmt)]
+
+    # --- Reporting ------------------------------------------------------------
+
+    def usage(self, days: int = 7, group_by: str = 'endpoint', limit: int = 100) -> Dict[str, Any]:
+        """Usage over the last ``days`` days grouped by endpoint, user, day or model"""
+        self.flush()
+        columns = GROUPINGS[group_by]
+        since = datetime.utcnow().date() - timedelta(days=max(1, days) - 1)
+        tokens = func.sum(AIUsage.prompt_tokens + AIUsage.completion_tokens)
+        stmt = (select(*columns,
+                       func.sum(AIUsage.calls), func.sum(AIUsage.cache_hits), func.sum(AIUsage.errors),
+                       func.sum(AIUsage.throttled), func.sum(AIUsage.prompt_tokens),
+                       func.sum(AIUsage.completion_tokens), func.sum(AIUsage.latency_ms),
+                       func.max(AIUsage.max_latency_ms))
+                .where(AIUsage.day >= since)
+                .group_by(*columns)
+                .order_by(tokens.desc() if group_by != 'day' else AIUsage.day.desc())
+                .limit(limit))
+        rows = []
+        for key, calls, hits, errors, throttled, prompt, completion, latency, max_latency in db.session.execute(stmt):
+            calls = int(calls or 0)
+            rows.append({
+                group_by: key.isoformat() if group_by == 'day' else key,
+                'calls': calls,
+                'cache_hits': int(hits or 0),
+                'cache_hit_rate': round(int(hits or 0) / calls, 3) if calls else None,
+                'errors': int(errors or 0),
+                'throttled': int(throttled or 0),
+                'prompt_tokens': int(prompt or 0),
+                'completion_tokens': int(completion or 0),
+                'total_tokens': int(prompt or 0) + int(completion or 0),
+                'avg_latency_ms': round(int(latency or 0) / calls) if calls else None,
+                'max_latency_ms': int(max_latency or 0)
+            })
+        if group_by == 'user':
+            ids = [row['user'] for row in rows if row['user']]
+            emails = dict(db.session.execute(select(User.id, User.email).where(User.id.in_(ids))).all()) if ids else {}
+            for row in rows:
+                row['email'] = emails.get(row['user'])
+        return {
+            'since': since.isoformat(),
+            'group_by': group_by,
+            'usage': rows,
+            'budgets': self.budgets()
+        }
+
+    def budgets(self) -> Dict[str, Any]:
+        """Today's spend against the configured budgets"""
+        with self._lock:
+            self._roll()
+            spent = dict(self._spent)
+
+        def status(budget, used):
+            return {'budget': budget or None, 'used': used,
+                    'remaining': max(0, budget - used) if budget else None}
+
+        return {
+            'day': self._spent_day.isoformat(),
+            'daily': status(self.daily_budget, spent.get('*', 0)),
+            'endpoints': {endpoint: status(budget, spent.get(f'endpoint:{endpoint}', 0))
+                          for endpoint, budget in sorted(self.endpoint_budgets.items())},
+            'per_user_budget': self.user_budget or None,
+            'resets_in_seconds': int(_seconds_to_midnight())
+        }
+
+
+# Global AI usage tracker
+ai_usage = AIUsageTracker()
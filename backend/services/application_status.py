@@ -0,0 +1,204 @@
+"""Application status state machine.
+
+``StudentApplication.application_status`` takes one of ``STATUSES``; the
+pipeline runs::
+
+    applied -> under_review -> shortlisted -> interview_scheduled -> interview_completed
+                                                                          |
+                               selected -> offer_sent -> offer_accepted <-+
+    rejected (from any open or selected state)
+
+``TRANSITIONS`` lists the moves allowed from each state; stages may be
+skipped (a drive with a single round selects straight from ``applied``),
+but decided applications only move forward.
+
+Counters use the sets defined here (``OPEN_STATUSES``, ``SELECTED_STATUSES``,
+``DECIDED_STATUSES``) and filter on ``idx_application_status``.
+
+``transition`` moves a whole set of applications, chosen by ids and/or
+drive, with one set-based UPDATE limited to the states that may move to the
+target; applications that cannot make the move are left alone and reported
+as skipped. The rows are locked and read first (one SELECT ... FOR UPDATE)
+so that every change appends one ``application_status_history`` row
+(application, from, to, who, when) with a single INSERT and publishes a
+change event for caches and subscribers.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import Flask
+from sqlalchemy import insert, select, update
+
+from models import db, ApplicationStatusHistory, StudentApplication
+from services.change_feed import change_feed
+
+STATUSES = ('applied', 'under_review', 'shortlisted', 'interview_scheduled', 'interview_completed',
+            'selected', 'offer_sent', 'offer_accepted', 'rejected')
+
+# Still in the running for the drive
+OPEN_STATUSES = ('applied', 'under_review', 'shortlisted', 'interview_scheduled', 'interview_completed')
+# Ended in a selection (an offer letter other than declined counts too, see recommendation_service)
+SELECTED_STATUSES = ('selected', 'offer_sent', 'offer_accepted')
+DECIDED_STATUSES = SELECTED_STATUSES + ('rejected',)
+
+TRANSITIONS = {
+    'applied': ('under_review', 'shortlisted', 'interview_scheduled', 'selected', 'rejected'),
+    'under_review': ('shortlisted', 'interview_scheduled', 'selected', 'rejected'),
+    'shortlisted': ('interview_scheduled', 'interview_completed', 'selected', 'rejected'),
+    'interview_scheduled': ('shortlisted', 'interview_completed', 'selected', 'rejected'),
+    'interview_completed': ('shortlisted', 'interview_scheduled', 'selected', 'rejected'),
+    'selected': ('offer_sent', 'offer_accepted', 'rejected'),
+    'offer_sent': ('offer_accepted', 'rejected'),
+    'offer_accepted': (),
+    'rejected': (),
+}
+
+# Values written by older code, mapped onto the states above by ``normalize``
+LEGACY_STATUSES = {'placed': 'offer_accepted', 'accepted': 'offer_accepted', 'pending': 'applied'}
+
+HISTORY_FIELDS = ['application_status', 'updated_at']
+
+
+def can_transition(from_status: str, to_status: str) -> bool:
+    return to_status in TRANSITIONS.get(from_status, ())
+
+
+def sources(to_status: str) -> List[str]:
+    """States an application may be in to move to ``to_status``"""
+    return [status for status in STATUSES if can_transition(status, to_status)]
+
+
+def _statuses(values: Iterable[str], name: str) -> List[str]:
+    values = [str(value).strip().lower() for value in values]
+    unknown = [value for value in values if value not in STATUSES]
+    if unknown:
+        raise ValueError(f"{name} must be one of: {', '.join(STATUSES)}")
+    return values
+
+
+class ApplicationStatusService:
+    def __init__(self):
+        self.app = None
+        self.max_batch = 20000
+
+    def init_app(self, app: Flask):
+        """Initialize the status service with Flask app"""
+        self.app = app
+        self.max_batch = app.config.get('APPLICATION_TRANSITION_MAX_BATCH', 20000)
+        app.extensions['application_status'] = self
+
+    def transition(self, to_status: str, application_ids: Optional[Iterable[int]] = None,
+                   drive_id: Optional[int] = None, from_statuses: Optional[Iterable[str]] = None,
+                   changed_by: Optional[int] = None, correction: bool = False, session=None) -> Dict[str, Any]:
+        """Move the selected applications to ``to_status`` where the state machine allows it.
+
+        With ``correction`` the applications in ``from_statuses`` move
+        regardless of ``TRANSITIONS``; this undoes an earlier mistaken move
+        (a corrected result sheet) and is recorded in the history like any
+        other change. Runs in ``session`` (the Flask-SQLAlchemy session by
+        default) without committing, so callers can combine it with their
+        own writes.
+        """
+        session = session or db.session
+        to_status = _statuses([to_status], 'status')[0]
+        if application_ids is None and drive_id is None:
+            raise ValueError('application_ids or drive_id is required')
+
+        if correction:
+            if not from_statuses:
+                raise ValueError('from is required for a correction')
+            allowed = [status for status in _statuses(from_statuses, 'from') if status != to_status]
+        else:
+            allowed = sources(to_status)
+            if from_statuses:
+                requested = set(_statuses(from_statuses, 'from'))
+                allowed = [status for status in allowed if status in requested]
+
+        conditions = [StudentApplication.application_status.in_(allowed)]
+        requested_ids = None
+        if application_ids is not None:
+            requested_ids = sorted({int(application_id) for application_id in application_ids})
+            if len(requested_ids) > self.max_batch:
+                raise ValueError(f'At most {self.max_batch} applications per transition')
+            conditions.append(StudentApplication.id.in_(requested_ids))
+        if drive_id is not None:
+            conditions.append(StudentApplication.drive_id == drive_id)
+
+        moved = []
+        if allowed and requested_ids != []:
+            moved = session.execute(
+                select(StudentApplication.id, StudentApplication.application_status)
+                .where(*conditions).with_for_update()
+            ).all()
+            if len(moved) > self.max_batch:
+                raise ValueError(f'At most {self.max_batch} applications per transition')
+
+        moved_ids = [application_id for application_id, _ in moved]
+        if moved:
+            now = datetime.utcnow()
+            session.execute(
+                update(StudentApplication)
+                .where(StudentApplication.id.in_(moved_ids), StudentApplication.application_status.in_(allowed))
+                .values(application_status=to_status, updated_at=now),
+                execution_options={'synchronize_session': False})
+            session.execute(insert(ApplicationStatusHistory), [
+                {'application_id': application_id, 'from_status': from_status, 'to_status': to_status,
+                 'changed_by': changed_by, 'changed_at': now}
+                for application_id, from_status in moved])
+            change_feed.record(session, StudentApplication.__tablename__, 'update', moved_ids, HISTORY_FIELDS)
+            change_feed.record(session, ApplicationStatusHistory.__tablename__, 'insert')
+
+        return {
+            'status': to_status,
+            'updated': len(moved),
+            'skipped': len(requested_ids) - len(moved) if requested_ids is not None else None,
+            'from': dict(Counter(from_status for _, from_status in moved)),
+            'application_ids': moved_ids,
+        }
+
+    def history(self, application_id: int) -> List[Dict[str, Any]]:
+        """Status changes of one application, oldest first"""
+        rows = ApplicationStatusHistory.query.filter_by(application_id=application_id).order_by(
+            ApplicationStatusHistory.changed_at, ApplicationStatusHistory.id).all()
+        return [row.to_dict() for row in rows]
+
+    def normalize(self, changed_by: Optional[int] = None) -> Dict[str, int]:
+        """Rewrite legacy and unknown status values; commits and returns counts per old value"""
+        known = list(STATUSES)
+        rows = db.session.execute(
+            select(StudentApplication.id, StudentApplication.application_status)
+            .where((StudentApplication.application_status.notin_(known)) |
+                   (StudentApplication.application_status.is_(None)))
+            .with_for_update()
+        ).all()
+        if not rows:
+            return {}
+
+        now = datetime.utcnow()
+        targets: Dict[str, List[int]] = {}
+        for application_id, status in rows:
+            # Anything unrecognised goes back to the start of the pipeline
+            targets.setdefault(LEGACY_STATUSES.get((status or '').lower(), 'applied'), []).append(application_id)
+        try:
+            for to_status, ids in targets.items():
+                db.session.execute(
+                    update(StudentApplication).where(StudentApplication.id.in_(ids))
+                    .values(application_status=to_status, updated_at=now),
+                    execution_options={'synchronize_session': False})
+                change_feed.record(db.session, StudentApplication.__tablename__, 'update', ids, HISTORY_FIELDS)
+            db.session.execute(insert(ApplicationStatusHistory), [
+                {'application_id': application_id, 'from_status': status,
+                 'to_status': LEGACY_STATUSES.get((status or '').lower(), 'applied'),
+                 'changed_by': changed_by, 'changed_at': now}
+                for application_id, status in rows])
+            change_feed.record(db.session, ApplicationStatusHistory.__tablename__, 'insert')
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return dict(Counter(status for _, status in rows))
+
+
+# Global application status service instance
+application_status = ApplicationStatusService()
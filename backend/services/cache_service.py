@@ -0,0 +1,396 @@
+"""Shared cache with Redis and in-process backends.
+
+Values are JSON-encoded, so a cached value is whatever ``jsonify`` would
+send: datetimes come back as ISO strings and Decimals as floats.
+
+* **Namespaces** — ``cache_service.namespace('dashboard')`` prefixes keys so
+  features cannot collide and can be reasoned about separately.
+* **TTL** — every entry expires; ``CACHE_DEFAULT_TTL`` seconds by default.
+* **Tags** — an entry stores the version of each of its tags when it was
+  computed. ``invalidate_tags`` bumps those versions, which makes every
+  entry carrying the tag stale without scanning keys. Table names are used
+  as tags and are invalidated automatically from the change feed.
+  ``row_tags(table, pk)`` tags an entry with a single row instead, so a
+  change to one student's profile only invalidates that student's entries.
+* **get_or_compute** — concurrent misses within a worker share one
+  in-flight computation; across workers a short ``SET NX`` lock elects one
+  computer and the others poll for its result, computing themselves only if
+  it does not appear within ``CACHE_LOCK_TIMEOUT``.
+
+``REDIS_URL`` selects Redis so hits and tag versions are shared across
+gunicorn workers; without it (or without the ``redis`` package) an
+in-process LRU is used. Its tag counters only see this worker's commits, so
+each tag's version also includes its table's shared ``data_versions`` row
+(see ``change_feed``): a write in any worker makes the entries stale, at
+table rather than row granularity. Backend errors are logged and treated as
+misses.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import Flask
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from services.singleflight import SingleFlight
+from utils.json_provider import dumps_bytes, loads
+from utils.lazy_imports import optional_import
+
+
+class MemoryBackend:
+    """Thread-safe in-process LRU store with per-key expiry"""
+
+    # Entries and counters are private to this process
+    shared = False
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        # Counters (tag versions) are kept apart so LRU eviction cannot reset them
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        with self._lock:
+            return [str(self._counters[key]).encode() if key in self._counters else self._live(key, now)
+                    for key in keys]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Set only if absent; returns whether the key was set"""
+        with self._lock:
+            if self._live(key, time.monotonic()) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+                self._counters.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+
+class RedisBackend:
+    """Store backed by a redis-py compatible client (redis, fakeredis)"""
+
+    shared = True
+
+    def __init__(self, client, key_prefix: str = ''):
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self.client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(key, value, px=int(ttl * 1000) if ttl else None, nx=True))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*keys)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+    def clear(self):
+        """Delete this application's keys only"""
+        for key in self.client.scan_iter(match=f'{self.key_prefix}*', count=500):
+            self.client.delete(key)
+
+
+# Commits touching more rows than this invalidate every row tag of the table
+ROW_TAG_LIMIT = 200
+
+
+def row_tags(table: str, pk: Any) -> List[str]:
+    """Tags for an entry that depends on one row of ``table``"""
+    return [f'{table}:{pk}', f'{table}:*']
+
+
+def make_key(*parts: Any) -> str:
+    """Stable cache key from arbitrary JSON-serializable parts"""
+    raw = dumps_bytes(parts)
+    if len(raw) <= 200:
+        return raw.decode('utf-8')
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class CacheNamespace:
+    """A view of the cache with keys prefixed by a namespace"""
+
+    def __init__(self, cache: 'CacheService', name: str):
+        self.cache = cache
+        self.name = name
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.cache.get(f'{self.name}:{key}', default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        self.cache.set(f'{self.name}:{key}', value, ttl, tags)
+
+    def delete(self, key: str):
+        self.cache.delete(f'{self.name}:{key}')
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None,
+                       tags: Iterable[str] = (), should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        return self.cache.get_or_compute(f'{self.name}:{key}', compute, ttl, tags, should_cache)
+
+
+class CacheService:
+    def __init__(self):
+        self.app = None
+        self.backend = MemoryBackend()
+        self.key_prefix = 'placement:'
+        self.default_ttl = 300
+        self.lock_timeout = 10.0
+        self.poll_interval = 0.05
+        self.stats = {'hits': 0, 'misses': 0, 'errors': 0, 'lock_waits': 0}
+        self._flight = SingleFlight('cache')
+        self._change_feed = None
+
+    def init_app(self, app: Flask):
+        """Initialize the cache service with Flask app"""
+        self.app = app
+        self.key_prefix = app.config.get('CACHE_KEY_PREFIX', 'placement') + ':'
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 300)
+        self.lock_timeout = app.config.get('CACHE_LOCK_TIMEOUT', 10.0)
+        self.backend = self._create_backend(app.config)
+        app.extensions['cache_service'] = self
+
+        from services.change_feed import change_feed
+        change_feed.subscribe('*', self._on_change)
+        self._change_feed = change_feed
+
+    def _create_backend(self, config):
+        """Redis when ``REDIS_URL`` is set and redis-py is installed"""
+        backend = config.get('CACHE_BACKEND', 'redis' if config.get('REDIS_URL') else 'memory')
+        if backend == 'redis':
+            redis = optional_import('redis')
+            if redis is None:
+                print("redis package not available - using in-process cache")
+            else:
+                client = redis.Redis.from_url(
+                    config['REDIS_URL'],
+                    socket_timeout=config.get('CACHE_REDIS_TIMEOUT', 0.5),
+                    socket_connect_timeout=config.get('CACHE_REDIS_TIMEOUT', 0.5)
+                )
+                return RedisBackend(client, self.key_prefix)
+        return MemoryBackend(config.get('CACHE_MAX_ENTRIES', 10000))
+
+    def use_backend(self, backend):
+        """Swap the backend (e.g. ``RedisBackend(fakeredis.FakeRedis())``)"""
+        self.backend = backend
+
+    def namespace(self, name: str) -> CacheNamespace:
+        return CacheNamespace(self, name)
+
+    def _key(self, key: str) -> str:
+        return f'{self.key_prefix}{key}'
+
+    def _tag_key(self, tag: str) -> str:
+        return f'{self.key_prefix}tag:{tag}'
+
+    def _versions(self, tags: List[str], raw: List[Optional[bytes]]) -> Dict[str, int]:
+        """Tag versions from their counters (``raw``, in ``tags`` order)"""
+        versions = {tag: int(v) if v is not None else 0 for tag, v in zip(tags, raw)}
+        if tags and not self.backend.shared and self._change_feed is not None:
+            # Other workers' commits only reach the shared table versions
+            tables = self._change_feed.versions(tag.split(':', 1)[0] for tag in tags)
+            versions = {tag: version + tables[tag.split(':', 1)[0]] for tag, version in versions.items()}
+        return versions
+
+    def _read(self, key: str, tags: Iterable[str] = ()):
+        """Return ``(found, value, tag_versions)`` in one backend round trip"""
+        tags = sorted(set(tags))
+        raw = self.backend.get_many([self._key(key)] + [self._tag_key(t) for t in tags])
+        versions = self._versions(tags, raw[1:])
+        if raw[0] is None:
+            return False, None, versions
+
+        entry = loads(raw[0])
+        stored = entry.get('t', {})
+        entry_tags = set(stored)
+        if entry_tags - set(tags):
+            # Entry was stored with tags the caller did not pass; check them too
+            extra = sorted(entry_tags - set(tags))
+            versions.update(self._versions(extra, self.backend.get_many([self._tag_key(t) for t in extra])))
+        if any(versions.get(tag, 0) != version for tag, version in stored.items()):
+            return False, None, versions
+        return True, entry.get('v'), versions
+
+    def _write(self, key: str, value: Any, ttl: Optional[float], tag_versions: Dict[str, int]):
+        entry = dumps_bytes({'t': tag_versions, 'v': value})
+        self.backend.set(self._key(key), entry, ttl if ttl is not None else self.default_ttl)
+
+    def get(self, key: str, default: Any = None, tags: Iterable[str] = ()) -> Any:
+        try:
+            found, value, _ = self._read(key, tags)
+        except Exception as e:
+            self._error('get', e)
+            return default
+        self.stats['hits' if found else 'misses'] += 1
+        return value if found else default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        try:
+            tags = sorted(set(tags))
+            raw = self.backend.get_many([self._tag_key(t) for t in tags]) if tags else []
+            self._write(key, value, ttl, self._versions(tags, raw))
+        except Exception as e:
+            self._error('set', e)
+
+    def delete(self, key: str):
+        try:
+            self.backend.delete(self._key(key))
+        except Exception as e:
+            self._error('delete', e)
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        """Make every entry carrying any of ``tags`` stale"""
+        for tag in set(tags):
+            try:
+                self.backend.incr(self._tag_key(tag))
+            except Exception as e:
+                self._error('invalidate', e)
+
+    def clear(self):
+        try:
+            self.backend.clear()
+        except Exception as e:
+            self._error('clear', e)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None,
+                       tags: Iterable[str] = (), should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Return the cached value for ``key`` or compute, store and return it.
+
+        Concurrent misses in this process share one computation; across
+        processes the ``SET NX`` lock elects a single computer. Tag versions
+        are read before computing, so an invalidation that lands while the
+        value is being computed leaves the stored entry stale rather than
+        hiding the change. ``should_cache`` can veto storing a result (e.g.
+        error payloads).
+        """
+        tags = tuple(tags)
+        try:
+            found, value, versions = self._read(key, tags)
+        except Exception as e:
+            self._error('get', e)
+            return compute()
+        if found:
+            self.stats['hits'] += 1
+            return value
+        self.stats['misses'] += 1
+
+        return self._flight.do(
+            key, lambda: self._compute_locked(key, compute, ttl, tags, versions, should_cache))
+
+    def _compute_locked(self, key, compute, ttl, tags, versions, should_cache):
+        """Compute under the cross-process lock, or wait for its holder"""
+        lock_key = self._key(f'lock:{key}')
+        try:
+            acquired = self.backend.add(lock_key, b'1', self.lock_timeout)
+        except Exception as e:
+            self._error('lock', e)
+            acquired = True
+            lock_key = None
+
+        if not acquired:
+            self.stats['lock_waits'] += 1
+            found, value = self._wait_for(key, tags)
+            if found:
+                return value
+            lock_key = None
+
+        try:
+            value = compute()
+            if should_cache is None or should_cache(value):
+                try:
+                    self._write(key, value, ttl, versions)
+                except Exception as e:
+                    self._error('set', e)
+            return value
+        finally:
+            if lock_key is not None:
+                try:
+                    self.backend.delete(lock_key)
+                except Exception as e:
+                    self._error('unlock', e)
+
+    def _wait_for(self, key: str, tags: Iterable[str]):
+        """Poll for a value another worker is computing"""
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            try:
+                found, value, _ = self._read(key, tags)
+            except Exception as e:
+                self._error('get', e)
+                return False, None
+            if found:
+                return True, value
+        return False, None
+
+    def _on_change(self, events):
+        tables = {}
+        for event in events:
+            tables.setdefault(event.table, set()).add(event.pk)
+
+        tags = set(tables)
+        for table, pks in tables.items():
+            # Statements without primary keys (Core bulk updates) and very
+            # large commits invalidate every row of the table
+            if None in pks or len(pks) > ROW_TAG_LIMIT:
+                tags.add(f'{table}:*')
+            else:
+                tags.update(f'{table}:{pk}' for pk in pks)
+        self.invalidate_tags(tags)
+
+    def _error(self, operation: str, error: Exception):
+        self.stats['errors'] += 1
+        print(f"Cache {operation} failed: {str(error)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats['hits'] + self.stats['misses']
+        return dict(self.stats, backend=type(self.backend).__name__,
+                    hit_rate=round(self.stats['hits'] / total * 100, 2) if total else 0)
+
+
+# Global cache service instance
+cache_service = CacheService()
@@ -0,0 +1,154 @@
+"""Change feed for committed model writes.
+
+SQLAlchemy session events collect which rows were inserted, updated or
+deleted during a transaction. After the transaction commits the feed
+
+* bumps a per-table counter in ``data_versions`` (in its own short
+  transaction, so writers do not hold an extra row lock while they work), and
+* hands the change events to subscribers (cache invalidation, search index,
+  re-scoring jobs).
+
+Readers use :meth:`ChangeFeed.versions` as a cheap validator: if the
+versions of the tables behind a response have not moved, neither has the
+response.
+
+Core ``update()``/``insert()`` statements bypass the ORM unit of work; code
+that issues them should call :meth:`ChangeFeed.record` so the change is
+still published.
+"""
+from collections import defaultdict, namedtuple
+from datetime import datetime
+
+from sqlalchemy import event, inspect, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from models import db, DataVersion
+
+ChangeEvent = namedtuple('ChangeEvent', ['table', 'op', 'pk', 'changed'])
+
+_PENDING_KEY = 'change_feed.pending'
+
+
+class ChangeFeed:
+    """Collect row changes per transaction and publish them after commit"""
+
+    def __init__(self):
+        self.app = None
+        self._subscribers = defaultdict(list)
+        self._listening = False
+
+    def init_app(self, app):
+        """Attach the session listeners"""
+        self.app = app
+        app.extensions['change_feed'] = self
+        if not self._listening:
+            event.listen(db.session, 'after_flush', self._after_flush)
+            event.listen(db.session, 'after_commit', self._after_commit)
+            event.listen(db.session, 'after_soft_rollback', self._after_rollback)
+            self._listening = True
+
+    def subscribe(self, tables, callback):
+        """Call ``callback(events)`` after each commit touching ``tables``.
+
+        ``events`` is the list of :class:`ChangeEvent` for those tables;
+        ``'*'`` subscribes to every table. Subscribers run after the data is
+        committed; exceptions are logged and do not affect the request.
+        """
+        if isinstance(tables, str):
+            tables = [tables]
+        for table in tables:
+            if callback not in self._subscribers[table]:
+                self._subscribers[table].append(callback)
+
+    def record(self, session, table, op, pks=(), changed=()):
+        """Register changes made with Core statements in ``session``"""
+        pending = session.info.setdefault(_PENDING_KEY, [])
+        changed = tuple(changed)
+        if not pks:
+            pending.append(ChangeEvent(table, op, None, changed))
+        for pk in pks:
+            pending.append(ChangeEvent(table, op, pk, changed))
+
+    def versions(self, tables):
+        """Current version of each table, 0 for tables never written"""
+        tables = sorted(set(tables))
+        stmt = select(DataVersion.table_name, DataVersion.version).where(
+            DataVersion.table_name.in_(tables))
+        found = dict(db.session.execute(stmt).all())
+        return {table: found.get(table, 0) for table in tables}
+
+    def bump(self, tables):
+        """Increment the version of ``tables`` in a separate transaction"""
+        tables = sorted(set(tables))
+        if not tables:
+            return
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as connection:
+                for table in tables:
+                    self._bump_one(connection, table, now)
+        except SQLAlchemyError as e:
+            print(f"Error bumping data versions: {str(e)}")
+
+    def _bump_one(self, connection, table, now):
+        stmt = (update(DataVersion)
+                .where(DataVersion.table_name == table)
+                .values(version=DataVersion.version + 1, updated_at=now))
+        if connection.execute(stmt).rowcount:
+            return
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(DataVersion).values(
+                    table_name=table, version=1, updated_at=now))
+        except IntegrityError:
+            # Another worker created the row first
+            connection.execute(stmt)
+
+    def _after_flush(self, session, flush_context):
+        pending = session.info.setdefault(_PENDING_KEY, [])
+        for op, objects in (('insert', session.new), ('update', session.dirty),
+                            ('delete', session.deleted)):
+            for obj in objects:
+                table = getattr(obj, '__tablename__', None)
+                if table is None or table == DataVersion.__tablename__:
+                    continue
+                changed = ()
+                if op == 'update':
+                    state = inspect(obj)
+                    changed = tuple(attr.key for attr in state.attrs
+                                    if attr.history.has_changes())
+                    if not changed:
+                        continue
+                pending.append(ChangeEvent(table, op, getattr(obj, 'id', None), changed))
+
+    def _after_commit(self, session):
+        pending = session.info.pop(_PENDING_KEY, None)
+        if not pending:
+            return
+
+        by_table = defaultdict(list)
+        for change in pending:
+            by_table[change.table].append(change)
+
+        self.bump(by_table)
+
+        notified = {}
+        for callback in self._subscribers.get('*', ()):
+            notified[callback] = list(pending)
+        for table, changes in by_table.items():
+            for callback in self._subscribers.get(table, ()):
+                if callback not in self._subscribers.get('*', ()):
+                    notified.setdefault(callback, []).extend(changes)
+        for callback, changes in notified.items():
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"Error in change feed subscriber: {str(e)}")
+
+    def _after_rollback(self, session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(_PENDING_KEY, None)
+
+
+# Global change feed instance
+change_feed = ChangeFeed()
@@ -1,7 +1,13 @@
 from flask import Flask
 from flask_mail import Mail, Message
+from sqlalchemy import insert
 from models import User, EmailTemplate, EmailLog, db
+from services.cache_service import cache_service
+from datetime import datetime
 import os
+import threading
+
+template_cache = cache_service.namespace('email_templates')
 
 class EmailService:
     def __init__(self):
@@ -11,6 +17,7 @@ class EmailService:
         """Initialize the email service with Flask app"""
         self.mail.init_app(app)
         self.app = app
+        app.extensions['email_service'] = self
     
     def send_email(self, recipient_email, subject, content, template_id=None, recipient_user_id=None):
         """Send email to a recipient"""
@@ -55,13 +62,13 @@ class EmailService:
         """Send email using a template"""
         try:
             # Get template
-            template = EmailTemplate.query.filter_by(template_name=template_name).first()
+            template = self.get_template(template_name)
             if not template:
                 return False, "Template not found"
             
             # Replace variables in subject and content
-            subject = template.subject
-            content = template.content
+            subject = template['subject']
+            content = template['content']
             
             for key, value in variables.items():
                 placeholder = f"{{{{{key}}}}}"
@@ -73,7 +80,7 @@ class EmailService:
                 recipient_email=recipient_email,
                 subject=subject,
                 content=content,
-                template_id=template.id,
+                template_id=template['id'],
                 recipient_user_id=recipient_user_id
             )
             
@@ -181,11 +188,85 @@ class EmailService:
         
         return results
     
+    def queue_templated_emails(self, template_name, recipients):
+        """Render a template for many recipients and send them in the background.
+
+        ``recipients`` are dicts with ``email``, ``variables`` and optionally
+        ``user_id``. The messages go out over a single SMTP connection and
+        their log rows are written with one INSERT afterwards. Returns the
+        number of emails queued.
+        """
+        template = self.get_template(template_name)
+        if not template or not recipients:
+            return 0
+
+        rows = []
+        for recipient in recipients:
+            subject = template['subject']
+            content = template['content']
+            for key, value in recipient.get('variables', {}).items():
+                placeholder = f"{{{{{key}}}}}"
+                subject = subject.replace(placeholder, str(value))
+                content = content.replace(placeholder, str(value))
+            rows.append({
+                'recipient_email': recipient['email'],
+                'recipient_user_id': recipient.get('user_id'),
+                'subject': subject[:255],
+                'content': content,
+                'template_id': template['id'],
+                'status': 'pending',
+                'error_message': None
+            })
+
+        threading.Thread(target=self._send_batch, args=(rows,), name='email-batch', daemon=True).start()
+        return len(rows)
+
+    def _send_batch(self, rows):
+        with self.app.app_context():
+            try:
+                if self.app.config.get('MAIL_USERNAME') and self.app.config.get('MAIL_PASSWORD'):
+                    with self.mail.connect() as connection:
+                        for row in rows:
+                            try:
+                                connection.send(Message(subject=row['subject'], recipients=[row['recipient_email']],
+                                                        body=row['content']))
+                                row['status'] = 'sent'
+                            except Exception as e:
+                                row.update(status='failed', error_message=str(e))
+                else:
+                    # Demo mode - just log the batch
+                    print(f"Demo Email batch - {len(rows)} emails, first: {rows[0]['subject']}")
+                    for row in rows:
+                        row['status'] = 'sent'
+            except Exception as e:
+                # Could not connect; everything not sent yet failed
+                for row in rows:
+                    if row['status'] == 'pending':
+                        row.update(status='failed', error_message=str(e))
+
+            now = datetime.utcnow()
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(insert(EmailLog), [dict(row, sent_at=now) for row in rows])
+            except Exception as e:
+                print(f"Error logging email batch: {str(e)}")
+
+    def get_template(self, template_name):
+        """Get a template by name, served from the cache on repeat sends"""
+        def load():
+            template = EmailTemplate.query.filter_by(template_name=template_name).first()
+            return template.to_dict() if template else None
+        
+        return template_cache.get_or_compute(f'name:{template_name}', load, tags=['email_templates'])
+    
     def get_email_templates(self):
         """Get all email templates"""
         try:
-            templates = EmailTemplate.query.all()
-            return [template.to_dict() for template in templates]
+            return template_cache.get_or_compute(
+                'all',
+                lambda: [template.to_dict() for template in EmailTemplate.query.all()],
+                tags=['email_templates']
+            )
         except Exception as e:
             return []
     
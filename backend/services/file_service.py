@@ -1,37 +1,39 @@
 from flask import Flask
 import os
 import uuid
-from typing import Dict, List, Any
+from typing import Any, BinaryIO, Dict, List
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 import mimetypes
 from datetime import datetime
 
 class FileService:
+    # Upload directories already known to exist, shared by every app instance
+    _prepared_directories = set()
+    
     def __init__(self):
         self.app = None
+        self.upload_folder = 'uploads'
         self.allowed_extensions = {'pdf', 'doc', 'docx', 'txt'}
         self.max_file_size = 16 * 1024 * 1024  # 16MB
     
     def init_app(self, app: Flask):
-        """Initialize the file service with Flask app"""
+        """Initialize the file service with Flask app.
+
+        Upload directories are created lazily on first write instead of at
+        startup, so booting a worker does not touch the filesystem.
+        """
         self.app = app
         self.upload_folder = app.config.get('UPLOAD_FOLDER', 'uploads')
-        self._create_upload_directories()
+        app.extensions['file_service'] = self
     
-    def _create_upload_directories(self):
-        """Create necessary upload directories"""
-        directories = [
-            self.upload_folder,
-            os.path.join(self.upload_folder, 'resumes'),
-            os.path.join(self.upload_folder, 'offer_letters'),
-            os.path.join(self.upload_folder, 'reports'),
-            os.path.join(self.upload_folder, 'company_logos'),
-            os.path.join(self.upload_folder, 'profile_images')
-        ]
-        
-        for directory in directories:
+    def _category_path(self, category: str) -> str:
+        """Return the directory for an upload category, creating it once"""
+        directory = os.path.join(self.upload_folder, category)
+        if directory not in self._prepared_directories:
             os.makedirs(directory, exist_ok=True)
+            self._prepared_directories.add(directory)
+        return directory
     
     def allowed_file(self, filename):
         """Check if file extension is allowed"""
@@ -53,7 +55,7 @@ class FileService:
             # Generate unique filename
             file_extension = file.filename.rsplit('.', 1)[1].lower()
             filename = f"resume_{student_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
-            filepath = os.path.join(self.upload_folder, 'resumes', filename)
+            filepath = os.path.join(self._category_path('resumes'), filename)
             
             # Save file
             file.save(filepath)
@@ -73,6 +75,65 @@ class FileService:
         except Exception as e:
             return {'success': False, 'error': f'File upload failed: {str(e)}'}
     
+    def save_resume_stream(self, stream: BinaryIO, student_id: str, file_extension: str) -> Dict[str, str]:
+        """Save a resume read from a stream (e.g. a ZIP member) in chunks"""
+        file_extension = file_extension.lower().lstrip('.')
+        if file_extension not in self.allowed_extensions:
+            return {'success': False, 'error': 'File type not allowed'}
+        
+        filename = f"resume_{student_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
+        filepath = os.path.join(self._category_path('resumes'), filename)
+        try:
+            size = 0
+            with open(filepath, 'wb') as output:
+                for chunk in iter(lambda: stream.read(64 * 1024), b''):
+                    size += len(chunk)
+                    # Declared sizes in an archive can lie; count what is written
+                    if size > self.max_file_size:
+                        break
+                    output.write(chunk)
+            if size > self.max_file_size:
+                os.remove(filepath)
+                return {'success': False, 'error': 'File size exceeds limit'}
+            
+            return {
+                'success': True,
+                'filename': filename,
+                'filepath': filepath,
+                'size': size,
+                'uploaded_at': datetime.utcnow().isoformat()
+            }
+        except Exception as e:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            return {'success': False, 'error': f'File upload failed: {str(e)}'}
+    
+    def save_import_archive(self, file: FileStorage, job_id: str) -> Dict[str, str]:
+        """Save an uploaded ZIP of resumes for bulk import"""
+        try:
+            if not file or not file.filename:
+                return {'success': False, 'error': 'No file provided'}
+            
+            if not file.filename.lower().endswith('.zip'):
+                return {'success': False, 'error': 'ZIP archive required'}
+            
+            filepath = os.path.join(self._category_path('imports'), f"resumes_{job_id}.zip")
+            file.save(filepath)
+            
+            if os.path.exists(filepath):
+                return {
+                    'success': True,
+                    'filename': os.path.basename(filepath),
+                    'filepath': filepath,
+                    'size': os.path.getsize(filepath),
+                    'uploaded_at': datetime.utcnow().isoformat()
+                }
+            else:
+                return {'success': False, 'error': 'Failed to save file'}
+                
+        except Exception as e:
+            return {'success': False, 'error': f'File upload failed: {str(e)}'}
+    
     def save_offer_letter(self, file: FileStorage, application_id: str) -> Dict[str, str]:
         """Save offer letter file"""
         try:
@@ -88,7 +149,7 @@ class FileService:
             # Generate unique filename
             file_extension = file.filename.rsplit('.', 1)[1].lower()
             filename = f"offer_letter_{application_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
-            filepath = os.path.join(self.upload_folder, 'offer_letters', filename)
+            filepath = os.path.join(self._category_path('offer_letters'), filename)
             
             # Save file
             file.save(filepath)
@@ -125,7 +186,7 @@ class FileService:
             
             # Generate unique filename
             filename = f"logo_{company_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
-            filepath = os.path.join(self.upload_folder, 'company_logos', filename)
+            filepath = os.path.join(self._category_path('company_logos'), filename)
             
             # Save file
             file.save(filepath)
@@ -162,7 +223,7 @@ class FileService:
             
             # Generate unique filename
             filename = f"profile_{user_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
-            filepath = os.path.join(self.upload_folder, 'profile_images', filename)
+            filepath = os.path.join(self._category_path('profile_images'), filename)
             
             # Save file
             file.save(filepath)
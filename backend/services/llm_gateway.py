@@ -0,0 +1,299 @@
+"""Guarded access to the LLM API.
+
+Every completion goes through ``llm_gateway.run`` (or ``llm_gateway.stream``
+for streamed completions), which adds:
+
+* **a deadline** — each call gets ``LLM_DEADLINE`` seconds in total;
+  every attempt's HTTP timeout is capped by what is left of it;
+* **bounded concurrency** — at most ``LLM_MAX_CONCURRENCY`` calls are in
+  flight per worker. A caller that cannot get a slot within
+  ``LLM_QUEUE_TIMEOUT`` seconds gets ``LLMBusy`` straight away instead of
+  tying up the worker;
+* **retries** — timeouts, connection errors, 429 and 5xx responses are
+  retried up to ``LLM_MAX_RETRIES`` times with exponential backoff and
+  full jitter (a ``Retry-After`` header is honoured), never past the
+  deadline;
+* **a circuit breaker** — when at least ``LLM_BREAKER_ERROR_RATE`` of the
+  last ``LLM_BREAKER_WINDOW`` calls failed, calls are refused with
+  ``CircuitOpen`` for ``LLM_BREAKER_COOLDOWN`` seconds. Then a single probe
+  is let through; its outcome closes or re-opens the circuit.
+
+While the circuit is open ``ai_service.is_enabled()`` is false, so routes
+and ``AIService`` take their existing fallback paths. State is per worker
+process; counters are reported under ``llm.*`` in ``/api/metrics``.
+"""
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+from flask import Flask, jsonify
+
+from services.metrics import metrics
+
+# HTTP statuses worth retrying
+RETRYABLE_STATUSES = frozenset((408, 409, 429, 500, 502, 503, 504))
+# OpenAI SDK errors without a status code that are worth retrying
+RETRYABLE_ERRORS = ('APITimeoutError', 'APIConnectionError', 'Timeout', 'TimeoutError', 'ConnectionError')
+
+
+class LLMUnavailable(Exception):
+    """The LLM cannot be called right now; use the fallback"""
+
+    status_code = 503
+    retry_after = 1
+
+
+class LLMBusy(LLMUnavailable):
+    """All LLM slots of this worker are taken"""
+
+    status_code = 429
+
+
+class CircuitOpen(LLMUnavailable):
+    """Recent LLM calls mostly failed; calls are paused"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class LLMDeadlineExceeded(LLMUnavailable):
+    """The call did not finish within its deadline"""
+
+    status_code = 504
+
+
+def is_retryable(error: Exception) -> bool:
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a ``Retry-After`` response header, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    try:
+        return float(headers.get('retry-after')) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Error-rate breaker over a sliding window of recent calls"""
+
+    def __init__(self, window: int = 20, error_rate: float = 0.5, min_calls: int = 5, cooldown: float = 30.0):
+        self.window = window
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allows(self) -> bool:
+        """Whether a call would currently be let through (does not reserve it)"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                return time.monotonic() - self._opened_at >= self.cooldown
+            return not self._probing
+
+    def before_call(self):
+        """Reserve a call or raise ``CircuitOpen``"""
+        with self._lock:
+            if self.state == 'open':
+                remaining = self.cooldown - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpen('LLM calls are paused after repeated failures', remaining)
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'half_open':
+                if self._probing:
+                    raise CircuitOpen('LLM availability is being probed', self.cooldown)
+                self._probing = True
+
+    def record(self, success: bool):
+        with self._lock:
+            if self.state == 'half_open':
+                self._probing = False
+                if success:
+                    self.state = 'closed'
+                    self._outcomes.clear()
+                    metrics.incr('llm.breaker.closed')
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (self.state == 'closed' and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.error_rate):
+                self._open()
+
+    def release(self):
+        """Give back a reserved probe that was never made"""
+        with self._lock:
+            if self.state == 'half_open':
+                self._probing = False
+
+    def _open(self):
+        self.state = 'open'
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        metrics.incr('llm.breaker.opened')
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': self._outcomes.count(False)
+            }
+
+
+class LLMGateway:
+    def __init__(self):
+        self.app = None
+        self.deadline = 30.0
+        self.attempt_timeout = 20.0
+        self.queue_timeout = 0.5
+        self.max_retries = 2
+        self.backoff_base = 0.5
+        self.backoff_cap = 8.0
+        self.max_concurrency = 4
+        self.breaker = CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    def init_app(self, app: Flask):
+        """Initialize the gateway with Flask app"""
+        self.app = app
+        self.deadline = app.config.get('LLM_DEADLINE', 30.0)
+        self.attempt_timeout = app.config.get('LLM_ATTEMPT_TIMEOUT', 20.0)
+        self.queue_timeout = app.config.get('LLM_QUEUE_TIMEOUT', 0.5)
+        self.max_retries = app.config.get('LLM_MAX_RETRIES', 2)
+        self.backoff_base = app.config.get('LLM_BACKOFF_BASE', 0.5)
+        self.backoff_cap = app.config.get('LLM_BACKOFF_CAP', 8.0)
+        self.breaker = CircuitBreaker(
+            window=app.config.get('LLM_BREAKER_WINDOW', 20),
+            error_rate=app.config.get('LLM_BREAKER_ERROR_RATE', 0.5),
+            min_calls=app.config.get('LLM_BREAKER_MIN_CALLS', 5),
+            cooldown=app.config.get('LLM_BREAKER_COOLDOWN', 30.0)
+        )
+        self.max_concurrency = app.config.get('LLM_MAX_CONCURRENCY', 4)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        app.extensions['llm_gateway'] = self
+
+    def available(self) -> bool:
+        """False while the circuit breaker is holding calls back"""
+        return self.breaker.allows()
+
+    def run(self, request: Callable[[float], Any], deadline: Optional[float] = None) -> Any:
+        """Call ``request(timeout)`` under the deadline, slot, retry and breaker rules"""
+        expires = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            self._reserve()
+            remaining = expires - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise LLMDeadlineExceeded('AI request deadline exceeded')
+                result = request(min(self.attempt_timeout, remaining))
+            except Exception as e:
+                delay = self._failed(e, attempt, expires)
+            else:
+                self.breaker.record(True)
+                return result
+            finally:
+                self._slots.release()
+
+            attempt += 1
+            metrics.incr('llm.retries')
+            time.sleep(delay)
+
+    def stream(self, request: Callable[[float], Iterable[str]], deadline: Optional[float] = None) -> Iterator[str]:
+        """Streaming counterpart of ``run``: yield the pieces of ``request(timeout)``.
+
+        The slot is held until the stream ends or the consumer closes it.
+        Failures before the first piece are retried like ``run``; after that
+        a retry would repeat output already forwarded, so they are raised.
+        The deadline is checked between pieces.
+        """
+        expires = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            self._reserve()
+            metrics.incr('llm.streams')
+            remaining = expires - time.monotonic()
+            started = False
+            try:
+                if remaining <= 0:
+                    raise LLMDeadlineExceeded('AI request deadline exceeded')
+                for piece in request(min(self.attempt_timeout, remaining)):
+                    if time.monotonic() > expires:
+                        raise LLMDeadlineExceeded('AI stream deadline exceeded')
+                    started = True
+                    yield piece
+            except GeneratorExit:
+                # Consumer went away (e.g. client disconnected); not the LLM's fault
+                self.breaker.release()
+                raise
+            except Exception as e:
+                delay = self._failed(e, attempt, expires, retry=not started)
+            else:
+                self.breaker.record(True)
+                return
+            finally:
+                self._slots.release()
+
+            attempt += 1
+            metrics.incr('llm.retries')
+            time.sleep(delay)
+
+    def _reserve(self):
+        """Pass the breaker and take a concurrency slot, or raise"""
+        self.breaker.before_call()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.breaker.release()
+            metrics.incr('llm.busy')
+            raise LLMBusy('Too many AI requests in progress, try again shortly')
+        metrics.incr('llm.calls')
+
+    def _failed(self, error: Exception, attempt: int, expires: float, retry: bool = True) -> float:
+        """Record a failed attempt and return the backoff before the next one, or raise"""
+        retryable = is_retryable(error) or isinstance(error, LLMDeadlineExceeded)
+        self.breaker.record(not retryable)
+        if not retryable:
+            raise error
+        metrics.incr('llm.failures')
+        delay = self._backoff(attempt, error)
+        if not retry or attempt >= self.max_retries or time.monotonic() + delay >= expires:
+            if isinstance(error, LLMUnavailable):
+                raise error
+            raise LLMDeadlineExceeded(f'AI request failed: {str(error)}') from error
+        return delay
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        hinted = _retry_after(error)
+        if hinted is not None:
+            return min(hinted, self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.breaker.snapshot(), max_concurrency=self.max_concurrency)
+
+
+def unavailable_response(error: LLMUnavailable):
+    """429/503/504 response with ``Retry-After`` for an unavailable LLM"""
+    response = jsonify({'error': str(error), 'retry_after': error.retry_after})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, error.status_code
+
+
+# Global LLM gateway instance
+llm_gateway = LLMGateway()
@@ -0,0 +1,517 @@
+"""Placement prediction from historical outcomes.
+
+A regularized logistic regression is trained with NumPy on every student
+whose outcome is known:
+
+* **placed** — an application was selected or has an offer that was not
+  declined;
+* **not placed** — every application has been decided without a
+  selection, or the student's batch has already graduated.
+
+Features are CGPA, number of skills, number of applications, share of
+recruitment rounds cleared (smoothed), years to graduation and department.
+Probabilities are calibrated with Platt scaling fitted on cross-fitted
+(out-of-fold) scores, and the out-of-fold AUC, Brier score and a
+reliability table are kept with the model.
+
+The model is saved to ``PLACEMENT_MODEL_PATH`` (``.npz``, no pickles) and
+reloaded by other workers when the file changes. It is retrained in the
+background, warm-started from the previous weights, when it is older than
+``PLACEMENT_MODEL_RETRAIN_INTERVAL`` seconds and the application, round
+result, offer or profile data changed. Scoring a student is one dot
+product on a handful of features.
+"""
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from flask import Flask
+from sqlalchemy import case, func, select
+
+from models import db, RoundResult, StudentApplication, StudentProfile, parse_json_list
+from services.change_feed import change_feed
+from services.recommendation_service import application_outcome
+from services.skill_extractor import skill_extractor
+from utils.lazy_imports import is_available, optional_import
+
+MODEL_VERSION = 1
+TRAINING_TABLES = ('student_profiles', 'student_applications', 'round_results', 'offer_letters')
+
+# Continuous features, standardized with the training mean and deviation
+NUMERIC_FEATURES = ('cgpa', 'skills', 'applications', 'rounds_cleared', 'years_to_graduation')
+FEATURE_LABELS = {
+    'cgpa': 'CGPA',
+    'skills': 'Number of skills',
+    'applications': 'Number of applications',
+    'rounds_cleared': 'Recruitment rounds cleared',
+    'years_to_graduation': 'Years to graduation'
+}
+
+# Raw columns produced by PlacementPredictor._rows
+(_ID, _CGPA, _SKILLS, _DEPARTMENT, _BATCH, _ACTIVE, _APPLICATIONS, _PLACED, _DECIDED, _PENDING,
+ _ROUNDS, _PASSED) = range(12)
+
+
+def _sigmoid(np, z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35.0, 35.0)))
+
+
+def fit_logistic(np, X, y, l2: float = 1.0, initial=None, max_iter: int = 50, tol: float = 1e-6):
+    """L2-regularized logistic regression by Newton's method.
+
+    Column 0 of ``X`` is the intercept and is not penalized. ``initial``
+    warm-starts the solver, which usually converges in two or three steps
+    when only a few outcomes changed.
+    """
+    n_features = X.shape[1]
+    weights = np.zeros(n_features) if initial is None else np.array(initial, dtype=float)
+    penalty = np.full(n_features, float(l2))
+    penalty[0] = 0.0
+    ridge = np.diag(penalty + 1e-9)
+    for _ in range(max_iter):
+        p = _sigmoid(np, X @ weights)
+        gradient = X.T @ (p - y) + penalty * weights
+        hessian = (X * (p * (1.0 - p))[:, None]).T @ X + ridge
+        step = np.linalg.solve(hessian, gradient)
+        weights -= step
+        if np.max(np.abs(step)) < tol:
+            break
+    return weights
+
+
+def _auc(np, scores, labels) -> Optional[float]:
+    """Area under the ROC curve (Mann-Whitney U with tied ranks)"""
+    positives = labels.sum()
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return None
+    order = np.argsort(scores, kind='mergesort')
+    ranks = np.empty(len(scores))
+    sorted_scores = scores[order]
+    # Average the ranks of tied scores
+    _, first, counts = np.unique(sorted_scores, return_index=True, return_counts=True)
+    ranks[order] = np.repeat(first + (counts + 1) / 2.0, counts)
+    return float((ranks[labels == 1].sum() - positives * (positives + 1) / 2.0) / (positives * negatives))
+
+
+class PlacementModel:
+    """Trained weights plus everything needed to featurize and calibrate"""
+
+    def __init__(self, np, weights, mean, std, departments: List[int], calibration,
+                 meta: Dict[str, Any], population: Optional[Dict[int, Any]] = None):
+        self.np = np
+        self.weights = weights
+        self.mean = mean
+        self.std = std
+        self.departments = list(departments)
+        self._department_index = {department: i for i, department in enumerate(self.departments)}
+        self.calibration = calibration
+        self.meta = meta
+        # batch year -> sorted calibrated probabilities of that batch's students
+        self.population = population or {}
+
+    @property
+    def feature_names(self) -> List[str]:
+        return ['intercept'] + list(NUMERIC_FEATURES) + [f'department:{d}' for d in self.departments]
+
+    def features(self, raw):
+        """Design matrix (intercept, standardized numerics, department one-hot)"""
+        np = self.np
+        numeric = raw[:, :len(NUMERIC_FEATURES)].copy()
+        # Missing CGPA counts as the training average
+        missing = np.isnan(numeric)
+        numeric[missing] = np.take(self.mean, np.nonzero(missing)[1])
+        X = np.zeros((len(raw), 1 + len(NUMERIC_FEATURES) + len(self.departments)))
+        X[:, 0] = 1.0
+        X[:, 1:1 + len(NUMERIC_FEATURES)] = (numeric - self.mean) / self.std
+        for row, department in enumerate(raw[:, -1]):
+            column = self._department_index.get(int(department)) if not np.isnan(department) else None
+            if column is not None:
+                X[row, 1 + len(NUMERIC_FEATURES) + column] = 1.0
+        return X
+
+    def calibrate(self, logits):
+        a, b = self.calibration
+        return _sigmoid(self.np, a * logits + b)
+
+    def predict(self, raw):
+        """Calibrated placement probabilities for raw feature rows"""
+        return self.calibrate(self.features(raw) @ self.weights)
+
+    def contributions(self, raw_row) -> List[Dict[str, Any]]:
+        """Per-feature effect on one student's score, largest first"""
+        X = self.features(raw_row[None, :])[0]
+        effects = []
+        for i, name in enumerate(NUMERIC_FEATURES, start=1):
+            effects.append({'feature': name, 'label': FEATURE_LABELS[name],
+                            'effect': round(float(self.weights[i] * X[i]), 3)})
+        for i, department in enumerate(self.departments, start=1 + len(NUMERIC_FEATURES)):
+            if X[i]:
+                effects.append({'feature': 'department', 'label': 'Department',
+                                'effect': round(float(self.weights[i]), 3)})
+        effects.sort(key=lambda item: abs(item['effect']), reverse=True)
+        return effects
+
+    def percentile(self, batch_year: int, probability: float) -> Optional[int]:
+        """Share of the batch with a lower predicted probability, 1-100"""
+        peers = self.population.get(int(batch_year))
+        if peers is None or not len(peers):
+            return None
+        below = int(self.np.searchsorted(peers, probability, side='left'))
+        return max(1, min(100, round(100 * below / len(peers))))
+
+    def save(self, path: str):
+        np = self.np
+        batches = sorted(self.population)
+        arrays = {
+            'weights': self.weights,
+            'mean': self.mean,
+            'std': self.std,
+            'departments': np.array(self.departments, dtype=np.int64),
+            'calibration': np.array(self.calibration, dtype=float),
+            'population_batches': np.array(batches, dtype=np.int64),
+            'population_sizes': np.array([len(self.population[b]) for b in batches], dtype=np.int64),
+            'population': (np.concatenate([self.population[b] for b in batches])
+                           if batches else np.zeros(0)),
+            'meta': np.array(json.dumps(self.meta))
+        }
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, np, path: str) -> 'PlacementModel':
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            population = {}
+            offset = 0
+            for batch, size in zip(data['population_batches'], data['population_sizes']):
+                population[int(batch)] = data['population'][offset:offset + size]
+                offset += size
+            return cls(np, data['weights'], data['mean'], data['std'], data['departments'].tolist(),
+                       tuple(data['calibration']), meta, population)
+
+
+class PlacementPredictor:
+    def __init__(self):
+        self.app = None
+        self.model_path = None
+        self.retrain_interval = 6 * 3600
+        self.check_interval = 60
+        self.l2 = 1.0
+        self.folds = 5
+        self.min_samples = 20
+        self._model = None
+        self._loaded_mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._training = False
+
+    def init_app(self, app: Flask):
+        """Initialize the predictor with Flask app.
+
+        The model is loaded from disk, or trained, on first use.
+        """
+        self.app = app
+        self.model_path = app.config.get('PLACEMENT_MODEL_PATH') or os.path.join(
+            app.instance_path, 'placement_model.npz')
+        self.retrain_interval = app.config.get('PLACEMENT_MODEL_RETRAIN_INTERVAL', 6 * 3600)
+        self.check_interval = app.config.get('PLACEMENT_MODEL_CHECK_INTERVAL', 60)
+        self.l2 = app.config.get('PLACEMENT_MODEL_L2', 1.0)
+        self.min_samples = app.config.get('PLACEMENT_MODEL_MIN_SAMPLES', 20)
+        self._model = None
+        self._loaded_mtime = None
+        self._checked_at = 0.0
+        app.extensions['placement_predictor'] = self
+
+    @staticmethod
+    def is_available() -> bool:
+        return is_available('numpy')
+
+    # --- Public API ---------------------------------------------------------
+
+    def predict_student(self, student_id: int) -> Optional[Dict[str, Any]]:
+        """Calibrated placement probability for one student, with its drivers"""
+        model = self.model()
+        rows = self._rows(StudentProfile.id == student_id)
+        if not rows:
+            return None
+        raw = self._raw(rows, model.meta['reference_year'])
+        probability = float(model.predict(raw)[0])
+        row = rows[0]
+        return {
+            'student_id': student_id,
+            'placed': bool(row[_PLACED]),
+            'probability': round(probability, 4),
+            'rank_percentile': model.percentile(row[_BATCH], probability),
+            'applications': int(row[_APPLICATIONS] or 0),
+            'rounds_taken': int(row[_ROUNDS] or 0),
+            'rounds_passed': int(row[_PASSED] or 0),
+            'factors': model.contributions(raw[0]),
+            'model': self.describe(model)
+        }
+
+    def predict_students(self, *criteria) -> List[Dict[str, Any]]:
+        """Probabilities for every active student matching ``criteria``"""
+        model = self.model()
+        rows = self._rows(*criteria)
+        if not rows:
+            return []
+        probabilities = model.predict(self._raw(rows, model.meta['reference_year']))
+        return [
+            {'student_id': row[_ID], 'batch_year': row[_BATCH], 'placed': bool(row[_PLACED]),
+             'probability': round(float(p), 4)}
+            for row, p in zip(rows, probabilities)
+        ]
+
+    def describe(self, model: Optional['PlacementModel'] = None) -> Dict[str, Any]:
+        model = model or self.model()
+        top = sorted(zip(model.feature_names[1:1 + len(NUMERIC_FEATURES)], model.weights[1:1 + len(NUMERIC_FEATURES)]),
+                     key=lambda item: abs(item[1]), reverse=True)
+        return dict(model.meta, top_features=[
+            {'feature': name, 'label': FEATURE_LABELS[name], 'weight': round(float(weight), 3)}
+            for name, weight in top
+        ])
+
+    def model(self) -> PlacementModel:
+        """The current model; loads, trains or schedules a retrain as needed"""
+        model = self._model
+        now = time.monotonic()
+        if model is not None and now - self._checked_at < self.check_interval:
+            return model
+
+        self._checked_at = now
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load() or self.train()
+                return self._model
+
+        # Another worker may have saved a newer model
+        if self._file_mtime() not in (None, self._loaded_mtime):
+            self._model = self._load() or model
+            model = self._model
+
+        age = time.time() - model.meta.get('trained_at_ts', 0)
+        if age >= self.retrain_interval and model.meta.get('versions') != change_feed.versions(TRAINING_TABLES):
+            self._train_async(model)
+        return model
+
+    def train(self, previous: Optional[PlacementModel] = None) -> PlacementModel:
+        """Fit, calibrate and save a model on all labelled students"""
+        np = optional_import('numpy')
+        if np is None:
+            raise RuntimeError('numpy is required for placement predictions')
+
+        started = time.perf_counter()
+        versions = change_feed.versions(TRAINING_TABLES)
+        reference_year = datetime.utcnow().year
+        rows = self._rows(active_only=False)
+        raw = self._raw(rows, reference_year)
+        labels = np.array([self._label(row, reference_year) for row in rows], dtype=float)
+        labelled = labels >= 0
+        X_raw, y = raw[labelled], labels[labelled]
+
+        numeric = X_raw[:, :len(NUMERIC_FEATURES)] if len(X_raw) else raw[:, :len(NUMERIC_FEATURES)]
+        mean = np.nan_to_num(np.nanmean(numeric, axis=0)) if len(numeric) else np.zeros(len(NUMERIC_FEATURES))
+        std = np.nan_to_num(np.nanstd(numeric, axis=0)) if len(numeric) else np.ones(len(NUMERIC_FEATURES))
+        std[std == 0] = 1.0
+        departments = sorted({int(d) for d in X_raw[:, -1] if not np.isnan(d)})
+
+        model = PlacementModel(np, None, mean, std, departments, (1.0, 0.0), {})
+        meta = {
+            'model_version': MODEL_VERSION,
+            'trained_at': datetime.utcnow().isoformat(),
+            'trained_at_ts': time.time(),
+            'reference_year': reference_year,
+            'versions': versions,
+            'samples': int(len(y)),
+            'placed_rate': round(float(y.mean()), 4) if len(y) else None
+        }
+
+        if len(y) >= self.min_samples and 0 < y.sum() < len(y):
+            X = model.features(X_raw)
+            initial = None
+            if previous is not None and previous.departments == departments and previous.weights is not None:
+                initial = previous.weights
+            model.weights = fit_logistic(np, X, y, self.l2, initial)
+            model.calibration, metrics = self._calibrate(np, X, y, model.weights)
+            meta.update(metrics, trained=True)
+        else:
+            # Too little history: every student gets the smoothed base rate
+            rate = (float(y.sum()) + 1.0) / (len(y) + 2.0)
+            model.weights = np.zeros(1 + len(NUMERIC_FEATURES) + len(departments))
+            model.weights[0] = math.log(rate / (1.0 - rate))
+            meta.update(trained=False, auc=None, brier=None, log_loss=None, reliability=[])
+        model.meta = meta
+
+        # Sorted probabilities per batch for rank percentiles
+        if rows:
+            probabilities = model.predict(raw)
+            batches = np.array([row[_BATCH] for row in rows])
+            active = np.array([bool(row[_ACTIVE]) for row in rows])
+            model.population = {
+                int(batch): np.sort(probabilities[(batches == batch) & active])
+                for batch in np.unique(batches)
+            }
+
+        meta['training_seconds'] = round(time.perf_counter() - started, 3)
+        try:
+            model.save(self.model_path)
+            self._loaded_mtime = self._file_mtime()
+        except OSError as e:
+            print(f"Failed to save placement model: {str(e)}")
+        print(f"Placement model trained on {meta['samples']} students in {meta['training_seconds']}s")
+        return model
+
+    # --- Training internals -------------------------------------------------
+
+    def _calibrate(self, np, X, y, weights):
+        """Platt scaling on out-of-fold scores, plus out-of-fold metrics"""
+        folds = np.random.default_rng(0).permutation(len(y)) % self.folds
+        logits = np.zeros(len(y))
+        for fold in range(self.folds):
+            held_out = folds == fold
+            train = ~held_out
+            if not held_out.any() or y[train].min() == y[train].max():
+                logits[held_out] = X[held_out] @ weights
+                continue
+            fold_weights = fit_logistic(np, X[train], y[train], self.l2, weights)
+            logits[held_out] = X[held_out] @ fold_weights
+
+        platt = fit_logistic(np, np.column_stack([np.ones(len(y)), logits]), y, l2=1e-6)
+        calibration = (float(platt[1]), float(platt[0]))
+        p = np.clip(_sigmoid(np, calibration[0] * logits + calibration[1]), 1e-6, 1 - 1e-6)
+
+        reliability = []
+        bins = np.minimum((p * 10).astype(int), 9)
+        for b in range(10):
+            in_bin = bins == b
+            if in_bin.any():
+                reliability.append({'bin': f'{b / 10:.1f}-{(b + 1) / 10:.1f}', 'count': int(in_bin.sum()),
+                                    'predicted': round(float(p[in_bin].mean()), 3),
+                                    'observed': round(float(y[in_bin].mean()), 3)})
+        auc = _auc(np, logits, y)
+        return calibration, {
+            'auc': round(auc, 4) if auc is not None else None,
+            'brier': round(float(np.mean((p - y) ** 2)), 4),
+            'log_loss': round(float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))), 4),
+            'reliability': reliability
+        }
+
+    @staticmethod
+    def _label(row, reference_year: int) -> int:
+        """1 placed, 0 not placed, -1 outcome still open"""
+        if row[_PLACED]:
+            return 1
+        if row[_DECIDED] and not row[_PENDING]:
+            return 0
+        if row[_BATCH] is not None and row[_BATCH] < reference_year:
+            return 0
+        return -1
+
+    def _train_async(self, previous: PlacementModel):
+        with self._lock:
+            if self._training:
+                return
+            self._training = True
+
+        def retrain():
+            try:
+                with self.app.app_context():
+                    try:
+                        self._model = self.train(previous)
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                print(f"Placement model retrain failed: {str(e)}")
+            finally:
+                self._training = False
+
+        threading.Thread(target=retrain, name='placement-model', daemon=True).start()
+
+    def _load(self) -> Optional[PlacementModel]:
+        np = optional_import('numpy')
+        mtime = self._file_mtime()
+        if np is None or mtime is None:
+            return None
+        try:
+            model = PlacementModel.load(np, self.model_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Failed to load placement model: {str(e)}")
+            return None
+        if model.meta.get('model_version') != MODEL_VERSION:
+            return None
+        self._loaded_mtime = mtime
+        return model
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.model_path)
+        except (OSError, TypeError):
+            return None
+
+    # --- Features -----------------------------------------------------------
+
+    def _rows(self, *criteria, active_only: bool = True) -> List[tuple]:
+        """One row per student with application, outcome and round counts"""
+        selected, decided = application_outcome()
+        applications = (
+            select(
+                StudentApplication.student_id.label('student_id'),
+                func.count(StudentApplication.id).label('applications'),
+                func.max(case((selected, 1), else_=0)).label('placed'),
+                func.sum(case((decided, 1), else_=0)).label('decided'),
+                func.sum(case((decided, 0), else_=1)).label('pending')
+            )
+            .group_by(StudentApplication.student_id)
+            .subquery()
+        )
+        rounds = (
+            select(
+                StudentApplication.student_id.label('student_id'),
+                func.count(RoundResult.id).label('taken'),
+                func.sum(case((RoundResult.result == 'pass', 1), else_=0)).label('passed')
+            )
+            .join(StudentApplication, RoundResult.application_id == StudentApplication.id)
+            .where(RoundResult.result.in_(('pass', 'fail')))
+            .group_by(StudentApplication.student_id)
+            .subquery()
+        )
+        stmt = (
+            select(StudentProfile.id, StudentProfile.cgpa, StudentProfile.skills, StudentProfile.department_id,
+                   StudentProfile.batch_year, StudentProfile.is_active, applications.c.applications, applications.c.placed,
+                   applications.c.decided, applications.c.pending, rounds.c.taken, rounds.c.passed)
+            .outerjoin(applications, applications.c.student_id == StudentProfile.id)
+            .outerjoin(rounds, rounds.c.student_id == StudentProfile.id)
+            .where(*criteria)
+        )
+        if active_only:
+            stmt = stmt.where(StudentProfile.is_active == True)
+        return [tuple(row) for row in db.session.execute(stmt)]
+
+    @staticmethod
+    def _raw(rows: Iterable[tuple], reference_year: int):
+        """Raw numeric matrix: NUMERIC_FEATURES columns, then department id"""
+        np = optional_import('numpy')
+        raw = []
+        for row in rows:
+            taken = row[_ROUNDS] or 0
+            raw.append((
+                float(row[_CGPA]) if row[_CGPA] is not None else math.nan,
+                len(skill_extractor.canonical_set(parse_json_list(row[_SKILLS]))),
+                math.log1p(row[_APPLICATIONS] or 0),
+                ((row[_PASSED] or 0) + 1.0) / (taken + 2.0),
+                max(-3, min(3, (row[_BATCH] or reference_year) - reference_year)),
+                float(row[_DEPARTMENT]) if row[_DEPARTMENT] is not None else math.nan
+            ))
+        return np.array(raw, dtype=float).reshape(len(raw), len(NUMERIC_FEATURES) + 1)
+
+
+# Global placement predictor instance
+placement_predictor = PlacementPredictor()
@@ -0,0 +1,191 @@
+"""Compact, size-bounded data sections for LLM prompts.
+
+Prompts used to embed ``json.dumps(payload, indent=2)`` of whatever the
+client posted, so their size (and the latency and cost of the call) was
+unbounded and oversized payloads failed at the API. ``prompt_builder.data``
+turns a payload into a section that fits a token budget:
+
+* only the fields listed for the prompt kind in ``PROMPT_FIELDS`` are kept
+  (kinds without a whitelist keep everything except ``PRIVATE_FIELDS``);
+  nulls and empty values are dropped and floats rounded;
+* JSON is written compactly with sorted keys, so equivalent payloads give
+  identical prompts and share AI cache entries;
+* lists longer than the current item limit are replaced by a statistical
+  summary — count, min/mean/max of numeric fields, the most common values
+  of the others — plus the first few items as examples;
+* the item and string limits are tightened step by step until the section
+  fits ``AI_PROMPT_DATA_TOKENS`` (or the budget passed in), as measured by
+  ``estimate_tokens``. Text that still does not fit is cut.
+"""
+import json
+from collections import Counter
+from numbers import Number
+from typing import Any, Dict, Optional
+
+from flask import Flask
+
+from services.ai_usage import estimate_tokens
+
+# Fields never sent to the LLM, whatever the prompt
+PRIVATE_FIELDS = frozenset([
+    'password', 'password_hash', 'phone', 'contact_phone', 'email', 'contact_email', 'address',
+    'date_of_birth', 'profile_image', 'resume_file', 'offer_letter_file', 'logo', 'user_id',
+])
+
+_EXPERIENCE = {'company': None, 'position': None, 'title': None, 'role': None, 'duration': None,
+               'description': None, 'technologies': None}
+_EDUCATION = {'degree': None, 'institution': None, 'year': None, 'cgpa': None, 'percentage': None}
+_PROJECT = {'title': None, 'name': None, 'description': None, 'technologies': None}
+_PROFILE = {
+    'department': None, 'department_id': None, 'batch_year': None, 'cgpa': None, 'backlogs': None,
+    'skills': None, 'experience': _EXPERIENCE, 'education': _EDUCATION, 'projects': _PROJECT,
+    'certifications': None, 'achievements': None, 'summary': None, 'is_active': None,
+}
+_DRIVE = {
+    'title': None, 'job_role': None, 'company_name': None, 'company': None, 'required_skills': None,
+    'requirements': None, 'min_cgpa': None, 'max_backlogs': None, 'salary_package_min': None,
+    'salary_package_max': None, 'location': None, 'drive_date': None, 'application_deadline': None,
+    'status': None,
+}
+_APPLICATION = {
+    'drive_id': None, 'application_status': None, 'status': None, 'ai_score': None, 'resume_score': None,
+    'applied_at': None, 'application_date': None, 'updated_at': None, 'student_cgpa': None, 'skills': None,
+    'drive': _DRIVE, **{field: None for field in ('title', 'job_role', 'company_name', 'required_skills')},
+}
+
+# Relevant fields per prompt kind; None keeps every non-private field
+PROMPT_FIELDS: Dict[str, Optional[dict]] = {
+    'profile': _PROFILE,
+    'application': _APPLICATION,
+    'applications': _APPLICATION,
+    'drive': None,
+    'company': None,
+    'interview': None,
+    'department': None,
+    'students': None,
+    'report': None,
+    'rounds': None,
+    'system': None,
+}
+
+# (max list items, max string length) tried in order until the data fits
+LIMITS = ((20, 400), (10, 200), (5, 120), (3, 80), (0, 60))
+
+_EMPTY = (None, '', [], {})
+
+
+def _select(value, fields):
+    """Apply a whitelist (``None`` = open) recursively; drop empty values"""
+    if isinstance(value, dict):
+        selected = {}
+        for key, item in value.items():
+            key = str(key)
+            if key in PRIVATE_FIELDS or (fields is not None and key not in fields):
+                continue
+            item = _select(item, fields.get(key) if fields is not None else None)
+            if item not in _EMPTY:
+                selected[key] = item
+        return selected
+    if isinstance(value, (list, tuple, set)):
+        return [item for item in (_select(item, fields) for item in value) if item not in _EMPTY]
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _numeric_summary(values):
+    return {'min': round(min(values), 2), 'mean': round(sum(values) / len(values), 2),
+            'max': round(max(values), 2)}
+
+
+def _top(values, n=5):
+    return [[value, count] for value, count in Counter(values).most_common(n)]
+
+
+def summarize(items, examples: int = 3, max_chars: int = 80) -> Dict[str, Any]:
+    """Statistical stand-in for a long list"""
+    summary = {'count': len(items)}
+    numbers = [item for item in items if isinstance(item, Number) and not isinstance(item, bool)]
+    if numbers and len(numbers) == len(items):
+        summary.update(_numeric_summary(numbers))
+        return summary
+    if all(not isinstance(item, (dict, list)) for item in items):
+        summary['top'] = _top([str(item)[:max_chars] for item in items])
+        return summary
+
+    fields = {}
+    records = [item for item in items if isinstance(item, dict)]
+    for key in sorted({key for record in records for key in record}):
+        values = [record[key] for record in records if key in record]
+        numbers = [v for v in values if isinstance(v, Number) and not isinstance(v, bool)]
+        if numbers and len(numbers) == len(values):
+            fields[key] = _numeric_summary(numbers)
+        elif all(isinstance(v, list) for v in values):
+            # e.g. skills: most common entries across items
+            fields[key] = {'top': _top([str(v)[:max_chars] for value in values for v in value
+                                        if not isinstance(v, (dict, list))])}
+        elif all(not isinstance(v, (dict, list)) for v in values):
+            distinct = {str(v) for v in values}
+            if len(distinct) < len(values):
+                fields[key] = {'top': _top([str(v)[:max_chars] for v in values])}
+    if fields:
+        summary['fields'] = {key: value for key, value in fields.items() if value.get('top', True)}
+    if examples:
+        summary['examples'] = items[:examples]
+    return summary
+
+
+def _shrink(value, max_items, max_chars):
+    if isinstance(value, dict):
+        return {key: _shrink(item, max_items, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        items = [_shrink(item, max_items, max_chars) for item in value]
+        if len(items) <= max(max_items, 1):
+            return items
+        return summarize(items, examples=min(3, max_items), max_chars=max_chars)
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars - 1] + '…'
+    return value
+
+
+def _fits(text, budget):
+    # Compact JSON never has more than ~8 characters per token; skip counting hopeless candidates
+    return len(text) <= budget * 8 and estimate_tokens(text) <= budget
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, ensure_ascii=False, default=str)
+
+
+class PromptBuilder:
+    def __init__(self):
+        self.app = None
+        self.max_tokens = 1200
+
+    def init_app(self, app: Flask):
+        """Initialize the prompt builder with Flask app"""
+        self.app = app
+        self.max_tokens = app.config.get('AI_PROMPT_DATA_TOKENS', 1200)
+        app.extensions['prompt_builder'] = self
+
+    def data(self, kind: str, payload: Any, max_tokens: Optional[int] = None) -> str:
+        """``payload`` as compact JSON for a ``kind`` prompt, within ``max_tokens``"""
+        budget = max_tokens or self.max_tokens
+        selected = _select(payload, PROMPT_FIELDS.get(kind))
+        text = compact_json(selected)
+        if _fits(text, budget):
+            return text
+        for max_items, max_chars in LIMITS:
+            text = compact_json(_shrink(selected, max_items, max_chars))
+            if _fits(text, budget):
+                return text
+        # Still too large (e.g. a huge flat object): cut the text
+        while estimate_tokens(text) > budget and len(text) > 16:
+            text = text[:int(len(text) * 0.8)]
+        return text + '…'
+
+
+# Global prompt builder instance
+prompt_builder = PromptBuilder()
@@ -0,0 +1,240 @@
+"""Placement recommendations ranked from local data.
+
+Each open drive is scored for a student from four signals:
+
+* **skills** — share of the drive's required skills the student has, with
+  synonyms folded by the skill taxonomy;
+* **CGPA margin** — how comfortably the student clears the cutoff (drives
+  the student is not eligible for are left out);
+* **history** — how often students from the same department and a similar
+  CGPA band (within 0.5) were selected by the same company, smoothed
+  towards the company's and the overall selection rate when there is
+  little history;
+* **deadline** — drives closing soon are surfaced first.
+
+The ranking is cached per student and day, tagged with the student's row
+and the drive and company tables, so a profile edit or a drive change
+recomputes it. Selection statistics are one aggregate query cached for
+``RECOMMENDATION_STATS_TTL`` seconds. Drives the student already applied to
+are filtered out per request.
+"""
+from datetime import date
+from typing import Any, Dict, List, Optional
+from flask import Flask
+from sqlalchemy import Integer, and_, case, cast, exists, func, or_, select
+
+from models import db, Company, OfferLetter, PlacementDrive, StudentApplication, StudentProfile, parse_json_list
+from read_models import active_drives
+from services.application_status import DECIDED_STATUSES, SELECTED_STATUSES
+from services.cache_service import cache_service, row_tags
+from services.skill_extractor import skill_extractor
+
+recommendation_cache = cache_service.namespace('recommendations')
+
+WEIGHTS = {'skills': 0.45, 'history': 0.25, 'cgpa': 0.2, 'deadline': 0.1}
+
+# Selection rate assumed before any history exists
+DEFAULT_SELECTION_RATE = 0.3
+
+
+class RecommendationService:
+    def __init__(self):
+        self.app = None
+        self.cache_ttl = 24 * 3600
+        self.stats_ttl = 3600
+        self.smoothing = 5.0
+
+    def init_app(self, app: Flask):
+        """Initialize the recommendation service with Flask app"""
+        self.app = app
+        self.cache_ttl = app.config.get('RECOMMENDATION_CACHE_TTL', 24 * 3600)
+        self.stats_ttl = app.config.get('RECOMMENDATION_STATS_TTL', 3600)
+        self.smoothing = app.config.get('RECOMMENDATION_SMOOTHING', 5.0)
+        app.extensions['recommendation_service'] = self
+
+    def recommend_drives(self, student_id: int, limit: int = 5) -> Dict[str, Any]:
+        """Best open drives for a student that they have not applied to yet"""
+        today = date.today()
+        ranked = recommendation_cache.get_or_compute(
+            f'student:{student_id}:{today.isoformat()}',
+            lambda: self.rank_drives(student_id, today),
+            ttl=self.cache_ttl,
+            tags=row_tags('student_profiles', student_id) + ['placement_drives', 'companies']
+        )
+
+        applied = set(db.session.scalars(
+            select(StudentApplication.drive_id).where(StudentApplication.student_id == student_id)))
+        drives = [drive for drive in ranked if drive['drive_id'] not in applied][:limit]
+
+        return {
+            'recommendations': list(dict.fromkeys(drive['company_name'] for drive in drives)),
+            'drives': drives,
+            'reasoning': 'Open drives ranked by skill match, CGPA margin, past selections of '
+                         'students with a similar profile, and application deadline.',
+            'is_ai_generated': False
+        }
+
+    def rank_drives(self, student_id: int, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Score every open drive the student is eligible for, best first"""
+        today = today or date.today()
+        student = db.session.execute(
+            select(StudentProfile.skills, StudentProfile.cgpa, StudentProfile.department_id)
+            .where(StudentProfile.id == student_id)
+        ).one_or_none()
+        if student is None:
+            return []
+
+        profile = {
+            'skills': skill_extractor.canonical_set(parse_json_list(student.skills)),
+            'cgpa': float(student.cgpa) if student.cgpa is not None else None,
+            'department_id': student.department_id
+        }
+        drives = active_drives()
+        company_names = dict(db.session.execute(
+            select(Company.id, Company.name).where(Company.id.in_({d['company_id'] for d in drives}))
+        ).all()) if drives else {}
+        stats = self.selection_stats()
+
+        ranked = []
+        for drive in drives:
+            scored = self._score(drive, profile, stats, today)
+            if scored is None:
+                continue
+            scored.update({
+                'drive_id': drive['id'],
+                'company_id': drive['company_id'],
+                'company_name': company_names.get(drive['company_id'], ''),
+                'title': drive['title'],
+                'job_role': drive['job_role'],
+                'application_deadline': drive['application_deadline']
+            })
+            ranked.append(scored)
+        ranked.sort(key=lambda item: item['score'], reverse=True)
+        return ranked
+
+    def _score(self, drive: Dict[str, Any], profile: Dict[str, Any], stats: Dict[str, Any],
+               today: date) -> Optional[Dict[str, Any]]:
+        reasons = []
+
+        deadline = _parse_date(drive.get('application_deadline'))
+        if deadline is not None and deadline < today:
+            return None
+        if deadline is not None:
+            days_left = (deadline - today).days
+            deadline_score = 1.0 / (1.0 + days_left / 7.0)
+            if days_left <= 3:
+                reasons.append(f"Applications close in {days_left} day{'s' if days_left != 1 else ''}")
+        else:
+            deadline_score = 0.3
+
+        min_cgpa = drive.get('min_cgpa')
+        cgpa = profile['cgpa']
+        if min_cgpa and cgpa is not None:
+            if cgpa < min_cgpa:
+                return None
+            cgpa_score = 0.5 + 0.5 * min((cgpa - min_cgpa) / 1.5, 1.0)
+            reasons.append(f"CGPA {cgpa:.2f} clears the {min_cgpa:.2f} cutoff")
+        else:
+            cgpa_score = 0.75
+
+        required = [skill_extractor.canonical(skill) for skill in drive.get('required_skills') or []]
+        if required:
+            matched = [skill for skill in required if skill in profile['skills']]
+            skill_score = len(matched) / len(required)
+            missing = [skill for skill in required if skill not in profile['skills']]
+            if matched:
+                reasons.append(f"Matches {len(matched)} of {len(required)} required skills")
+        else:
+            matched, missing = [], []
+            skill_score = 0.5
+
+        rate, global_rate = self._selection_rate(stats, drive['company_id'], profile)
+        history_score = min(rate / (2 * global_rate), 1.0) if global_rate else 0.5
+        if rate > global_rate:
+            reasons.append(f"Students with a similar profile were selected here {rate:.0%} of the time")
+
+        signals = {
+            'skills': round(skill_score, 3),
+            'cgpa': round(cgpa_score, 3),
+            'history': round(history_score, 3),
+            'deadline': round(deadline_score, 3)
+        }
+        return {
+            'score': round(100 * sum(WEIGHTS[name] * value for name, value in signals.items()), 1),
+            'signals': signals,
+            'matched_skills': matched,
+            'missing_skills': missing,
+            'selection_rate': round(rate, 3),
+            'reasons': reasons
+        }
+
+    def selection_stats(self) -> Dict[str, Any]:
+        """Decided applications and selections per company, department and CGPA band"""
+        return recommendation_cache.get_or_compute('selection-stats', self._selection_stats,
+                                                   ttl=self.stats_ttl)
+
+    def _selection_stats(self) -> Dict[str, Any]:
+        selected, decided = application_outcome()
+        band = cast(StudentProfile.cgpa * 2, Integer)
+        stmt = (
+            select(PlacementDrive.company_id, StudentProfile.department_id, band,
+                   func.count(StudentApplication.id), func.sum(case((selected, 1), else_=0)))
+            .select_from(StudentApplication)
+            .join(StudentProfile, StudentApplication.student_id == StudentProfile.id)
+            .join(PlacementDrive, StudentApplication.drive_id == PlacementDrive.id)
+            .where(decided)
+            .group_by(PlacementDrive.company_id, StudentProfile.department_id, band)
+        )
+
+        overall = [0, 0]
+        companies = {}
+        cohorts = {}
+        for company_id, department_id, cgpa_band, applications, selections in db.session.execute(stmt):
+            selections = int(selections or 0)
+            for counts in (overall, companies.setdefault(str(company_id), [0, 0])):
+                counts[0] += applications
+                counts[1] += selections
+            cohorts[f'{company_id}:{department_id}:{cgpa_band}'] = [applications, selections]
+        return {'overall': overall, 'companies': companies, 'cohorts': cohorts}
+
+    def _selection_rate(self, stats: Dict[str, Any], company_id: int, profile: Dict[str, Any]):
+        """Smoothed selection rate of similar students at a company, and the overall rate"""
+        m = self.smoothing
+        decided, selections = stats['overall']
+        global_rate = selections / decided if decided else DEFAULT_SELECTION_RATE
+
+        decided, selections = stats['companies'].get(str(company_id), (0, 0))
+        company_rate = (selections + m * global_rate) / (decided + m)
+
+        decided = selections = 0
+        if profile['cgpa'] is not None:
+            band = int(profile['cgpa'] * 2)
+            for neighbour in (band - 1, band, band + 1):
+                counts = stats['cohorts'].get(f"{company_id}:{profile['department_id']}:{neighbour}")
+                if counts:
+                    decided += counts[0]
+                    selections += counts[1]
+        return (selections + m * company_rate) / (decided + m), global_rate
+
+
+def application_outcome():
+    """SQL conditions: the application ended in a selection / was decided either way"""
+    has_offer = exists().where(and_(
+        OfferLetter.application_id == StudentApplication.id,
+        OfferLetter.status != 'declined'
+    ))
+    selected = or_(StudentApplication.application_status.in_(SELECTED_STATUSES), has_offer)
+    decided = or_(StudentApplication.application_status.in_(DECIDED_STATUSES), has_offer)
+    return selected, decided
+
+
+def _parse_date(value) -> Optional[date]:
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+# Global recommendation service instance
+recommendation_service = RecommendationService()
@@ -4,25 +4,23 @@ from datetime import datetime, timedelta
 import json
 from typing import Dict, List, Any, Optional
 import io
-from collections import defaultdict
+from collections import Counter, defaultdict
 
-# Try to import optional dependencies
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
+from utils.lazy_imports import optional_import, is_available
+from services.application_status import OPEN_STATUSES, SELECTED_STATUSES, STATUSES
+from services.cache_service import cache_service, make_key
 
-try:
-    import xlsxwriter
-    XLSXWRITER_AVAILABLE = True
-except ImportError:
-    XLSXWRITER_AVAILABLE = False
+report_cache = cache_service.namespace('reports')
+
+# Tables each report reads; a write to any of them invalidates the cached report
+DEPARTMENT_REPORT_TABLES = ['student_profiles', 'student_applications', 'placement_drives', 'companies']
+STUDENT_REPORT_TABLES = ['student_profiles', 'student_applications', 'round_results', 'offer_letters']
+COMPANY_REPORT_TABLES = ['companies', 'placement_drives', 'student_applications']
+
+
+def _is_report(result: Dict[str, Any]) -> bool:
+    """Only successful reports are cached"""
+    return 'error' not in result
 
 class ReportService:
     def __init__(self):
@@ -31,9 +29,20 @@ class ReportService:
     def init_app(self, app: Flask):
         """Initialize the report service with Flask app"""
         self.app = app
+        app.extensions['report_service'] = self
     
     def generate_department_analytics(self, department_id: int, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
-        """Generate analytics for a specific department"""
+        """Generate analytics for a specific department (cached until its data changes)"""
+        key = make_key('department', department_id, start_date, end_date, datetime.utcnow().date().isoformat())
+        return report_cache.get_or_compute(
+            key,
+            lambda: self._build_department_analytics(department_id, start_date, end_date),
+            tags=DEPARTMENT_REPORT_TABLES,
+            should_cache=_is_report
+        )
+    
+    def _build_department_analytics(self, department_id: int, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
+        """Compute analytics for a specific department"""
         try:
             from models import StudentProfile, StudentApplication, PlacementDrive, Company, db
             
@@ -58,9 +67,9 @@ class ReportService:
             # Analytics calculations
             total_students = len(students)
             total_applications = len(applications)
-            active_applications = len([a for a in applications if a.application_status in ['applied', 'under_review', 'shortlisted']])
-            successful_placements = len([a for a in applications if a.application_status in ['selected', 'offer_accepted']])
-            companies_visited = len(set([a.placement_drive.company_id for a in applications if a.placement_drive]))
+            active_applications = len([a for a in applications if a.application_status in OPEN_STATUSES])
+            successful_placements = len([a for a in applications if a.application_status in SELECTED_STATUSES])
+            companies_visited = len(set([a.drive.company_id for a in applications if a.drive]))
             
             # Application status distribution
             status_distribution = defaultdict(int)
@@ -71,7 +80,7 @@ class ReportService:
             success_rate = (successful_placements / total_applications * 100) if total_applications > 0 else 0
             
             # Average CGPA of students with successful placements
-            successful_students = [a.student for a in applications if a.application_status in ['selected', 'offer_accepted']]
+            successful_students = [a.student for a in applications if a.application_status in SELECTED_STATUSES]
             avg_cgpa = sum(s.cgpa for s in successful_students if s.cgpa) / len(successful_students) if successful_students else 0
             
             return {
@@ -116,7 +125,7 @@ class ReportService:
             
             successful_this_month = len([
                 a for a in month_applications 
-                if a.application_status in ['selected', 'offer_accepted']
+                if a.application_status in SELECTED_STATUSES
             ])
             
             trends.append({
@@ -140,8 +149,8 @@ class ReportService:
         
         company_counts = Counter()
         for app in applications:
-            if app.placement_drive and app.placement_drive.company:
-                company_counts[app.placement_drive.company.name] += 1
+            if app.drive and app.drive.company:
+                company_counts[app.drive.company.name] += 1
         
         return [
             {'company': company, 'applications': count}
@@ -149,7 +158,16 @@ class ReportService:
         ]
     
     def generate_student_report(self, student_id: int, include_applications: bool = True) -> Dict[str, Any]:
-        """Generate detailed report for a specific student"""
+        """Generate detailed report for a specific student (cached until its data changes)"""
+        return report_cache.get_or_compute(
+            make_key('student', student_id, include_applications),
+            lambda: self._build_student_report(student_id, include_applications),
+            tags=STUDENT_REPORT_TABLES,
+            should_cache=_is_report
+        )
+    
+    def _build_student_report(self, student_id: int, include_applications: bool = True) -> Dict[str, Any]:
+        """Compute the detailed report for a specific student"""
         try:
             from models import StudentProfile, StudentApplication, PlacementDrive, Company, RoundResult, OfferLetter, db
             
@@ -163,15 +181,9 @@ class ReportService:
             profile_data = student.to_dict()
             
             # Application summary
-            app_summary = {
-                'total_applications': len(applications),
-                'applied': len([a for a in applications if a.application_status == 'applied']),
-                'under_review': len([a for a in applications if a.application_status == 'under_review']),
-                'shortlisted': len([a for a in applications if a.application_status == 'shortlisted']),
-                'rejected': len([a for a in applications if a.application_status == 'rejected']),
-                'selected': len([a for a in applications if a.application_status == 'selected']),
-                'offer_accepted': len([a for a in applications if a.application_status == 'offer_accepted']),
-            }
+            app_summary = {'total_applications': len(applications)}
+            status_counts = Counter(a.application_status for a in applications)
+            app_summary.update({status: status_counts[status] for status in STATUSES})
             
             # Application details
             applications_data = []
@@ -200,7 +212,16 @@ class ReportService:
             return {'error': str(e), 'success': False}
     
     def generate_company_report(self, company_id: int, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
-        """Generate report for a company's recruitment activities"""
+        """Generate report for a company's recruitment activities (cached until its data changes)"""
+        return report_cache.get_or_compute(
+            make_key('company', company_id, start_date, end_date),
+            lambda: self._build_company_report(company_id, start_date, end_date),
+            tags=COMPANY_REPORT_TABLES,
+            should_cache=_is_report
+        )
+    
+    def _build_company_report(self, company_id: int, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
+        """Compute the report for a company's recruitment activities"""
         try:
             from models import Company, PlacementDrive, StudentApplication, RoundResult, OfferLetter, db
             
@@ -226,7 +247,7 @@ class ReportService:
             # Calculate metrics
             total_applications = len(applications)
             total_drives = len(drives)
-            successful_hires = len([a for a in applications if a.application_status in ['selected', 'offer_accepted']])
+            successful_hires = len([a for a in applications if a.application_status in SELECTED_STATUSES])
             average_score = sum(a.ai_score for a in applications if a.ai_score) / len([a for a in applications if a.ai_score]) if any(a.ai_score for a in applications) else 0
             
             # Drive-wise breakdown
@@ -236,8 +257,8 @@ class ReportService:
                 drive_breakdown.append({
                     'drive': drive.to_dict(),
                     'applications': len(drive_apps),
-                    'selected': len([a for a in drive_apps if a.application_status in ['selected', 'offer_accepted']]),
-                    'success_rate': (len([a for a in drive_apps if a.application_status in ['selected', 'offer_accepted']]) / len(drive_apps) * 100) if drive_apps else 0
+                    'selected': len([a for a in drive_apps if a.application_status in SELECTED_STATUSES]),
+                    'success_rate': (len([a for a in drive_apps if a.application_status in SELECTED_STATUSES]) / len(drive_apps) * 100) if drive_apps else 0
                 })
             
             return {
@@ -258,7 +279,8 @@ class ReportService:
     
     def export_to_excel(self, data: Dict[str, Any], report_type: str, filename: str = None) -> str:
         """Export report data to Excel format"""
-        if not XLSXWRITER_AVAILABLE:
+        xlsxwriter = optional_import('xlsxwriter')
+        if xlsxwriter is None:
             raise Exception("Excel export not available - xlsxwriter not installed")
         
         try:
@@ -416,9 +438,14 @@ class ReportService:
     
     def export_to_pdf(self, data: Dict[str, Any], report_type: str, filename: str = None) -> str:
         """Export report data to PDF format"""
-        if not REPORTLAB_AVAILABLE:
+        if not is_available('reportlab'):
             raise Exception("PDF export not available - reportlab not installed")
         
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import SimpleDocTemplate, Paragraph
+        from reportlab.lib.enums import TA_CENTER
+        
         try:
             if not filename:
                 timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
@@ -460,6 +487,8 @@ class ReportService:
     
     def _write_department_pdf(self, story, data, styles):
         """Write department data to PDF"""
+        from reportlab.platypus import Paragraph, Spacer
+        
         # Summary section
         story.append(Paragraph("Summary", styles['Heading2']))
         summary = data.get('summary', {})
@@ -477,6 +506,8 @@ class ReportService:
     
     def _write_student_pdf(self, story, data, styles):
         """Write student data to PDF"""
+        from reportlab.platypus import Paragraph, Spacer
+        
         student = data.get('student', {})
         story.append(Paragraph("Student Information", styles['Heading2']))
         
@@ -502,6 +533,8 @@ class ReportService:
     
     def _write_company_pdf(self, story, data, styles):
         """Write company data to PDF"""
+        from reportlab.platypus import Paragraph, Spacer
+        
         company = data.get('company', {})
         story.append(Paragraph(f"Company: {company.get('name', '')}", styles['Normal']))
         story.append(Paragraph(f"Industry: {company.get('industry', '')}", styles['Normal']))
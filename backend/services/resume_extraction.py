@@ -0,0 +1,147 @@
+"""Resume text extraction off the request thread, cached by content.
+
+Uploads are identified by the SHA-256 of their bytes. Extracted text is
+cached under that hash (plus the file type and ``EXTRACTOR_VERSION``), so a
+re-upload of the same resume or a repeated analysis does not parse the file
+again.
+
+Parsing is CPU-bound and some PDFs are pathological, so it runs in a
+process pool with a per-file timeout. A worker that times out is killed
+together with its pool; the next extraction starts a fresh pool.
+``RESUME_EXTRACTION_WORKERS = 0`` runs extraction inline instead.
+
+Only the first ``RESUME_TEXT_MAX_CHARS`` characters (and at most
+``RESUME_MAX_PAGES`` pages) are extracted; ``PDF_BACKEND`` selects
+``pypdf2``, ``pdfminer`` or ``auto``.
+"""
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from flask import Flask
+from typing import Optional
+
+from services.cache_service import cache_service
+from services.metrics import metrics
+from services.text_extraction import EXTRACTOR_VERSION, extract_text, select_pdf_backend
+
+text_cache = cache_service.namespace('resume_text')
+
+
+class ResumeExtractionService:
+    def __init__(self):
+        self.app = None
+        self.workers = 2
+        self.timeout = 20.0
+        self.cache_ttl = 30 * 24 * 3600
+        self.start_method = 'spawn'
+        self.max_chars = 20000
+        self.max_pages = 10
+        self.pdf_backend = 'auto'
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask):
+        """Initialize the extraction service with Flask app.
+
+        The process pool is started on first use, not at boot.
+        """
+        self.app = app
+        self.workers = app.config.get('RESUME_EXTRACTION_WORKERS', 2)
+        self.timeout = app.config.get('RESUME_EXTRACTION_TIMEOUT', 20.0)
+        self.cache_ttl = app.config.get('RESUME_CACHE_TTL', 30 * 24 * 3600)
+        self.start_method = app.config.get('RESUME_EXTRACTION_START_METHOD', 'spawn')
+        self.max_chars = app.config.get('RESUME_TEXT_MAX_CHARS', 20000)
+        self.max_pages = app.config.get('RESUME_MAX_PAGES', 10)
+        self.pdf_backend = app.config.get('PDF_BACKEND', 'auto')
+        app.extensions['resume_extraction'] = self
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """SHA-256 of the file contents, read in chunks"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def content_key(self, file_path: str, content_hash: Optional[str] = None) -> str:
+        """Cache key for a file: its content hash, type and extraction settings"""
+        content_hash = content_hash or self.file_hash(file_path)
+        extension = os.path.splitext(file_path)[1].lower().lstrip('.')
+        backend = select_pdf_backend(self.pdf_backend) if extension == 'pdf' else '-'
+        return f'{content_hash}:{extension}:v{EXTRACTOR_VERSION}:{backend}:{self.max_chars}:{self.max_pages}'
+
+    def extract_text(self, file_path: str, content_hash: Optional[str] = None) -> str:
+        """Extract text from a file, reusing the result for identical content"""
+        try:
+            key = self.content_key(file_path, content_hash)
+        except OSError as e:
+            print(f"Error reading {file_path}: {str(e)}")
+            return ""
+
+        text = text_cache.get_or_compute(
+            key,
+            lambda: self._extract(file_path),
+            ttl=self.cache_ttl,
+            # Timeouts and pool failures are not cached; the next call retries
+            should_cache=lambda result: result is not None
+        )
+        return text or ""
+
+    def _extract(self, file_path: str) -> Optional[str]:
+        """Run extraction in the pool; None when it failed or timed out"""
+        args = (file_path, self.max_chars, self.max_pages, self.pdf_backend)
+        if self.workers <= 0:
+            return extract_text(*args)
+
+        for _ in range(2):
+            executor = self._get_executor()
+            future = executor.submit(extract_text, *args)
+            try:
+                text = future.result(timeout=self.timeout)
+                metrics.incr('resume_extraction.completed')
+                return text
+            except FuturesTimeout:
+                metrics.incr('resume_extraction.timeouts')
+                print(f"Text extraction timed out after {self.timeout}s: {file_path}")
+                self._discard_executor(executor)
+                return None
+            except BrokenProcessPool:
+                # Another extraction killed the pool; retry once on a fresh one
+                self._discard_executor(executor)
+            except Exception as e:
+                print(f"Error extracting text from {file_path}: {str(e)}")
+                return None
+        return None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """Kill a pool's workers (a stuck parse cannot be cancelled otherwise)"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Global resume extraction service instance
+resume_extraction_service = ResumeExtractionService()
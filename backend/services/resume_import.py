@@ -0,0 +1,312 @@
+"""Bulk resume import from a ZIP archive.
+
+A TPO or HOD uploads one archive with a resume per student, each named by
+student id (``21CS001.pdf`` or ``21CS001_resume.pdf``). The import runs as a
+background job in the web process:
+
+1. members are read one at a time from the archive on disk and streamed into
+   the resume store, never loading the archive or a whole batch in memory;
+2. files are matched to ``StudentProfile`` rows with a single query (HODs
+   only match students of their own department);
+3. text and skill extraction run on a thread pool feeding the resume
+   extraction process pool, so files are parsed in parallel;
+4. profile updates are written back in batches.
+
+Job progress is stored in ``resume_import_jobs``, so any worker process
+can answer ``GET .../resume-imports/<job_id>``; jobs older than
+``RESUME_IMPORT_JOB_TTL`` are purged when a new import starts.
+"""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from flask import Flask
+from sqlalchemy import delete, insert, select, update
+
+from models import db, ResumeImportJob, StudentProfile
+from services.change_feed import change_feed
+from services.file_service import file_service
+from services.resume_extraction import resume_extraction_service
+from services.skill_extractor import skill_extractor
+
+# Only the first few problems are kept in the job report
+_REPORT_LIMIT = 200
+_ID_SEPARATORS = re.compile(r'[\s_]+')
+
+
+class ResumeImportService:
+    def __init__(self):
+        self.app = None
+        self.workers = 4
+        self.max_files = 2000
+        self.batch_size = 100
+        self.job_ttl = 24 * 3600
+        self._runner = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask):
+        """Initialize the import service with Flask app"""
+        self.app = app
+        self.workers = app.config.get('RESUME_IMPORT_WORKERS', 4)
+        self.max_files = app.config.get('RESUME_IMPORT_MAX_FILES', 2000)
+        self.batch_size = app.config.get('RESUME_IMPORT_BATCH_SIZE', 100)
+        self.job_ttl = app.config.get('RESUME_IMPORT_JOB_TTL', 24 * 3600)
+        app.extensions['resume_import'] = self
+
+    def start_import(self, archive, created_by: int, department_id: Optional[int] = None) -> Dict[str, Any]:
+        """Save an uploaded archive and queue its import; returns the job"""
+        job_id = uuid.uuid4().hex
+        saved = file_service.save_import_archive(archive, job_id)
+        if not saved['success']:
+            return saved
+
+        db.session.execute(delete(ResumeImportJob).where(
+            ResumeImportJob.created_at < datetime.utcnow() - timedelta(seconds=self.job_ttl)))
+        job = {
+            'job_id': job_id,
+            'status': 'queued',
+            'archive_name': archive.filename,
+            'created_by': created_by,
+            'department_id': department_id,
+            'total': 0,
+            'processed': 0,
+            'matched': 0,
+            'updated': 0,
+            'failed': 0,
+            'unmatched': [],
+            'errors': [],
+            'created_at': datetime.utcnow().isoformat(),
+            'started_at': None,
+            'finished_at': None
+        }
+        db.session.execute(insert(ResumeImportJob).values(
+            job_id=job_id, status='queued', archive_name=(archive.filename or '')[:255],
+            created_by=created_by, department_id=department_id, created_at=datetime.utcnow()))
+        db.session.commit()
+        snapshot = dict(job, unmatched=[], errors=[])
+        self._get_runner().submit(self._run, job, saved['filepath'])
+        return {'success': True, 'job': snapshot}
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = db.session.get(ResumeImportJob, job_id)
+        if row is None:
+            return None
+        report = json.loads(row.report) if row.report else {}
+        job = {
+            'job_id': row.job_id,
+            'status': row.status,
+            'archive_name': row.archive_name,
+            'created_by': row.created_by,
+            'department_id': row.department_id,
+            'total': row.total,
+            'processed': row.processed,
+            'matched': row.matched,
+            'updated': row.updated,
+            'failed': row.failed,
+            'unmatched': report.get('unmatched', []),
+            'errors': report.get('errors', []),
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'started_at': row.started_at.isoformat() if row.started_at else None,
+            'finished_at': row.finished_at.isoformat() if row.finished_at else None
+        }
+        if 'error' in report:
+            job['error'] = report['error']
+        return job
+
+    def _get_runner(self) -> ThreadPoolExecutor:
+        # Imports run one at a time per process; later ones wait as 'queued'
+        with self._lock:
+            if self._runner is None:
+                self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix='resume-import')
+            return self._runner
+
+    def _save(self, job: Dict[str, Any]):
+        """Write the job's progress (on the import thread's session, between batches)"""
+        report = {'unmatched': job['unmatched'], 'errors': job['errors']}
+        if 'error' in job:
+            report['error'] = job['error']
+        db.session.execute(update(ResumeImportJob).where(ResumeImportJob.job_id == job['job_id']).values(
+            status=job['status'],
+            total=job['total'],
+            processed=job['processed'],
+            matched=job['matched'],
+            updated=job['updated'],
+            failed=job['failed'],
+            report=json.dumps(report),
+            started_at=datetime.fromisoformat(job['started_at']) if job['started_at'] else None,
+            finished_at=datetime.fromisoformat(job['finished_at']) if job['finished_at'] else None
+        ))
+        db.session.commit()
+
+    def _run(self, job: Dict[str, Any], archive_path: str):
+        with self.app.app_context():
+            job['status'] = 'running'
+            job['started_at'] = datetime.utcnow().isoformat()
+            self._save(job)
+            try:
+                with zipfile.ZipFile(archive_path) as archive:
+                    self._import(job, archive)
+                job['status'] = 'completed'
+            except Exception as e:
+                db.session.rollback()
+                print(f"Resume import {job['job_id']} failed: {str(e)}")
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            finally:
+                job['finished_at'] = datetime.utcnow().isoformat()
+                try:
+                    self._save(job)
+                except Exception as e:
+                    print(f"Resume import {job['job_id']}: could not save the final state: {str(e)}")
+                finally:
+                    db.session.remove()
+                try:
+                    os.remove(archive_path)
+                except OSError:
+                    pass
+
+    def _import(self, job: Dict[str, Any], archive: zipfile.ZipFile):
+        entries = self._resume_entries(archive)
+        job['total'] = len(entries)
+        students = self._match_students(entries, job['department_id'])
+        self._save(job)
+
+        progress = _Progress(self, job)
+        rows = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='resume-extract') as pool:
+            futures = {}
+            for info, candidates in entries:
+                name = os.path.basename(info.filename)
+                student = next((students[c] for c in candidates if c in students), None)
+                if student is None:
+                    progress.report(job['unmatched'], name)
+                    progress.step()
+                    continue
+
+                job['matched'] += 1
+                extension = os.path.splitext(name)[1]
+                with archive.open(info) as member:
+                    saved = file_service.save_resume_stream(member, student['student_id'], extension)
+                if not saved['success']:
+                    self._fail(progress, name, saved['error'])
+                    continue
+                futures[pool.submit(self._analyze, saved['filepath'])] = (student, saved['filename'], name)
+
+            for future in as_completed(futures):
+                student, filename, name = futures[future]
+                try:
+                    skills = future.result()
+                except Exception as e:
+                    self._fail(progress, name, str(e))
+                    continue
+
+                rows.append({
+                    'id': student['id'],
+                    'resume_file': filename,
+                    'skills': json.dumps(self._merge_skills(student['skills'], skills)),
+                    'updated_at': datetime.utcnow()
+                })
+                job['updated'] += 1
+                progress.step()
+                if len(rows) >= self.batch_size:
+                    self._apply(rows)
+                    rows = []
+        self._apply(rows)
+        progress.flush()
+
+    def _resume_entries(self, archive: zipfile.ZipFile) -> List[tuple]:
+        """Archive members that look like resumes, with candidate student ids"""
+        entries = []
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or name.startswith('.') or '__MACOSX' in info.filename:
+                continue
+            if not file_service.allowed_file(name):
+                continue
+            stem = os.path.splitext(name)[0].strip()
+            candidates = list(dict.fromkeys(
+                candidate.upper() for candidate in (stem, _ID_SEPARATORS.split(stem)[0]) if candidate
+            ))
+            entries.append((info, candidates))
+            if len(entries) > self.max_files:
+                raise ValueError(f'Archive has more than {self.max_files} resumes')
+        return entries
+
+    def _match_students(self, entries: List[tuple], department_id: Optional[int]) -> Dict[str, Dict[str, Any]]:
+        """Students named in the archive, keyed by upper-cased student id"""
+        wanted = {candidate for _, candidates in entries for candidate in candidates}
+        if not wanted:
+            return {}
+        # Ids are matched case-insensitively; try both spellings to keep the index usable
+        stmt = select(StudentProfile.id, StudentProfile.student_id, StudentProfile.skills).where(
+            StudentProfile.student_id.in_(wanted | {candidate.lower() for candidate in wanted}),
+            StudentProfile.is_active == True
+        )
+        if department_id is not None:
+            stmt = stmt.where(StudentProfile.department_id == department_id)
+
+        return {
+            row.student_id.upper(): {'id': row.id, 'student_id': row.student_id, 'skills': row.skills}
+            for row in db.session.execute(stmt)
+        }
+
+    def _analyze(self, file_path: str) -> List[str]:
+        """Extract a resume's skills (runs on the extraction thread pool)"""
+        with self.app.app_context():
+            text = resume_extraction_service.extract_text(file_path)
+            return skill_extractor.extract(text) if text else []
+
+    @staticmethod
+    def _merge_skills(current_json: Optional[str], extracted: List[str]) -> List[str]:
+        """Keep the student's own skills and add newly found ones"""
+        current = json.loads(current_json) if current_json else []
+        known = skill_extractor.canonical_set(current)
+        return current + [skill for skill in extracted if skill not in known]
+
+    def _apply(self, rows: List[Dict[str, Any]]):
+        """Write a batch of profile updates (bulk UPDATE by primary key)"""
+        if not rows:
+            return
+        db.session.execute(update(StudentProfile), rows)
+        change_feed.record(db.session, 'student_profiles', 'update',
+                           [row['id'] for row in rows], ('resume_file', 'skills'))
+        db.session.commit()
+
+    def _fail(self, progress: '_Progress', name: str, error: str):
+        progress.job['failed'] += 1
+        progress.report(progress.job['errors'], {'file': name, 'error': error})
+        progress.step()
+
+
+class _Progress:
+    """Counts processed files and publishes the job at most twice a second"""
+
+    def __init__(self, service: ResumeImportService, job: Dict[str, Any], interval: float = 0.5):
+        self.service = service
+        self.job = job
+        self.interval = interval
+        self._published = time.monotonic()
+
+    @staticmethod
+    def report(items: list, item):
+        if len(items) < _REPORT_LIMIT:
+            items.append(item)
+
+    def step(self):
+        self.job['processed'] += 1
+        if time.monotonic() - self._published >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self.service._save(self.job)
+        self._published = time.monotonic()
+
+
+# Global resume import service instance
+resume_import_service = ResumeImportService()
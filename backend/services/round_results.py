@@ -0,0 +1,378 @@
+"""Bulk round result upload.
+
+A TPO uploads one CSV or XLSX sheet per recruitment round with a header
+row and one row per candidate::
+
+    student_id,score,feedback
+    21CS001,72.5,Good problem solving
+    21CS002,41,
+
+``student_id`` is the roll number (``application_id`` works as well).
+``score`` is checked against the round's ``max_score``; a ``result`` column
+(pass/fail/absent) may override the outcome, and is required when the
+round has no ``passing_score``.
+
+The sheet is read row by row (XLSX in openpyxl's read-only mode) and
+validated in that single pass against the drive's applications, loaded
+with one query. A sheet with errors is rejected as a whole unless
+``partial`` is set. The write is one transaction:
+
+* the new ``RoundResult`` rows go in with one executemany INSERT;
+* applications move with two bulk status transitions (see
+  ``services/application_status``): candidates who passed are shortlisted
+  for the next round (``selected`` after the last round), the others are
+  rejected. Applications that are already decided are left alone.
+
+Uploading again for candidates who already have a result for the round is
+refused unless ``replace`` is set. With it their results are replaced,
+and applications whose outcome changed are moved back from the status the
+earlier upload gave them, provided they have not moved on since.
+
+Result emails are then rendered and handed to the email service as one
+batch, sent over a single SMTP connection in the background.
+"""
+import csv
+import io
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import Flask
+from sqlalchemy import delete, insert, select
+
+from models import db, Company, PlacementDrive, RecruitmentRound, RoundResult, StudentApplication, StudentProfile, User
+from services.application_status import OPEN_STATUSES, application_status
+from services.change_feed import change_feed
+from services.email_service import email_service
+from utils.lazy_imports import optional_import
+
+RESULTS = ('pass', 'fail', 'absent')
+_RESULT_ALIASES = {
+    'pass': 'pass', 'passed': 'pass', 'p': 'pass', 'qualified': 'pass', 'cleared': 'pass',
+    'fail': 'fail', 'failed': 'fail', 'f': 'fail', 'not qualified': 'fail',
+    'absent': 'absent', 'ab': 'absent', 'a': 'absent',
+}
+_ID_COLUMNS = ('student_id', 'roll_number', 'roll_no', 'application_id')
+
+# Only the first few problems are kept in the report
+_REPORT_LIMIT = 200
+
+
+class RoundResultError(ValueError):
+    """The upload cannot be processed at all (bad file, unknown round, ...)"""
+
+
+def _header(value) -> str:
+    return str(value or '').strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheet numbers: roll numbers such as 21001 come back as 21001.0
+        value = int(value)
+    return str(value).strip()
+
+
+class RoundResultImporter:
+    def __init__(self):
+        self.app = None
+        self.max_rows = 20000
+
+    def init_app(self, app: Flask):
+        """Initialize the importer with Flask app"""
+        self.app = app
+        self.max_rows = app.config.get('ROUND_RESULTS_MAX_ROWS', 20000)
+        app.extensions['round_results'] = self
+
+    # --- Reading ----------------------------------------------------------------
+
+    def rows(self, file, filename: str) -> Iterator[List[str]]:
+        """Rows of an uploaded CSV or XLSX file as lists of strings, header first"""
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        if extension == 'csv':
+            text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+            for row in csv.reader(text):
+                yield [_cell(value) for value in row]
+        elif extension in ('xlsx', 'xlsm'):
+            openpyxl = optional_import('openpyxl')
+            if openpyxl is None:
+                raise RoundResultError("Excel upload not available - openpyxl not installed")
+            try:
+                workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+            except Exception as e:
+                raise RoundResultError(f"Could not read the workbook: {str(e)}")
+            try:
+                for row in workbook.worksheets[0].iter_rows(values_only=True):
+                    yield [_cell(value) for value in row]
+            finally:
+                workbook.close()
+        else:
+            raise RoundResultError("Upload a .csv or .xlsx file")
+
+    # --- Import -------------------------------------------------------------------
+
+    def import_results(self, round_id: int, file, filename: str, partial: bool = False, dry_run: bool = False,
+                       replace: bool = False, notify: bool = True, changed_by: Optional[int] = None) -> Dict[str, Any]:
+        """Validate and apply a result sheet for one round; returns a summary
+
+        Candidates who already have a result for the round are refused
+        unless ``replace`` is set; see ``_write`` for how corrections move
+        their applications.
+        """
+        started = time.perf_counter()
+        round_ = db.session.get(RecruitmentRound, round_id)
+        if not round_:
+            raise LookupError('Round not found')
+        drive = db.session.get(PlacementDrive, round_.drive_id)
+        next_round = db.session.execute(
+            select(RecruitmentRound.round_name)
+            .where(RecruitmentRound.drive_id == round_.drive_id, RecruitmentRound.order > (round_.order or 0))
+            .order_by(RecruitmentRound.order, RecruitmentRound.id).limit(1)
+        ).scalar()
+
+        applications = self._applications(round_.drive_id)
+        by_id = {str(candidate['application_id']): candidate for candidate in applications}
+        by_roll = {candidate['roll'].upper(): candidate for candidate in applications}
+
+        summary = {
+            'round_id': round_id,
+            'round_name': round_.round_name,
+            'next_round': next_round,
+            'rows': 0,
+            'valid': 0,
+            'passed': 0,
+            'failed': 0,
+            'absent': 0,
+            'errors': [],
+            'error_count': 0,
+            'shortlisted': 0,
+            'selected': 0,
+            'rejected': 0,
+            'unchanged': 0,
+            'replaced': 0,
+            'corrected': 0,
+            'conflicts': [],
+            'emails_queued': 0,
+            'applied': False,
+        }
+        results = self._validate(round_, self.rows(file, filename), by_id, by_roll, summary)
+        summary['valid'] = len(results)
+
+        previous = dict(db.session.execute(
+            select(RoundResult.application_id, RoundResult.result).where(
+                RoundResult.round_id == round_id,
+                RoundResult.application_id.in_([result['candidate']['application_id'] for result in results]))
+        ).all()) if results else {}
+        for result in results:
+            result['previous'] = previous.get(result['candidate']['application_id'])
+        summary['replaced'] = len(previous)
+        if previous and not replace and not dry_run:
+            raise RoundResultError(f'{len(previous)} candidates already have results for this round; '
+                                   'upload again with replace=true to correct them')
+
+        if summary['error_count'] and not partial:
+            summary['elapsed'] = round(time.perf_counter() - started, 3)
+            return summary
+        if dry_run or not results:
+            summary['elapsed'] = round(time.perf_counter() - started, 3)
+            return summary
+
+        self._write(round_, results, next_round, changed_by, summary)
+        summary['applied'] = True
+        if notify:
+            # Candidates whose result did not change were told already
+            changed = [result for result in results if result['previous'] != result['result']]
+            summary['emails_queued'] = self._notify(round_, drive, changed, next_round)
+        summary['elapsed'] = round(time.perf_counter() - started, 3)
+        return summary
+
+    def _applications(self, drive_id: int) -> List[Dict[str, Any]]:
+        """Every application of the drive with what validation and emails need"""
+        stmt = (
+            select(StudentApplication.id, StudentApplication.application_status, StudentProfile.student_id,
+                   StudentProfile.first_name, StudentProfile.last_name, User.id, User.email)
+            .join(StudentProfile, StudentApplication.student_id == StudentProfile.id)
+            .join(User, StudentProfile.user_id == User.id)
+            .where(StudentApplication.drive_id == drive_id)
+        )
+        return [{
+            'application_id': application_id, 'status': status, 'roll': roll,
+            'name': f'{first_name} {last_name}', 'user_id': user_id, 'email': email,
+        } for application_id, status, roll, first_name, last_name, user_id, email in db.session.execute(stmt)]
+
+    def _validate(self, round_: RecruitmentRound, rows: Iterator[List[str]], by_id, by_roll,
+                  summary: Dict[str, Any]) -> List[Dict[str, Any]]:
+        header = next(rows, None)
+        if not header:
+            raise RoundResultError('The file is empty')
+        columns = {_header(name): position for position, name in enumerate(header) if _header(name)}
+        id_column = next((name for name in _ID_COLUMNS if name in columns), None)
+        if id_column is None:
+            raise RoundResultError(f"Missing an id column ({', '.join(_ID_COLUMNS)})")
+        score_column = next((name for name in ('score', 'marks', 'marks_obtained') if name in columns), None)
+        if score_column is None and 'result' not in columns:
+            raise RoundResultError('Missing a score or result column')
+        if round_.passing_score is None and 'result' not in columns:
+            raise RoundResultError('The round has no passing score; add a result column (pass/fail/absent)')
+
+        max_score = Decimal(round_.max_score) if round_.max_score is not None else None
+        passing = Decimal(round_.passing_score) if round_.passing_score is not None else None
+        lookup = by_id if id_column == 'application_id' else by_roll
+        seen = set()
+        results = []
+
+        def error(line, message):
+            summary['error_count'] += 1
+            if len(summary['errors']) < _REPORT_LIMIT:
+                summary['errors'].append({'row': line, 'error': message})
+
+        def value(row, name):
+            position = columns.get(name)
+            return row[position] if position is not None and position < len(row) else ''
+
+        for line, row in enumerate(rows, start=2):
+            if not any(row):
+                continue
+            summary['rows'] += 1
+            if summary['rows'] > self.max_rows:
+                raise RoundResultError(f'At most {self.max_rows} rows per upload')
+
+            key = value(row, id_column)
+            candidate = lookup.get(key.upper() if id_column != 'application_id' else key)
+            if candidate is None:
+                error(line, f"{key or 'empty id'}: no application for this drive")
+                continue
+            if candidate['application_id'] in seen:
+                error(line, f'{key}: listed more than once')
+                continue
+
+            score = None
+            raw_score = value(row, score_column) if score_column else ''
+            if raw_score:
+                try:
+                    score = Decimal(raw_score)
+                except InvalidOperation:
+                    error(line, f'{key}: score {raw_score!r} is not a number')
+                    continue
+                if not score.is_finite():
+                    error(line, f'{key}: score {raw_score!r} is not a number')
+                    continue
+                if score < 0 or (max_score is not None and score > max_score) or score >= 1000:
+                    error(line, f'{key}: score {raw_score} is out of range')
+                    continue
+
+            raw_result = value(row, 'result').lower()
+            if raw_result:
+                outcome = _RESULT_ALIASES.get(raw_result)
+                if outcome is None:
+                    error(line, f"{key}: result must be one of {', '.join(RESULTS)}")
+                    continue
+            elif score is None:
+                outcome = 'absent'
+            elif passing is None:
+                error(line, f'{key}: result required: round has no passing score')
+                continue
+            else:
+                outcome = 'pass' if score >= passing else 'fail'
+
+            seen.add(candidate['application_id'])
+            summary[{'pass': 'passed', 'fail': 'failed', 'absent': 'absent'}[outcome]] += 1
+            results.append({'candidate': candidate, 'score': score, 'result': outcome,
+                            'feedback': value(row, 'feedback') or None})
+        return results
+
+    def _write(self, round_: RecruitmentRound, results: List[Dict[str, Any]], next_round: Optional[str],
+               changed_by: Optional[int], summary: Dict[str, Any]):
+        """Replace the candidates' results and move their applications.
+
+        New results move open applications forward or to ``rejected``. A
+        replaced result whose outcome changed undoes the earlier move: the
+        application goes from the status the earlier upload gave it to the
+        status the new outcome gives (a correction in the status history).
+        Applications that have moved on since then are not touched and are
+        reported as conflicts.
+        """
+        now = datetime.utcnow()
+        advance_to = 'shortlisted' if next_round else 'selected'
+
+        def status_for(outcome):
+            return advance_to if outcome == 'pass' else 'rejected'
+
+        application_ids = [result['candidate']['application_id'] for result in results]
+        moves: Dict[str, List[int]] = {}
+        corrections: Dict[tuple, List[int]] = {}
+        for result in results:
+            application_id = result['candidate']['application_id']
+            target = status_for(result['result'])
+            if result['previous'] is None:
+                moves.setdefault(target, []).append(application_id)
+            elif status_for(result['previous']) != target:
+                corrections.setdefault((status_for(result['previous']), target), []).append(application_id)
+
+        try:
+            db.session.execute(delete(RoundResult).where(
+                RoundResult.round_id == round_.id, RoundResult.application_id.in_(application_ids)))
+            db.session.execute(insert(RoundResult), [{
+                'application_id': result['candidate']['application_id'],
+                'round_id': round_.id,
+                'round_name': round_.round_name,
+                'round_type': round_.round_type,
+                'score': result['score'],
+                'max_score': round_.max_score,
+                'result': result['result'],
+                'feedback': result['feedback'],
+                'conducted_at': round_.scheduled_date or now,
+                'created_at': now,
+            } for result in results])
+            change_feed.record(db.session, RoundResult.__tablename__, 'insert')
+
+            moved = 0
+            for status, ids in moves.items():
+                # Decided applications are never moved by an upload
+                transition = application_status.transition(status, ids, from_statuses=OPEN_STATUSES,
+                                                           changed_by=changed_by)
+                summary[status] += transition['updated']
+                moved += transition['updated']
+            for (earlier, status), ids in corrections.items():
+                transition = application_status.transition(status, ids, from_statuses=[earlier],
+                                                           changed_by=changed_by, correction=True)
+                summary[status] += transition['updated']
+                summary['corrected'] += transition['updated']
+                moved += transition['updated']
+                summary['conflicts'].extend(sorted(set(ids) - set(transition['application_ids'])))
+            summary['unchanged'] = len(results) - moved
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _notify(self, round_: RecruitmentRound, drive: PlacementDrive, results: List[Dict[str, Any]],
+                next_round: Optional[str]) -> int:
+        company_name = db.session.execute(
+            select(Company.name).where(Company.id == drive.company_id)).scalar() if drive else ''
+        if next_round:
+            passed_message = f'You have been shortlisted for the next round: {next_round}.'
+        else:
+            passed_message = 'This was the final round. The placement cell will contact you about the next steps.'
+        recipients = [{
+            'email': result['candidate']['email'],
+            'user_id': result['candidate']['user_id'],
+            'variables': {
+                'student_name': result['candidate']['name'],
+                'company_name': company_name,
+                'drive_title': drive.title if drive else '',
+                'position': drive.job_role if drive else '',
+                'round_name': round_.round_name,
+                'result': 'cleared' if result['result'] == 'pass' else 'not cleared',
+                'result_message': passed_message if result['result'] == 'pass' else
+                'Thank you for participating. We wish you the best for the upcoming drives.',
+            },
+        } for result in results if result['candidate']['email']]
+        return email_service.queue_templated_emails('result_announced', recipients)
+
+
+# Global round result importer instance
+round_result_importer = RoundResultImporter()
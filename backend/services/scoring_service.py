@@ -0,0 +1,361 @@
+"""Application fit scores (``StudentApplication.ai_score``).
+
+``score_version`` records which scorer produced a score: ``local-<n>`` for
+the rule-based scorer and ``llm-<n>:<model>`` for LLM scores. Bump
+``LOCAL_SCORE_VERSION`` or ``LLM_SCORE_VERSION`` when the scoring logic or
+prompt changes; every score with another version is then stale.
+
+``rescore`` recomputes stale scores in bulk. It walks applications in
+primary-key order (``WHERE id > :last ORDER BY id LIMIT :n``, so each chunk
+is an index range scan however far the run has got), scores a chunk, writes
+it back with one executemany UPDATE and then saves a checkpoint holding the
+last id done. A run that is interrupted resumes after its checkpoint, and
+rows already at the target version are never selected, so no work is
+repeated. LLM scoring keeps ``LLM_MAX_CONCURRENCY`` calls in flight (the
+LLM gateway's limit), identical inputs within a chunk are scored once, and
+calls that fall back to the local scorer are stamped with the local
+version so a later LLM run picks them up again.
+
+Run it with ``python score_applications.py``.
+
+Scores are also kept fresh incrementally: when a committed write changes
+a student's skills or CGPA, or a drive's required skills or minimum CGPA,
+the change feed hands the ids to ``_on_change``. It marks the affected
+applications stale (``score_version = NULL``, so the batch job would also
+catch them after a crash) and a background worker re-scores just those,
+after ``SCORING_INCREMENTAL_DELAY`` seconds so a burst of edits is handled
+in one pass.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import db, PlacementDrive, StudentApplication, StudentProfile, parse_json_list
+from services.ai_service import ai_service
+from services.change_feed import change_feed
+from services.llm_gateway import llm_gateway
+from services.skill_extractor import skill_extractor
+
+LOCAL_SCORE_VERSION = 1
+LLM_SCORE_VERSION = 1
+
+SCORE_MODES = ('auto', 'local', 'llm')
+
+# Columns that feed the score; writes to them make existing scores stale
+STUDENT_SCORE_FIELDS = frozenset(['skills', 'cgpa'])
+DRIVE_SCORE_FIELDS = frozenset(['required_skills', 'min_cgpa'])
+
+
+class ScoringService:
+    def __init__(self):
+        self.app = None
+        self.checkpoint_path = None
+        self.batch_size = 500
+        self.incremental = True
+        self.incremental_delay = 2.0
+        self.incremental_mode = 'auto'
+        self._checkpoint_lock = threading.Lock()
+        self._dirty = threading.Condition()
+        self._dirty_students = set()
+        self._dirty_drives = set()
+        self._worker = None
+
+    def init_app(self, app: Flask):
+        """Initialize the scoring service with Flask app"""
+        self.app = app
+        self.checkpoint_path = app.config.get('SCORING_CHECKPOINT_PATH') or os.path.join(
+            app.instance_path, 'scoring_checkpoints.json')
+        self.batch_size = app.config.get('SCORING_BATCH_SIZE', 500)
+        self.incremental = app.config.get('SCORING_INCREMENTAL', True)
+        self.incremental_delay = app.config.get('SCORING_INCREMENTAL_DELAY', 2.0)
+        self.incremental_mode = app.config.get('SCORING_INCREMENTAL_MODE', 'auto')
+        app.extensions['scoring_service'] = self
+        if self.incremental:
+            change_feed.subscribe(['student_profiles', 'placement_drives'], self._on_change)
+
+    # --- Versions -------------------------------------------------------------
+
+    def local_version(self) -> str:
+        return f'local-{LOCAL_SCORE_VERSION}'
+
+    def llm_version(self) -> str:
+        model = self.app.config.get('OPENAI_MODEL', 'gpt-3.5-turbo') if self.app else 'unknown'
+        return f'llm-{LLM_SCORE_VERSION}:{model}'[:40]
+
+    def target_version(self, mode: str = 'auto') -> str:
+        """Version a run in ``mode`` brings scores to"""
+        if mode == 'llm' or (mode == 'auto' and ai_service.is_enabled()):
+            return self.llm_version()
+        return self.local_version()
+
+    # --- Scoring --------------------------------------------------------------
+
+    def score(self, skills: List[str], required_skills: List[str], cgpa: Optional[float],
+              min_cgpa: Optional[float], mode: str = 'auto') -> Tuple[Optional[float], str]:
+        """(score, version) for one student/drive pair.
+
+        Pairs without skills on either side get no score, as at apply time.
+        """
+        if not skills or not required_skills:
+            return None, self.local_version()
+        cgpa = float(cgpa) if cgpa else 0.0
+        min_cgpa = float(min_cgpa) if min_cgpa else 0.0
+        if mode == 'local' or (mode == 'auto' and not ai_service.is_enabled()):
+            result = ai_service._calculate_basic_fit_score(skills, required_skills, cgpa, min_cgpa)
+        else:
+            result = ai_service.calculate_job_fit_score(skills, required_skills, cgpa, min_cgpa)
+        if not result.get('success'):
+            return None, self.local_version()
+        try:
+            total = round(min(100.0, max(0.0, float(result['ai_score']['total_score']))), 2)
+        except (KeyError, TypeError, ValueError):
+            return None, self.local_version()
+        return total, self.llm_version() if result.get('is_ai_generated') else self.local_version()
+
+    def score_application(self, profile: StudentProfile, drive: PlacementDrive,
+                          mode: str = 'auto') -> Tuple[Optional[float], str]:
+        return self.score(profile.get_skills(), drive.get_required_skills(), profile.cgpa, drive.min_cgpa, mode)
+
+    # --- Batch re-scoring -----------------------------------------------------
+
+    def rescore(self, mode: str = 'auto', batch_size: Optional[int] = None, concurrency: Optional[int] = None,
+                drive_ids: Iterable[int] = (), student_ids: Iterable[int] = (), force: bool = False,
+                resume: bool = True, limit: Optional[int] = None, checkpoint: bool = True,
+                progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Bring stale application scores to the target version of ``mode``.
+
+        ``force`` re-scores rows already at the target version (a new
+        checkpoint is started). ``limit`` stops after that many rows, e.g.
+        to spread a run over several invocations. ``checkpoint=False`` skips
+        the checkpoint file for short runs. Returns run statistics.
+        """
+        if mode not in SCORE_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(SCORE_MODES)}")
+        version = self.target_version(mode)
+        if version == self.local_version():
+            mode = 'local'
+        batch_size = batch_size or self.batch_size
+        workers = 1 if mode == 'local' else max(1, concurrency or llm_gateway.max_concurrency)
+        drive_ids, student_ids = sorted(set(drive_ids)), sorted(set(student_ids))
+
+        job = f'{version}|drives={",".join(map(str, drive_ids))}|students={",".join(map(str, student_ids))}'
+        saved = self.load_checkpoint(job) if checkpoint and resume and not force else None
+        stats = {
+            'job': job,
+            'version': version,
+            'mode': mode,
+            'last_id': saved['last_id'] if saved else 0,
+            'scored': 0,
+            'unscored': 0,
+            'downgraded': 0,
+            'batches': 0,
+            'resumed': saved is not None,
+            'started_at': datetime.utcnow().isoformat()
+        }
+        started = time.perf_counter()
+
+        criteria = []
+        if not force:
+            criteria.append(or_(StudentApplication.score_version.is_(None),
+                                StudentApplication.score_version != version))
+        if drive_ids:
+            criteria.append(StudentApplication.drive_id.in_(drive_ids))
+        if student_ids:
+            criteria.append(StudentApplication.student_id.in_(student_ids))
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rescore') as pool:
+            while limit is None or stats['scored'] + stats['unscored'] < limit:
+                size = batch_size if limit is None else min(batch_size, limit - stats['scored'] - stats['unscored'])
+                rows = self._chunk(stats['last_id'], size, criteria)
+                if not rows:
+                    break
+                updates = self._score_chunk(rows, mode, version, pool)
+                self._write(updates)
+                stats['last_id'] = rows[-1][0]
+                stats['batches'] += 1
+                for item in updates:
+                    if item['ai_score'] is None:
+                        stats['unscored'] += 1
+                    else:
+                        stats['scored'] += 1
+                    if item['score_version'] != version:
+                        stats['downgraded'] += 1
+                stats['elapsed'] = round(time.perf_counter() - started, 3)
+                if checkpoint:
+                    self.save_checkpoint(job, stats)
+                if progress:
+                    progress(dict(stats))
+
+        stats['elapsed'] = round(time.perf_counter() - started, 3)
+        stats['finished'] = not self._chunk(stats['last_id'], 1, criteria)
+        if stats['finished'] and checkpoint:
+            self.clear_checkpoint(job)
+        return stats
+
+    def _chunk(self, last_id: int, size: int, criteria) -> list:
+        stmt = (select(StudentApplication.id, StudentProfile.skills, StudentProfile.cgpa,
+                       PlacementDrive.required_skills, PlacementDrive.min_cgpa)
+                .join(StudentProfile, StudentProfile.id == StudentApplication.student_id)
+                .join(PlacementDrive, PlacementDrive.id == StudentApplication.drive_id)
+                .where(StudentApplication.id > last_id, *criteria)
+                .order_by(StudentApplication.id)
+                .limit(size))
+        return db.session.execute(stmt).all()
+
+    def _score_chunk(self, rows, mode, version, pool) -> List[Dict[str, Any]]:
+        inputs = {}
+        for application_id, skills, cgpa, required_skills, min_cgpa in rows:
+            skills = parse_json_list(skills)
+            required = parse_json_list(required_skills)
+            key = (tuple(sorted(skill_extractor.canonical_set(skills))), tuple(required),
+                   float(cgpa) if cgpa is not None else None, float(min_cgpa) if min_cgpa is not None else None)
+            inputs.setdefault(key, (skills, required, cgpa, min_cgpa, []))[4].append(application_id)
+
+        app = self.app
+
+        def run(args):
+            skills, required, cgpa, min_cgpa, _ = args
+            with app.app_context():
+                return self.score(skills, required, cgpa, min_cgpa, mode)
+
+        if mode == 'local':
+            results = [run(args) for args in inputs.values()]
+        else:
+            results = list(pool.map(run, inputs.values()))
+
+        updates = []
+        for (_, _, _, _, ids), (score, scored_version) in zip(inputs.values(), results):
+            for application_id in ids:
+                updates.append({'id': application_id, 'ai_score': score, 'score_version': scored_version})
+        updates.sort(key=lambda item: item['id'])
+        return updates
+
+    def _write(self, updates: List[Dict[str, Any]]):
+        """Store a chunk of scores in one transaction and publish the change"""
+        if not updates:
+            return
+        try:
+            db.session.execute(update(StudentApplication), updates)
+            # Bulk UPDATEs bypass the unit of work, so tell the change feed
+            change_feed.record(db.session, StudentApplication.__tablename__, 'update',
+                               [item['id'] for item in updates], ('ai_score', 'score_version'))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    # --- Incremental re-scoring -----------------------------------------------
+
+    def _on_change(self, events):
+        students, drives = set(), set()
+        for event in events:
+            # Core statements without primary keys cannot be traced to rows;
+            # the batch job covers those
+            if event.op != 'update' or event.pk is None:
+                continue
+            if event.table == 'student_profiles' and STUDENT_SCORE_FIELDS.intersection(event.changed):
+                students.add(event.pk)
+            elif event.table == 'placement_drives' and DRIVE_SCORE_FIELDS.intersection(event.changed):
+                drives.add(event.pk)
+        if students or drives:
+            self.mark_stale(students, drives)
+
+    def mark_stale(self, student_ids: Iterable[int] = (), drive_ids: Iterable[int] = ()):
+        """Invalidate the scores of these students' and drives' applications and queue them"""
+        student_ids, drive_ids = set(student_ids), set(drive_ids)
+        criteria = []
+        if student_ids:
+            criteria.append(StudentApplication.student_id.in_(student_ids))
+        if drive_ids:
+            criteria.append(StudentApplication.drive_id.in_(drive_ids))
+        if not criteria:
+            return
+        try:
+            # Own short transaction: this runs after the caller's commit
+            with db.engine.begin() as connection:
+                connection.execute(update(StudentApplication).where(or_(*criteria)).values(score_version=None))
+        except SQLAlchemyError as e:
+            print(f"Error marking scores stale: {str(e)}")
+            return
+        with self._dirty:
+            self._dirty_students.update(student_ids)
+            self._dirty_drives.update(drive_ids)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name='rescore-incremental', daemon=True)
+                self._worker.start()
+            self._dirty.notify()
+
+    def _work(self):
+        while True:
+            with self._dirty:
+                while not (self._dirty_students or self._dirty_drives):
+                    self._dirty.wait()
+            # Let a burst of edits accumulate
+            time.sleep(self.incremental_delay)
+            with self._dirty:
+                students, self._dirty_students = self._dirty_students, set()
+                drives, self._dirty_drives = self._dirty_drives, set()
+            with self.app.app_context():
+                try:
+                    if students:
+                        self.rescore(mode=self.incremental_mode, student_ids=students, checkpoint=False)
+                    if drives:
+                        self.rescore(mode=self.incremental_mode, drive_ids=drives, checkpoint=False)
+                except Exception as e:
+                    print(f"Incremental re-scoring failed: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def pending(self) -> Dict[str, int]:
+        """Students and drives waiting for the incremental worker"""
+        with self._dirty:
+            return {'students': len(self._dirty_students), 'drives': len(self._dirty_drives)}
+
+    # --- Checkpoints ----------------------------------------------------------
+
+    def _read_checkpoints(self) -> Dict[str, Any]:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_checkpoints(self, checkpoints: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        temp_path = f'{self.checkpoint_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(checkpoints, file, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def load_checkpoint(self, job: str) -> Optional[Dict[str, Any]]:
+        with self._checkpoint_lock:
+            return self._read_checkpoints().get(job)
+
+    def save_checkpoint(self, job: str, stats: Dict[str, Any]):
+        with self._checkpoint_lock:
+            checkpoints = self._read_checkpoints()
+            checkpoints[job] = dict(stats, updated_at=datetime.utcnow().isoformat())
+            self._write_checkpoints(checkpoints)
+
+    def clear_checkpoint(self, job: str):
+        with self._checkpoint_lock:
+            checkpoints = self._read_checkpoints()
+            if checkpoints.pop(job, None) is not None:
+                self._write_checkpoints(checkpoints)
+
+    def checkpoints(self) -> Dict[str, Any]:
+        """Unfinished runs, by job"""
+        with self._checkpoint_lock:
+            return self._read_checkpoints()
+
+
+# Global scoring service instance
+scoring_service = ScoringService()
@@ -0,0 +1,375 @@
+"""Full-text search over placement drives, companies and student profiles.
+
+Every searchable row has a document in ``search_documents``: a title (drive
+title, company name, student name) and a body (role, description,
+requirements, skills, industry, resume text). Documents follow the change
+feed: committed writes to the source tables queue the row ids and a
+background worker rebuilds just those documents, ``SEARCH_INDEX_DELAY``
+seconds later so a burst of edits is indexed in one pass (reading resumes
+can take a while, so requests never wait for it). ``python
+build_search_index.py`` indexes everything; the first search on an empty
+index starts the same full build in the background.
+
+The backend follows the database dialect:
+
+* SQLite: an external-content FTS5 table ``search_fts`` over
+  ``search_documents``, kept in sync by triggers and ranked with BM25
+  (title matches weigh ``SEARCH_TITLE_WEIGHT`` times body matches);
+* MySQL: the ``FULLTEXT`` index on ``(title, body)``, queried in boolean
+  mode and ranked by relevance;
+* anything else: ``LIKE`` filters, unranked.
+
+Every query word must occur and is matched as a prefix, so "pyth dev"
+finds "Python developer".
+"""
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from flask import Flask
+from sqlalchemy import (and_, bindparam, column, delete, func, insert, literal_column, null, or_, select, table,
+                        text)
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import db, Company, PlacementDrive, SearchDocument, StudentProfile
+from services.change_feed import change_feed
+from services.file_service import file_service
+from services.resume_extraction import resume_extraction_service
+
+KINDS = ('drive', 'company', 'student')
+
+# Source table -> (kind, columns whose changes alter the document)
+_SOURCES = {
+    'placement_drives': ('drive', frozenset([
+        'title', 'job_role', 'description', 'requirements', 'required_skills', 'location', 'status',
+        'company_id'])),
+    'companies': ('company', frozenset(['name', 'industry', 'description', 'is_active'])),
+    'student_profiles': ('student', frozenset([
+        'first_name', 'last_name', 'student_id', 'skills', 'resume_file', 'department_id', 'is_active'])),
+}
+_MODELS = {'drive': PlacementDrive, 'company': Company, 'student': StudentProfile}
+
+_WORD = re.compile(r'\w+')
+_MAX_TERMS = 8
+
+_search_fts = table('search_fts', column('rowid'))
+
+_SQLITE_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', "
+    "tokenize='porter unicode61', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+)
+
+
+def _json_text(raw) -> str:
+    if not raw:
+        return ''
+    try:
+        value = json.loads(raw)
+    except (TypeError, ValueError):
+        return str(raw)
+    return ', '.join(str(item) for item in value) if isinstance(value, list) else str(value)
+
+
+def _join(*parts) -> str:
+    return '\n'.join(str(part) for part in parts if part)
+
+
+def query_terms(query: str) -> List[str]:
+    return _WORD.findall((query or '').lower())[:_MAX_TERMS]
+
+
+class SearchService:
+    def __init__(self):
+        self.app = None
+        self.title_weight = 5.0
+        self.index_delay = 1.0
+        self.resume_max_chars = 20000
+        self.batch_size = 500
+        self._schema_ready = False
+        self._checked_empty = False
+        self._schema_lock = threading.Lock()
+        self._dirty = threading.Condition()
+        self._pending: Dict[str, set] = {kind: set() for kind in KINDS}
+        self._full = set()
+        self._worker = None
+
+    def init_app(self, app: Flask):
+        """Initialize the search service with Flask app"""
+        self.app = app
+        self.title_weight = app.config.get('SEARCH_TITLE_WEIGHT', 5.0)
+        self.index_delay = app.config.get('SEARCH_INDEX_DELAY', 1.0)
+        self.resume_max_chars = app.config.get('SEARCH_RESUME_MAX_CHARS', 20000)
+        self._schema_ready = False
+        self._checked_empty = False
+        app.extensions['search_service'] = self
+        change_feed.subscribe(list(_SOURCES), self._on_change)
+
+    @property
+    def backend(self) -> str:
+        dialect = db.engine.dialect.name
+        return dialect if dialect in ('sqlite', 'mysql') else 'like'
+
+    def ensure_schema(self):
+        """Create the SQLite FTS table and triggers once per process"""
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            if self.backend == 'sqlite':
+                with db.engine.begin() as connection:
+                    exists = connection.execute(text(
+                        "SELECT 1 FROM sqlite_master WHERE name = 'search_fts'")).first()
+                    for statement in _SQLITE_SCHEMA:
+                        connection.execute(text(statement))
+                    if not exists:
+                        # Index documents written before the FTS table existed
+                        connection.execute(text("INSERT INTO search_fts(search_fts) VALUES ('rebuild')"))
+            self._schema_ready = True
+
+    # --- Queries --------------------------------------------------------------
+
+    def search(self, query: str, kinds: Iterable[str] = KINDS, page: int = 1, per_page: int = 20,
+               active_only: bool = False, department_id: Optional[int] = None) -> Dict[str, Any]:
+        """Ranked, paginated matches for ``query``.
+
+        ``active_only`` hides draft/closed drives and inactive companies and
+        students; ``department_id`` limits student matches to one department.
+        """
+        kinds = [kind for kind in KINDS if kind in set(kinds)]
+        terms = query_terms(query)
+        result = {'query': query, 'results': [], 'counts': {kind: 0 for kind in kinds}, 'total': 0,
+                  'page': page, 'per_page': per_page, 'pages': 0, 'indexing': self.pending()}
+        if not terms or not kinds:
+            return result
+        self.ensure_schema()
+        self._check_empty()
+
+        filters = [SearchDocument.kind.in_(kinds)]
+        if active_only:
+            filters.append(SearchDocument.status == 'active')
+        if department_id is not None:
+            filters.append(or_(SearchDocument.kind != 'student', SearchDocument.department_id == department_id))
+
+        match, score, snippet, order = self._match(terms)
+        where = and_(match, *filters)
+        params = {'match': self._match_expression(terms)}
+        counts = db.session.execute(
+            self._from(select(SearchDocument.kind, func.count()).where(where).group_by(SearchDocument.kind)),
+            params
+        ).all()
+        result['counts'].update(dict((kind, count) for kind, count in counts))
+        result['total'] = sum(count for _, count in counts)
+        result['pages'] = (result['total'] + per_page - 1) // per_page
+        if result['total'] <= (page - 1) * per_page:
+            return result
+
+        stmt = self._from(select(
+            SearchDocument.kind, SearchDocument.ref_id, SearchDocument.title, SearchDocument.status,
+            score.label('score'), snippet.label('snippet')
+        ).where(where)).order_by(order, SearchDocument.id).limit(per_page).offset((page - 1) * per_page)
+        result['results'] = [{
+            'kind': row.kind,
+            'id': row.ref_id,
+            'title': row.title,
+            'status': row.status,
+            'snippet': row.snippet,
+            'score': round(float(row.score), 4) if row.score is not None else None
+        } for row in db.session.execute(stmt, params)]
+        return result
+
+    def _match_expression(self, terms: List[str]) -> str:
+        if self.backend == 'sqlite':
+            return ' '.join(f'"{term}"*' for term in terms)
+        return ' '.join(f'+{term}*' for term in terms)
+
+    def _match(self, terms: List[str]):
+        """(where clause, score, snippet, order) for the backend"""
+        backend = self.backend
+        if backend == 'sqlite':
+            # bm25() is lower for better matches
+            return (text('search_fts MATCH :match'),
+                    literal_column(f'-bm25(search_fts, {float(self.title_weight)}, 1.0)'),
+                    literal_column("snippet(search_fts, 1, '', '', '…', 16)"), text('score DESC'))
+        snippet = func.substr(SearchDocument.body, 1, 200)
+        if backend == 'mysql':
+            relevance = mysql_match(SearchDocument.title, SearchDocument.body,
+                                    against=bindparam('match')).in_boolean_mode()
+            return relevance, relevance, snippet, text('score DESC')
+        like = and_(*[or_(SearchDocument.title.ilike(f'%{term}%'), SearchDocument.body.ilike(f'%{term}%'))
+                      for term in terms])
+        return like, null(), snippet, SearchDocument.title
+
+    def _from(self, stmt):
+        if self.backend == 'sqlite':
+            return stmt.select_from(SearchDocument).join(_search_fts, _search_fts.c.rowid == SearchDocument.id)
+        return stmt
+
+    def _check_empty(self):
+        if self._checked_empty:
+            return
+        self._checked_empty = True
+        if db.session.execute(select(SearchDocument.id).limit(1)).first() is None:
+            self.queue_full(KINDS)
+
+    # --- Documents ------------------------------------------------------------
+
+    def documents(self, kind: str, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Search documents for existing rows among ``ids``"""
+        ids = list(ids)
+        if not ids:
+            return []
+        if kind == 'drive':
+            stmt = select(PlacementDrive, Company.name).outerjoin(
+                Company, Company.id == PlacementDrive.company_id).where(PlacementDrive.id.in_(ids))
+            return [{
+                'kind': kind, 'ref_id': drive.id, 'title': drive.title, 'status': drive.status,
+                'department_id': None,
+                'body': _join(drive.job_role, company_name, drive.location, drive.description, drive.requirements,
+                              _json_text(drive.required_skills)),
+            } for drive, company_name in db.session.execute(stmt)]
+        if kind == 'company':
+            stmt = select(Company).where(Company.id.in_(ids))
+            return [{
+                'kind': kind, 'ref_id': company.id, 'title': company.name,
+                'status': 'active' if company.is_active else 'inactive', 'department_id': None,
+                'body': _join(company.industry, company.description),
+            } for company in db.session.execute(stmt).scalars()]
+        stmt = select(StudentProfile).where(StudentProfile.id.in_(ids))
+        return [{
+            'kind': kind, 'ref_id': profile.id, 'title': f'{profile.first_name} {profile.last_name}',
+            'status': 'active' if profile.is_active else 'inactive', 'department_id': profile.department_id,
+            'body': _join(profile.student_id, _json_text(profile.skills), self._resume_text(profile.resume_file)),
+        } for profile in db.session.execute(stmt).scalars()]
+
+    def _resume_text(self, resume_file: Optional[str]) -> str:
+        if not resume_file:
+            return ''
+        path = os.path.join(file_service.upload_folder, 'resumes', resume_file)
+        if not os.path.exists(path):
+            return ''
+        return resume_extraction_service.extract_text(path)[:self.resume_max_chars]
+
+    def reindex(self, kind: str, ids: Iterable[int]) -> int:
+        """Rewrite the documents of these rows; rows that no longer exist lose theirs.
+
+        Meant for the indexing worker and the CLI: it ends the session's
+        transaction before writing.
+        """
+        ids = sorted(set(ids))
+        if not ids:
+            return 0
+        self.ensure_schema()
+        docs = self.documents(kind, ids)
+        # Release the read transaction (SQLite would otherwise block our own write)
+        db.session.rollback()
+        with db.engine.begin() as connection:
+            connection.execute(delete(SearchDocument).where(
+                SearchDocument.kind == kind, SearchDocument.ref_id.in_(ids)))
+            if docs:
+                connection.execute(insert(SearchDocument), docs)
+        return len(docs)
+
+    def rebuild(self, kinds: Iterable[str] = KINDS,
+                progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+        """Index every row of ``kinds`` in primary-key chunks and drop stale documents"""
+        self.ensure_schema()
+        indexed = {}
+        for kind in kinds:
+            model = _MODELS[kind]
+            last_id, indexed[kind] = 0, 0
+            while True:
+                ids = db.session.execute(select(model.id).where(model.id > last_id)
+                                         .order_by(model.id).limit(self.batch_size)).scalars().all()
+                if not ids:
+                    break
+                indexed[kind] += self.reindex(kind, ids)
+                last_id = ids[-1]
+                if progress:
+                    progress(kind, indexed[kind])
+            with db.engine.begin() as connection:
+                connection.execute(delete(SearchDocument).where(
+                    SearchDocument.kind == kind, SearchDocument.ref_id.notin_(select(model.id))))
+        return indexed
+
+    # --- Incremental updates --------------------------------------------------
+
+    def _on_change(self, events):
+        changed: Dict[str, set] = {kind: set() for kind in KINDS}
+        full = set()
+        for event in events:
+            kind, fields = _SOURCES[event.table]
+            if event.op == 'update' and not fields.intersection(event.changed):
+                continue
+            if event.pk is None:
+                full.add(kind)
+            else:
+                changed[kind].add(event.pk)
+        if full:
+            self.queue_full(full)
+        for kind, ids in changed.items():
+            if ids:
+                self.queue(kind, ids)
+
+    def queue(self, kind: str, ids: Iterable[int]):
+        """Reindex these rows in the background"""
+        with self._dirty:
+            self._pending[kind].update(ids)
+            self._wake()
+
+    def queue_full(self, kinds: Iterable[str]):
+        with self._dirty:
+            self._full.update(kinds)
+            self._wake()
+
+    def _wake(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name='search-index', daemon=True)
+            self._worker.start()
+        self._dirty.notify()
+
+    def pending(self) -> bool:
+        """Whether documents are waiting to be (re)indexed"""
+        with self._dirty:
+            return bool(self._full or any(self._pending.values()))
+
+    def _work(self):
+        while True:
+            with self._dirty:
+                while not self.pending():
+                    self._dirty.wait()
+            # Let a burst of edits accumulate
+            time.sleep(self.index_delay)
+            with self._dirty:
+                full, self._full = self._full, set()
+                pending, self._pending = self._pending, {kind: set() for kind in KINDS}
+            with self.app.app_context():
+                try:
+                    if full:
+                        self.rebuild([kind for kind in KINDS if kind in full])
+                    if pending['company']:
+                        # Drive documents carry the company name
+                        pending['drive'].update(db.session.execute(select(PlacementDrive.id).where(
+                            PlacementDrive.company_id.in_(pending['company']))).scalars())
+                    for kind in KINDS:
+                        if kind not in full:
+                            self.reindex(kind, pending[kind])
+                except (SQLAlchemyError, OSError) as e:
+                    print(f"Search indexing failed: {str(e)}")
+                finally:
+                    db.session.remove()
+
+# Global search service instance
+search_service = SearchService()
@@ -0,0 +1,405 @@
+"""Offline semantic matching between students and placement drives.
+
+Every active student (resume text, skills, experience, education) and every
+drive (title, role, description, requirements, required skills) becomes a
+TF-IDF vector over hashed word unigrams and bigrams. Terms that name a
+skill in the skill taxonomy add a boosted ``skill:<name>`` feature, so
+synonyms such as "ReactJS" and "react" land on the same dimension.
+
+Vectors are L2-normalized and stored as compact CSR arrays (``int32``
+feature ids and ``float32`` weights, capped at ``SEMANTIC_MAX_TERMS`` terms
+per document), about 2 KB per resume. Cosine similarity for "top-k
+students for a drive" or "top-k drives for a student" is then a single
+vectorized gather and segmented sum (``np.add.reduceat``) over the other
+side's matrix. No model
+download or network access is involved.
+
+Builds never run on a request thread. The first query starts a background
+build (reading every resume can take minutes) and raises
+``SemanticIndexBuilding`` until it is ready; ``SEMANTIC_WARM_UP`` starts
+that build when the worker starts instead. The index is rebuilt when the
+``student_profiles`` or ``placement_drives`` data version moves (checked at
+most every ``SEMANTIC_REFRESH_INTERVAL`` seconds). Term counts are kept per
+document and reused when a row has not changed, so a rebuild only re-reads
+changed resumes; queries keep using the previous index while a rebuild runs.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from flask import Flask
+from sqlalchemy import select
+
+from models import db, PlacementDrive, StudentProfile
+from services.change_feed import change_feed
+from services.file_service import file_service
+from services.resume_extraction import resume_extraction_service
+from services.skill_extractor import normalize_term, skill_extractor
+from utils.lazy_imports import is_available, optional_import
+
+INDEX_TABLES = ('student_profiles', 'placement_drives')
+
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+_STOP_WORDS = frozenset('''
+a about above after all also am an and any are as at be been being below between both but by can
+could did do does doing down during each etc few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not of off on once only
+or other our ours out over own per same she should so some such than that the their them then there
+these they this those through to too under until up us very was we were what when where which while
+who whom why will with would you your yours
+'''.split())
+_SKILL_BOOST = 3
+
+
+class SemanticIndexBuilding(Exception):
+    """The first index of this worker is still being built"""
+
+    retry_after = 5
+
+
+def _flatten_text(value: Any) -> str:
+    """Join the string leaves of a parsed JSON value"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return ' '.join(_flatten_text(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(_flatten_text(item) for item in value)
+    return '' if value is None else str(value)
+
+
+def _json_text(raw: Optional[str]) -> str:
+    if not raw:
+        return ''
+    try:
+        return _flatten_text(json.loads(raw))
+    except ValueError:
+        return raw
+
+
+class _Matrix:
+    """Row-normalized sparse matrix in CSR layout"""
+
+    def __init__(self, np, ids: List[int], indptr, indices, data):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.positions = {doc_id: row for row, doc_id in enumerate(ids)}
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        # reduceat needs the start offsets of non-empty rows only
+        self._filled = np.flatnonzero(np.diff(indptr))
+        self._starts = indptr[self._filled]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes + self._starts.nbytes
+
+    def row(self, doc_id: int):
+        position = self.positions.get(doc_id)
+        if position is None:
+            return None
+        start, end = self.indptr[position], self.indptr[position + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def cosine(self, np, query_dense):
+        """Cosine similarity of every row with a dense, normalized query"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        if len(self._starts):
+            products = self.data * query_dense[self.indices]
+            scores[self._filled] = np.add.reduceat(products, self._starts)
+        return scores
+
+
+class SemanticIndex:
+    """Student and drive TF-IDF matrices over one hashed feature space"""
+
+    def __init__(self, np, n_features: int, students: _Matrix, drives: _Matrix,
+                 versions: Dict[str, int]):
+        self.np = np
+        self.n_features = n_features
+        self.students = students
+        self.drives = drives
+        self.versions = versions
+        self.built_at = time.time()
+
+    def _query(self, row) -> Any:
+        indices, data = row
+        dense = self.np.zeros(self.n_features, dtype=self.np.float32)
+        dense[indices] = data
+        return dense
+
+    def _top(self, matrix: _Matrix, scores, k: int, candidate_ids: Optional[Iterable[int]]):
+        np = self.np
+        if candidate_ids is not None:
+            positions = [matrix.positions[i] for i in candidate_ids if i in matrix.positions]
+            if not positions:
+                return []
+            positions = np.asarray(positions, dtype=np.int64)
+            scores = scores[positions]
+        else:
+            positions = np.arange(len(matrix), dtype=np.int64)
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(matrix.ids[positions[i]]), round(float(scores[i]), 4)) for i in best]
+
+    def top_students(self, drive_id: int, k: int = 10,
+                     student_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        row = self.drives.row(drive_id)
+        if row is None:
+            return []
+        scores = self.students.cosine(self.np, self._query(row))
+        return self._top(self.students, scores, k, student_ids)
+
+    def top_drives(self, student_id: int, k: int = 10,
+                   drive_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        row = self.students.row(student_id)
+        if row is None:
+            return []
+        scores = self.drives.cosine(self.np, self._query(row))
+        return self._top(self.drives, scores, k, drive_ids)
+
+    def similarity(self, student_id: int, drive_id: int) -> Optional[float]:
+        student, drive = self.students.row(student_id), self.drives.row(drive_id)
+        if student is None or drive is None:
+            return None
+        query = self._query(drive)
+        return round(float((student[1] * query[student[0]]).sum()), 4)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'students': len(self.students),
+            'drives': len(self.drives),
+            'features': self.n_features,
+            'nnz': int(len(self.students.indices) + len(self.drives.indices)),
+            'memory_bytes': self.students.nbytes + self.drives.nbytes,
+            'built_at': self.built_at
+        }
+
+
+def document_features(np, text: str, hash_bits: int, max_terms: int):
+    """Hashed unigram/bigram/skill counts of a document, top terms only"""
+    folded = normalize_term(text)
+    tokens = [token for token in _TOKEN.findall(folded) if token not in _STOP_WORDS]
+    terms = Counter(tokens)
+    terms.update(f'{first} {second}' for first, second in zip(tokens, tokens[1:]))
+
+    # One- and two-word skill names are looked up among the terms already
+    # counted, which is much cheaper than a second pass over the text
+    taxonomy = skill_extractor.taxonomy
+    skills = {taxonomy.aliases[term] for term in terms
+              if term in taxonomy.aliases and term not in taxonomy.case_sensitive}
+    for skill in skills:
+        terms[f'skill:{skill}'] += _SKILL_BOOST
+
+    # Hashing is per process; the index never leaves the process that built it
+    mask = (1 << hash_bits) - 1
+    hashed = Counter()
+    for term, count in terms.items():
+        hashed[hash(term) & mask] += count
+    top = hashed.most_common(max_terms)
+    indices = np.fromiter((feature for feature, _ in top), dtype=np.int32, count=len(top))
+    counts = np.fromiter((count for _, count in top), dtype=np.float32, count=len(top))
+    return indices, counts
+
+
+def build_index(np, students: List[tuple], drives: List[tuple], hash_bits: int,
+                versions: Optional[Dict[str, int]] = None) -> SemanticIndex:
+    """Index ``(id, feature ids, counts)`` documents of both sides"""
+    n_features = 1 << hash_bits
+    all_indices = [indices for _, indices, _ in students + drives]
+    df = np.bincount(np.concatenate(all_indices), minlength=n_features) if all_indices else \
+        np.zeros(n_features, dtype=np.int64)
+    idf = (np.log((1.0 + len(all_indices)) / (1.0 + df)) + 1.0).astype(np.float32)
+    return SemanticIndex(np, n_features, _matrix(np, students, idf), _matrix(np, drives, idf), versions or {})
+
+
+def _matrix(np, docs: List[tuple], idf) -> _Matrix:
+    lengths = np.fromiter((len(indices) for _, indices, _ in docs), dtype=np.int64, count=len(docs))
+    indptr = np.zeros(len(docs) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    if docs:
+        indices = np.concatenate([indices for _, indices, _ in docs]).astype(np.int32, copy=False)
+        counts = np.concatenate([counts for _, _, counts in docs])
+    else:
+        indices = np.zeros(0, dtype=np.int32)
+        counts = np.zeros(0, dtype=np.float32)
+
+    # Sublinear term frequency times idf, then L2-normalize each row
+    weights = ((1.0 + np.log(np.maximum(counts, 1.0))) * idf[indices]).astype(np.float32)
+    rows = np.repeat(np.arange(len(docs)), lengths)
+    norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(docs)))
+    norms[norms == 0] = 1.0
+    data = (weights / norms[rows]).astype(np.float32)
+    return _Matrix(np, [doc_id for doc_id, _, _ in docs], indptr, indices, data)
+
+
+class SemanticMatcher:
+    def __init__(self):
+        self.app = None
+        self.hash_bits = 18
+        self.max_terms = 256
+        self.max_chars = 8000
+        self.refresh_interval = 60
+        self._index = None
+        self._checked_at = 0.0
+        self._docs = {}
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def init_app(self, app: Flask):
+        """Initialize the matcher with Flask app.
+
+        The index is built in the background on first use, or right away
+        with ``SEMANTIC_WARM_UP``.
+        """
+        self.app = app
+        self.hash_bits = app.config.get('SEMANTIC_HASH_BITS', 18)
+        self.max_terms = app.config.get('SEMANTIC_MAX_TERMS', 256)
+        self.max_chars = app.config.get('SEMANTIC_TEXT_MAX_CHARS', 8000)
+        self.refresh_interval = app.config.get('SEMANTIC_REFRESH_INTERVAL', 60)
+        self._index = None
+        self._checked_at = 0.0
+        self._docs = {}
+        app.extensions['semantic_matcher'] = self
+        if app.config.get('SEMANTIC_WARM_UP') and self.is_available():
+            self._rebuild_async()
+
+    @staticmethod
+    def is_available() -> bool:
+        return is_available('numpy')
+
+    # --- Public API ---------------------------------------------------------
+
+    def top_students_for_drive(self, drive_id: int, k: int = 10,
+                               student_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """Students whose profile best matches a drive, best first"""
+        return [{'student_id': student_id, 'score': score}
+                for student_id, score in self.index().top_students(drive_id, k, student_ids)]
+
+    def top_drives_for_student(self, student_id: int, k: int = 10,
+                               drive_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """Drives that best match a student's profile, best first"""
+        return [{'drive_id': drive_id, 'score': score}
+                for drive_id, score in self.index().top_drives(student_id, k, drive_ids)]
+
+    def similarity(self, student_id: int, drive_id: int) -> Optional[float]:
+        return self.index().similarity(student_id, drive_id)
+
+    def index(self) -> SemanticIndex:
+        """The current index, rebuilding it when the underlying data changed.
+
+        Raises ``SemanticIndexBuilding`` until the first build has finished.
+        """
+        index = self._index
+        if index is None:
+            self._rebuild_async()
+            raise SemanticIndexBuilding('Semantic index is being built, try again shortly')
+
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_interval:
+            return index
+
+        self._checked_at = now
+        versions = change_feed.versions(INDEX_TABLES)
+        if index.versions == versions:
+            return index
+
+        # Serve the previous index while a background rebuild runs
+        self._rebuild_async(versions)
+        return index
+
+    def build(self, versions: Optional[Dict[str, int]] = None) -> SemanticIndex:
+        np = optional_import('numpy')
+        if np is None:
+            raise RuntimeError('numpy is required for semantic matching')
+        if versions is None:
+            versions = change_feed.versions(INDEX_TABLES)
+
+        started = time.perf_counter()
+        docs = {}
+        students = self._collect(docs, 'student', self._student_rows(), self._student_text)
+        drives = self._collect(docs, 'drive', self._drive_rows(), self._drive_text)
+        # Drop cached term counts of deleted or deactivated rows
+        self._docs = docs
+
+        index = build_index(np, students, drives, self.hash_bits, versions)
+        print(f"Semantic index built: {len(students)} students, {len(drives)} drives "
+              f"in {time.perf_counter() - started:.2f}s")
+        return index
+
+    def _rebuild_async(self, versions: Optional[Dict[str, int]] = None):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def rebuild():
+            try:
+                with self.app.app_context():
+                    self._index = self.build(versions)
+                    self._checked_at = time.monotonic()
+            except Exception as e:
+                print(f"Semantic index rebuild failed: {str(e)}")
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=rebuild, name='semantic-index', daemon=True).start()
+
+    # --- Documents ----------------------------------------------------------
+
+    def _student_rows(self):
+        stmt = select(
+            StudentProfile.id, StudentProfile.updated_at, StudentProfile.resume_file,
+            StudentProfile.skills, StudentProfile.experience, StudentProfile.education
+        ).where(StudentProfile.is_active == True).order_by(StudentProfile.id)
+        return db.session.execute(stmt)
+
+    def _drive_rows(self):
+        stmt = select(
+            PlacementDrive.id, PlacementDrive.updated_at, PlacementDrive.title, PlacementDrive.job_role,
+            PlacementDrive.description, PlacementDrive.requirements, PlacementDrive.required_skills
+        ).order_by(PlacementDrive.id)
+        return db.session.execute(stmt)
+
+    def _student_text(self, row) -> str:
+        parts = [_json_text(row.skills), _json_text(row.experience), _json_text(row.education)]
+        if row.resume_file:
+            path = os.path.join(file_service.upload_folder, 'resumes', row.resume_file)
+            if os.path.exists(path):
+                parts.append(resume_extraction_service.extract_text(path)[:self.max_chars])
+        return '\n'.join(parts)
+
+    @staticmethod
+    def _drive_text(row) -> str:
+        return '\n'.join(part for part in (
+            row.title, row.job_role, row.description, row.requirements, _json_text(row.required_skills)
+        ) if part)
+
+    def _collect(self, docs: Dict, kind: str, rows, to_text) -> List[tuple]:
+        """(id, feature ids, counts) per row, reusing counts of unchanged rows"""
+        np = optional_import('numpy')
+        collected = []
+        for row in rows:
+            key = (kind, row.id)
+            stamp = hash(tuple(row[1:]))
+            cached = self._docs.get(key)
+            if cached is None or cached[0] != stamp:
+                indices, counts = document_features(np, to_text(row), self.hash_bits, self.max_terms)
+                cached = (stamp, indices, counts)
+            docs[key] = cached
+            collected.append((row.id, cached[1], cached[2]))
+        return collected
+
+
+# Global semantic matcher instance
+semantic_matcher = SemanticMatcher()
@@ -0,0 +1,74 @@
+"""Single-flight execution of identical concurrent computations.
+
+When a drive goes live hundreds of identical reads arrive at once. With
+``SingleFlight.do(key, fn)`` the first caller for ``key`` (the leader)
+runs ``fn``; callers arriving while it is in flight wait for the leader
+and receive the same result (or exception) instead of recomputing it.
+Nothing is kept once the flight lands; pair it with the cache for reuse
+over time.
+
+Each group reports ``singleflight.<name>.executed`` and
+``singleflight.<name>.shared`` (computations saved) to the metrics
+registry.
+"""
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+from services.metrics import metrics
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """A group of keyed in-flight computations"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run ``fn`` once for all concurrent callers with the same ``key``.
+
+        Waiters that give up after ``timeout`` seconds run ``fn`` themselves.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            if call.done.wait(timeout):
+                metrics.incr(f'singleflight.{self.name}.shared')
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            metrics.incr(f'singleflight.{self.name}.timeouts')
+            return fn()
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            metrics.incr(f'singleflight.{self.name}.executed')
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,272 @@
+"""Skill autocomplete.
+
+Suggestions come from the skill taxonomy (canonical names and synonyms)
+and from the skills students and TPOs have actually typed, ranked by how
+many student profiles and drives use each skill. Picking a suggestion
+stores the canonical name, so free-form variants ("ReactJS", "react js")
+stop accumulating and exact matching at scoring time works more often.
+
+The index is a sorted list of search keys (every name and synonym, plus
+each word suffix of multi-word names, so "learn" finds "machine learning")
+with the canonical skill of each key. A prefix query is a ``bisect`` into
+that list followed by a scan over the keys sharing the prefix; results are
+cached per prefix until a count changes. Skills outside the taxonomy are
+only suggested once ``AUTOCOMPLETE_MIN_COUNT`` profiles or drives use them,
+which keeps one-off typos out.
+
+Counts are kept up to date incrementally: the change feed reports committed
+writes to ``student_profiles`` and ``placement_drives``, and the next query
+re-reads just those rows and applies the difference. Writes made by other
+worker processes (and Core statements without primary keys) are picked up
+by a full recount in the background when the tables' data versions have
+moved, checked at most every ``AUTOCOMPLETE_REFRESH_INTERVAL`` seconds.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+from flask import Flask
+from sqlalchemy import select
+
+from models import db, PlacementDrive, StudentProfile, parse_json_list
+from services.change_feed import change_feed
+from services.skill_extractor import SkillTaxonomy, normalize_term, skill_extractor
+
+INDEX_TABLES = ('student_profiles', 'placement_drives')
+
+# Row key kind and skills column per table
+_SOURCES = {
+    'student_profiles': ('student', StudentProfile, StudentProfile.skills),
+    'placement_drives': ('drive', PlacementDrive, PlacementDrive.required_skills),
+}
+_SKILL_FIELDS = frozenset(['skills', 'required_skills'])
+
+_CACHE_SIZE = 4096
+
+
+def _search_keys(term: str) -> Iterable[Tuple[str, bool]]:
+    """(key, is the whole term) for a term and each of its word suffixes"""
+    yield term, True
+    for position, char in enumerate(term):
+        if char == ' ' and position + 1 < len(term):
+            yield term[position + 1:], False
+
+
+class SkillIndex:
+    """Sorted search keys and usage counts for one taxonomy"""
+
+    def __init__(self, taxonomy: SkillTaxonomy, versions: Dict[str, int], min_count: int = 2):
+        self.taxonomy = taxonomy
+        self.versions = versions
+        self.min_count = min_count
+        self.counts: Counter = Counter()
+        self.rows: Dict[Tuple[str, int], FrozenSet[str]] = {}
+        self._observed = set()
+        self._cache: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+
+        # keys[i] is a search key, entries[i] = (skill, matched term, whole term)
+        pairs = sorted(
+            (key, (skill, term, whole))
+            for term, skill in taxonomy.aliases.items()
+            for key, whole in _search_keys(term)
+        )
+        self.keys: List[str] = [key for key, _ in pairs]
+        self.entries: List[Tuple[str, str, bool]] = [entry for _, entry in pairs]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _add_observed(self, skill: str):
+        self._observed.add(skill)
+        for key, whole in _search_keys(skill):
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.entries.insert(position, (skill, skill, whole))
+
+    def set_row(self, row: Tuple[str, int], skills: Iterable[str]) -> bool:
+        """Replace the skills counted for a profile or drive; True if counts changed"""
+        new = frozenset(filter(None, (self.taxonomy.canonical(skill) for skill in skills)))
+        old = self.rows.get(row, frozenset())
+        if new == old:
+            return False
+        for skill in old - new:
+            self.counts[skill] -= 1
+            if self.counts[skill] <= 0:
+                del self.counts[skill]
+        for skill in new - old:
+            self.counts[skill] += 1
+            if skill not in self.taxonomy.categories and skill not in self._observed:
+                self._add_observed(skill)
+        if new:
+            self.rows[row] = new
+        else:
+            self.rows.pop(row, None)
+        self._cache.clear()
+        return True
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best skills whose name, synonym or a later word starts with ``prefix``"""
+        key = normalize_term(prefix)
+        if not key or limit <= 0:
+            return []
+        cached = self._cache.get((key, limit))
+        if cached is not None:
+            return cached
+
+        best: Dict[str, tuple] = {}
+        categories = self.taxonomy.categories
+        for position in range(bisect_left(self.keys, key), len(self.keys)):
+            if not self.keys[position].startswith(key):
+                break
+            skill, term, whole = self.entries[position]
+            count = self.counts.get(skill, 0)
+            if skill not in categories and count < self.min_count:
+                continue
+            # An exact name first, then popularity, matches at the start of a name, the canonical spelling
+            rank = (term == key, count, whole, term == skill, -len(term))
+            if skill not in best or rank > best[skill][0]:
+                best[skill] = (rank, term)
+
+        suggestions = [
+            {'skill': skill, 'category': categories.get(skill), 'count': rank[1],
+             'matched': term if term != skill else None}
+            for skill, (rank, term) in heapq.nlargest(limit, best.items(), key=lambda item: (item[1][0], item[0]))
+        ]
+        if len(self._cache) >= _CACHE_SIZE:
+            self._cache.clear()
+        self._cache[(key, limit)] = suggestions
+        return suggestions
+
+    def stats(self) -> Dict[str, Any]:
+        return {'keys': len(self.keys), 'skills': len(self.counts), 'observed': len(self._observed),
+                'rows': len(self.rows), 'versions': self.versions}
+
+
+class SkillAutocomplete:
+    def __init__(self):
+        self.app = None
+        self.refresh_interval = 300
+        self.min_count = 2
+        self._index = None
+        self._checked_at = 0.0
+        self._dirty = set()
+        self._replay = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._rebuilding = False
+
+    def init_app(self, app: Flask):
+        """Initialize skill autocomplete with Flask app.
+
+        The index is built on first use.
+        """
+        self.app = app
+        self.refresh_interval = app.config.get('AUTOCOMPLETE_REFRESH_INTERVAL', 300)
+        self.min_count = app.config.get('AUTOCOMPLETE_MIN_COUNT', 2)
+        self._index = None
+        self._checked_at = 0.0
+        self._dirty = set()
+        app.extensions['skill_autocomplete'] = self
+        change_feed.subscribe(list(INDEX_TABLES), self._on_change)
+
+    # --- Public API ---------------------------------------------------------
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Skills for an autocomplete box, most used first"""
+        index = self.index()
+        self._apply_changes(index)
+        with self._lock:
+            return index.suggest(prefix, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._index
+        return index.stats() if index is not None else {}
+
+    def index(self) -> SkillIndex:
+        """The current index, recounting it when other processes changed the data"""
+        index = self._index
+        taxonomy = skill_extractor.taxonomy
+        if index is None or index.taxonomy is not taxonomy:
+            with self._build_lock:
+                if self._index is None or self._index.taxonomy is not taxonomy:
+                    self._index = self.build()
+                    self._checked_at = time.monotonic()
+                return self._index
+
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_interval:
+            return index
+        self._checked_at = now
+        if index.versions != change_feed.versions(INDEX_TABLES):
+            # Serve the current index while a background recount runs
+            self._rebuild_async()
+        return index
+
+    def build(self) -> SkillIndex:
+        """Count skill usage over all profiles and drives"""
+        versions = change_feed.versions(INDEX_TABLES)
+        index = SkillIndex(skill_extractor.taxonomy, versions, self.min_count)
+        for table, (kind, model, column) in _SOURCES.items():
+            for row_id, raw in db.session.execute(select(model.id, column).where(column.isnot(None))):
+                index.set_row((kind, row_id), parse_json_list(raw))
+        return index
+
+    # --- Incremental updates ------------------------------------------------
+
+    def _on_change(self, events):
+        with self._lock:
+            for event in events:
+                kind = _SOURCES[event.table][0]
+                if event.pk is None:
+                    # Rows unknown: let the next query compare data versions
+                    self._checked_at = 0.0
+                elif event.op != 'update' or _SKILL_FIELDS.intersection(event.changed):
+                    self._dirty.add((kind, event.pk))
+
+    def _apply_changes(self, index: SkillIndex):
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            if self._replay is not None:
+                # A recount is running from an older snapshot; apply these to it as well
+                self._replay.update(dirty)
+
+        skills = {}
+        for table, (kind, model, column) in _SOURCES.items():
+            ids = [row_id for row_kind, row_id in dirty if row_kind == kind]
+            if ids:
+                stmt = select(model.id, column).where(model.id.in_(ids))
+                skills.update(((kind, row_id), parse_json_list(raw)) for row_id, raw in db.session.execute(stmt))
+        with self._lock:
+            for row in dirty:
+                index.set_row(row, skills.get(row, ()))
+
+    def _rebuild_async(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+            self._replay = set()
+
+        def rebuild():
+            try:
+                with self.app.app_context():
+                    index = self.build()
+                with self._lock:
+                    self._index = index
+                    self._dirty.update(self._replay)
+            except Exception as e:
+                print(f"Skill autocomplete rebuild failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._replay = None
+                self._rebuilding = False
+
+        threading.Thread(target=rebuild, name='skill-autocomplete', daemon=True).start()
+
+
+# Global skill autocomplete instance
+skill_autocomplete = SkillAutocomplete()
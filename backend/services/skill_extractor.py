@@ -0,0 +1,284 @@
+"""Dictionary-based skill extraction.
+
+Skills come from a taxonomy file (``SKILL_TAXONOMY_PATH``, by default
+``data/skill_taxonomy.json``) that maps each canonical skill to its
+synonyms, grouped by category::
+
+    {
+        "version": 1,
+        "case_sensitive": ["C"],
+        "categories": {
+            "frontend": {"react": ["reactjs", "react.js"], ...},
+            ...
+        }
+    }
+
+All names and synonyms are compiled into one Aho-Corasick automaton, so a
+resume is scanned once regardless of the taxonomy size. Matches must sit on
+word boundaries ("java" does not match inside "javascript") and overlapping
+matches resolve to the longest one ("c++" rather than "c"). Entries listed
+under ``case_sensitive`` only match with that exact casing; one-letter ones
+("C", "R") additionally need programming context - a heading such as
+"Languages:" shortly before, or a place in a list next to another skill -
+so "Grade C" is not read as a language.
+
+``canonical`` drops a trailing version ("Python 3.11", "Java 17") before
+looking a name up.
+"""
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from flask import Flask
+
+DEFAULT_TAXONOMY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'skill_taxonomy.json'
+)
+
+# Lowercase ASCII only, so offsets in the folded text match the original
+_ASCII_FOLD = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+_WHITESPACE = re.compile(r'\s+')
+# Trailing version of a skill name: "python 3.11", "java 17", "react v18", "python3.8"
+_VERSION_SUFFIX = re.compile(r'[\s-]*v?\d+(?:\.\d+)*(?:\.x|\+)?$')
+# Text before a one-letter language that marks a list of skills
+_SKILL_CONTEXT = re.compile(
+    r'(?:languages?|programming|coding|skills?|proficient in|knowledge of|experience (?:in|with))'
+    r'\b[^.;!?]{0,40}$', re.IGNORECASE)
+# Text between two entries of a skill list: "C, C++", "C/C++", "C and Java"
+_LIST_GAP = re.compile(r'^\s*(?:[,/&|+]|and|or)?\s*$', re.IGNORECASE)
+
+
+def normalize_term(text: str) -> str:
+    """Fold case and collapse whitespace the way the automaton sees text"""
+    return _WHITESPACE.sub(' ', text).strip().translate(_ASCII_FOLD)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    category: str
+    start: int
+    end: int
+    text: str
+
+
+class _Pattern(NamedTuple):
+    length: int
+    skill: str
+    category: str
+    literal: Optional[str]  # exact spelling for case-sensitive entries
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over character keys.
+
+    States are list indexes; ``_goto[state]`` maps a character to the next
+    state, ``_fail`` holds failure links and ``_output_link`` points to the
+    nearest suffix state that ends a pattern.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._patterns: List[List[_Pattern]] = [[]]
+        self._output_link: List[int] = [0]
+        self._built = False
+
+    def add(self, key: str, pattern: _Pattern):
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._patterns.append([])
+                self._output_link.append(0)
+            state = next_state
+        self._patterns[state].append(pattern)
+        self._built = False
+
+    def build(self):
+        """Compute failure and output links breadth-first"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+            self._output_link[state] = 0
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail = self._goto[fallback].get(char, 0)
+                self._fail[child] = fail
+                self._output_link[child] = fail if self._patterns[fail] else self._output_link[fail]
+        self._built = True
+
+    def iter_matches(self, text: str):
+        """Yield ``(end, pattern)`` for every occurrence in ``text``"""
+        if not self._built:
+            self.build()
+        goto, fail, patterns, output_link = self._goto, self._fail, self._patterns, self._output_link
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match_state = state if patterns[state] else output_link[state]
+            while match_state:
+                for pattern in patterns[match_state]:
+                    yield index + 1, pattern
+                match_state = output_link[match_state]
+
+    def __len__(self):
+        return len(self._goto)
+
+
+class SkillTaxonomy:
+    """Canonical skills, their categories and synonyms, compiled for matching"""
+
+    def __init__(self, categories: Dict[str, Dict[str, List[str]]],
+                 case_sensitive: Iterable[str] = (), version: int = 1):
+        self.version = version
+        self.categories: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        self._automaton = AhoCorasick()
+
+        exact = {normalize_term(term): _WHITESPACE.sub(' ', term.strip()) for term in case_sensitive}
+        self.case_sensitive = set(exact)
+        for category, skills in categories.items():
+            for skill, synonyms in skills.items():
+                canonical = normalize_term(skill)
+                self.categories[canonical] = category
+                for term in [skill, *synonyms]:
+                    self._add_term(term, canonical, category, exact)
+        self._automaton.build()
+
+    def _add_term(self, term: str, canonical: str, category: str, exact: Dict[str, str]):
+        key = normalize_term(term)
+        if not key:
+            return
+        self.aliases[key] = canonical
+        self._automaton.add(key, _Pattern(len(key), canonical, category, exact.get(key)))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SkillTaxonomy':
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        return cls(data.get('categories', {}), data.get('case_sensitive', []), data.get('version', 1))
+
+    def canonical(self, name: str) -> str:
+        """Canonical name for a skill or synonym; unknown skills are only normalized"""
+        key = normalize_term(name)
+        if key in self.aliases:
+            return self.aliases[key]
+        stem = _VERSION_SUFFIX.sub('', key)
+        if stem != key and stem in self.aliases:
+            return self.aliases[stem]
+        return key
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """All non-overlapping, word-bounded skill mentions in ``text``"""
+        original = _WHITESPACE.sub(' ', text or '')
+        folded = original.translate(_ASCII_FOLD)
+        length = len(folded)
+
+        candidates = []
+        for end, pattern in self._automaton.iter_matches(folded):
+            start = end - pattern.length
+            if start > 0 and _is_word_char(folded[start - 1]) and _is_word_char(folded[start]):
+                continue
+            if end < length and _is_word_char(folded[end]) and _is_word_char(folded[end - 1]):
+                continue
+            if pattern.literal is not None and original[start:end] != pattern.literal:
+                continue
+            candidates.append((start, -pattern.length, pattern))
+
+        # Leftmost-longest: "react native" wins over "react", "c++" over "c"
+        candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
+        matches = []
+        position = 0
+        for start, negative_length, pattern in candidates:
+            if start < position:
+                continue
+            end = start - negative_length
+            matches.append(SkillMatch(pattern.skill, pattern.category, start, end, original[start:end]))
+            position = end
+        return [match for index, match in enumerate(matches)
+                if len(match.text) > 1 or match.skill not in self.case_sensitive
+                or self._in_skill_context(original, matches, index)]
+
+    @staticmethod
+    def _in_skill_context(text: str, matches: List[SkillMatch], index: int) -> bool:
+        """Whether a one-letter match sits under a skills heading or in a list of skills"""
+        match = matches[index]
+        if _SKILL_CONTEXT.search(text[max(0, match.start - 60):match.start]):
+            return True
+        for neighbour in (index - 1, index + 1):
+            if not 0 <= neighbour < len(matches) or len(matches[neighbour].text) == 1:
+                continue
+            other = matches[neighbour]
+            gap = text[other.end:match.start] if neighbour < index else text[match.end:other.start]
+            if _LIST_GAP.match(gap):
+                return True
+        return False
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in ``text``, in order of first mention"""
+        return list(dict.fromkeys(match.skill for match in self.find(text)))
+
+
+class SkillExtractor:
+    def __init__(self):
+        self.app = None
+        self.taxonomy_path = DEFAULT_TAXONOMY_PATH
+        self._taxonomy = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask):
+        """Initialize the skill extractor with Flask app.
+
+        The taxonomy is compiled on first use.
+        """
+        self.app = app
+        self.taxonomy_path = app.config.get('SKILL_TAXONOMY_PATH') or DEFAULT_TAXONOMY_PATH
+        self._taxonomy = None
+        app.extensions['skill_extractor'] = self
+
+    @property
+    def taxonomy(self) -> SkillTaxonomy:
+        if self._taxonomy is None:
+            with self._lock:
+                if self._taxonomy is None:
+                    self._taxonomy = SkillTaxonomy.from_file(self.taxonomy_path)
+        return self._taxonomy
+
+    def reload(self):
+        """Recompile after the taxonomy file changed"""
+        with self._lock:
+            self._taxonomy = SkillTaxonomy.from_file(self.taxonomy_path)
+
+    def extract(self, text: str) -> List[str]:
+        return self.taxonomy.extract(text)
+
+    def find(self, text: str) -> List[SkillMatch]:
+        return self.taxonomy.find(text)
+
+    def canonical(self, name: str) -> str:
+        return self.taxonomy.canonical(name)
+
+    def canonical_set(self, names: Iterable[str]) -> set:
+        return {self.canonical(name) for name in names if name}
+
+
+# Global skill extractor instance
+skill_extractor = SkillExtractor()
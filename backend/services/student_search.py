@@ -0,0 +1,251 @@
+"""Multi-criteria student search for TPO shortlisting.
+
+A query such as "CSE and ECE, batch 2026, CGPA >= 7.5, knows Python and
+SQL, not yet placed" compiles to one SQL statement:
+
+* department, batch and CGPA conditions use ``idx_student_search``;
+* skills are looked up in ``student_skills`` (canonical names, indexed by
+  skill); students having all requested skills are found with a
+  ``GROUP BY student_id HAVING COUNT(*) = n`` over that index instead of
+  parsing every profile's JSON;
+* placement status is an ``EXISTS`` over the student's applications
+  (``idx_application_student_status``) with the same notion of a selection
+  as the placement model and recommendations.
+
+The total and per-department counts are one grouped count over the same
+conditions, and results are paged with ``LIMIT``/``OFFSET``.
+
+``student_skills`` follows ``StudentProfile.skills`` through the change
+feed; the first search in a process fills it when it is still empty.
+"""
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import Flask
+from sqlalchemy import delete, exists, func, insert, select
+
+from models import db, Department, StudentApplication, StudentProfile, StudentSkill, parse_json_list
+from read_models import student_projection
+from services.change_feed import change_feed
+from services.recommendation_service import application_outcome
+from services.skill_extractor import skill_extractor
+
+SORTS = {
+    'cgpa': (StudentProfile.cgpa.desc(), StudentProfile.id),
+    'name': (StudentProfile.first_name, StudentProfile.last_name, StudentProfile.id),
+    'batch': (StudentProfile.batch_year, StudentProfile.cgpa.desc(), StudentProfile.id),
+    'student_id': (StudentProfile.student_id,),
+}
+
+_TRUE = ('true', '1', 'yes')
+_FALSE = ('false', '0', 'no')
+_MAX_SKILL_LENGTH = 100
+
+
+def _list(args, name) -> List[str]:
+    value = args.get(name)
+    if value is None:
+        return []
+    values = value if isinstance(value, (list, tuple)) else str(value).split(',')
+    return [str(item).strip() for item in values if str(item).strip()]
+
+
+def _bool(value, name) -> Optional[bool]:
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in _TRUE:
+        return True
+    if str(value).lower() in _FALSE:
+        return False
+    raise ValueError(f"{name} must be true or false")
+
+
+def _float(value, name) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+
+
+def parse_filters(args) -> Dict[str, Any]:
+    """Filters from query parameters (comma-separated lists) or a JSON body"""
+    try:
+        batches = [int(value) for value in _list(args, 'batch')]
+    except ValueError:
+        raise ValueError("batch must be a list of years")
+    active = _bool(args.get('active'), 'active')
+    return {
+        'departments': _list(args, 'departments'),
+        'batches': batches,
+        'min_cgpa': _float(args.get('min_cgpa'), 'min_cgpa'),
+        'max_cgpa': _float(args.get('max_cgpa'), 'max_cgpa'),
+        'skills': _list(args, 'skills'),
+        'any_skills': _list(args, 'any_skills'),
+        'placed': _bool(args.get('placed'), 'placed'),
+        'active': True if active is None else active,
+    }
+
+
+class StudentSearch:
+    def __init__(self):
+        self.app = None
+        self._synced = False
+        self._stale = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask):
+        """Initialize student search with Flask app"""
+        self.app = app
+        self._synced = False
+        app.extensions['student_search'] = self
+        change_feed.subscribe('student_profiles', self._on_change)
+
+    # --- Queries --------------------------------------------------------------
+
+    def criteria(self, filters: Dict[str, Any]) -> list:
+        """SQL conditions on ``StudentProfile`` for parsed filters"""
+        conditions = []
+        if filters.get('active', True):
+            conditions.append(StudentProfile.is_active == True)
+
+        departments = filters.get('departments') or []
+        if departments:
+            ids = {int(value) for value in departments if str(value).isdigit()}
+            codes = [str(value).upper() for value in departments if not str(value).isdigit()]
+            if codes:
+                ids.update(db.session.execute(
+                    select(Department.id).where(func.upper(Department.code).in_(codes))).scalars())
+            conditions.append(StudentProfile.department_id.in_(sorted(ids)))
+
+        if filters.get('batches'):
+            conditions.append(StudentProfile.batch_year.in_(filters['batches']))
+        if filters.get('min_cgpa') is not None:
+            conditions.append(StudentProfile.cgpa >= filters['min_cgpa'])
+        if filters.get('max_cgpa') is not None:
+            conditions.append(StudentProfile.cgpa <= filters['max_cgpa'])
+
+        skills = sorted(skill_extractor.canonical_set(filters.get('skills') or []))
+        if skills:
+            has_all = (select(StudentSkill.student_id)
+                       .where(StudentSkill.skill.in_(skills))
+                       .group_by(StudentSkill.student_id)
+                       .having(func.count() == len(skills)))
+            conditions.append(StudentProfile.id.in_(has_all))
+        any_skills = sorted(skill_extractor.canonical_set(filters.get('any_skills') or []))
+        if any_skills:
+            conditions.append(StudentProfile.id.in_(
+                select(StudentSkill.student_id).where(StudentSkill.skill.in_(any_skills))))
+
+        if filters.get('placed') is not None:
+            selected, _ = application_outcome()
+            placed = exists().where(StudentApplication.student_id == StudentProfile.id, selected)
+            conditions.append(placed if filters['placed'] else ~placed)
+        return conditions
+
+    def search(self, filters: Dict[str, Any], page: int = 1, per_page: int = 50,
+               sort: str = 'cgpa', fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Counts and one page of matching students (``student_projection`` dicts)"""
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(SORTS)}")
+        self.ensure_synced()
+        conditions = self.criteria(filters)
+
+        by_department = db.session.execute(
+            select(StudentProfile.department_id, func.count())
+            .where(*conditions)
+            .group_by(StudentProfile.department_id)
+            .order_by(StudentProfile.department_id)
+        ).all()
+        total = sum(count for _, count in by_department)
+
+        students = []
+        if total > (page - 1) * per_page:
+            selected = student_projection.select_fields(fields)
+            stmt = (select(*student_projection.columns(selected))
+                    .where(*conditions)
+                    .order_by(*SORTS[sort])
+                    .limit(per_page)
+                    .offset((page - 1) * per_page))
+            convert = student_projection.row_converter(selected)
+            students = [convert(row) for row in db.session.execute(stmt)]
+
+        return {
+            'students': students,
+            'total': total,
+            'by_department': [{'department_id': department_id, 'count': count}
+                              for department_id, count in by_department],
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page
+        }
+
+    # --- Skill rows -----------------------------------------------------------
+
+    def sync(self, connection, student_ids: Iterable[int]):
+        """Rewrite the ``student_skills`` rows of these students from their profiles"""
+        student_ids = sorted(set(student_ids))
+        if not student_ids:
+            return
+        rows = connection.execute(select(StudentProfile.id, StudentProfile.skills)
+                                  .where(StudentProfile.id.in_(student_ids))).all()
+        skills = [
+            {'student_id': student_id, 'skill': skill[:_MAX_SKILL_LENGTH]}
+            for student_id, raw in rows
+            for skill in sorted({skill_extractor.canonical(name)[:_MAX_SKILL_LENGTH] for name in parse_json_list(raw)})
+            if skill
+        ]
+        connection.execute(delete(StudentSkill).where(StudentSkill.student_id.in_(student_ids)))
+        if skills:
+            connection.execute(insert(StudentSkill), skills)
+
+    def sync_all(self, batch_size: int = 1000) -> int:
+        """Rebuild ``student_skills`` for every profile; returns the number of profiles"""
+        last_id, synced = 0, 0
+        while True:
+            with db.engine.begin() as connection:
+                ids = connection.execute(select(StudentProfile.id).where(StudentProfile.id > last_id)
+                                         .order_by(StudentProfile.id).limit(batch_size)).scalars().all()
+                if not ids:
+                    break
+                self.sync(connection, ids)
+            last_id, synced = ids[-1], synced + len(ids)
+        with db.engine.begin() as connection:
+            connection.execute(delete(StudentSkill).where(StudentSkill.student_id.notin_(select(StudentProfile.id))))
+        return synced
+
+    def ensure_synced(self):
+        """Fill ``student_skills`` if it is empty while profiles have skills, or after untracked writes"""
+        if self._synced and not self._stale:
+            return
+        with self._lock:
+            if self._synced and not self._stale:
+                return
+            rebuild = self._stale
+            self._stale = False
+            if not rebuild and db.session.execute(select(StudentSkill.student_id).limit(1)).first() is None:
+                rebuild = db.session.execute(
+                    select(StudentProfile.id).where(StudentProfile.skills.isnot(None)).limit(1)).first() is not None
+            if rebuild:
+                # End the read transaction first; SQLite would block the writes below
+                db.session.rollback()
+                print(f"Student skill index built for {self.sync_all()} profiles")
+            self._synced = True
+
+    def _on_change(self, events):
+        student_ids = {event.pk for event in events if event.pk is not None and (
+            event.op != 'update' or 'skills' in event.changed)}
+        if any(event.pk is None for event in events):
+            # Core statements without primary keys: rebuild on the next search
+            self._stale = True
+        if student_ids:
+            # Own short transaction: this runs after the caller's commit
+            with db.engine.begin() as connection:
+                self.sync(connection, student_ids)
+
+
+# Global student search instance
+student_search = StudentSearch()
@@ -0,0 +1,246 @@
+"""Text extraction from uploaded documents.
+
+The functions here are module-level and depend only on the standard library
+and optionally imported parsers, so they can be shipped to worker processes
+(see ``services.resume_extraction``). They never raise: unreadable files
+produce an empty string.
+
+PDFs are read lazily: :func:`iter_pdf_pages` yields one page of text at a
+time and :func:`extract_text` stops pulling pages once a character or page
+budget is reached. Resume analysis only uses the first few thousand
+characters, so the remaining pages of a long CV or portfolio are never
+parsed.
+
+Word files are sniffed by content rather than trusted by extension. DOCX
+text is streamed out of ``word/document.xml`` with an incremental XML
+parser, so neither the archive nor the XML document is loaded into memory.
+Legacy binary ``.doc`` files are handled best-effort by collecting readable
+text runs; RTF saved as ``.doc`` has its control words stripped.
+"""
+import io
+import os
+import re
+import zipfile
+from itertools import islice
+from typing import Iterator, Optional
+from xml.etree import ElementTree
+
+from utils.lazy_imports import is_available, optional_import
+
+# Bump when extraction output changes so cached text is recomputed
+EXTRACTOR_VERSION = 3
+
+PDF_BACKENDS = ('pypdf2', 'pdfminer')
+
+_BACKEND_MODULES = {'pypdf2': 'PyPDF2', 'pdfminer': 'pdfminer'}
+
+
+def select_pdf_backend(preferred: Optional[str] = None) -> Optional[str]:
+    """Resolve a PDF backend name, or None if no parser is installed.
+
+    ``preferred`` is ``'pypdf2'``, ``'pdfminer'`` or ``'auto'``/None. Auto
+    picks PyPDF2 (faster) and falls back to pdfminer.
+    """
+    preferred = (preferred or 'auto').lower()
+    order = PDF_BACKENDS if preferred == 'auto' else (preferred,) + PDF_BACKENDS
+    for name in order:
+        if name in _BACKEND_MODULES and is_available(_BACKEND_MODULES[name]):
+            return name
+    return None
+
+
+def iter_pdf_pages(file_path: str, backend: Optional[str] = None) -> Iterator[str]:
+    """Yield the text of each page of a PDF, parsing pages on demand"""
+    name = select_pdf_backend(backend)
+    if name == 'pypdf2':
+        return _iter_pages_pypdf2(file_path)
+    if name == 'pdfminer':
+        return _iter_pages_pdfminer(file_path)
+    print("No PDF parser available (install PyPDF2 or pdfminer.six)")
+    return iter(())
+
+
+def _iter_pages_pypdf2(file_path: str) -> Iterator[str]:
+    PyPDF2 = optional_import('PyPDF2')
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""
+
+
+def _iter_pages_pdfminer(file_path: str) -> Iterator[str]:
+    optional_import('pdfminer')
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    with open(file_path, 'rb') as file, io.StringIO() as output:
+        resources = PDFResourceManager(caching=True)
+        device = TextConverter(resources, output, laparams=LAParams())
+        interpreter = PDFPageInterpreter(resources, device)
+        try:
+            for page in PDFPage.get_pages(file, caching=True):
+                interpreter.process_page(page)
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        finally:
+            device.close()
+
+
+def take_text(pages: Iterator[str], max_chars: Optional[int] = None,
+              max_pages: Optional[int] = None) -> str:
+    """Join page texts until the character or page budget is reached"""
+    if max_pages:
+        pages = islice(pages, max_pages)
+    parts = []
+    total = 0
+    for text in pages:
+        parts.append(text)
+        total += len(text) + 1
+        if max_chars and total >= max_chars:
+            break
+    text = "\n".join(parts)
+    return text[:max_chars] if max_chars else text
+
+
+def extract_text(file_path: str, max_chars: Optional[int] = None,
+                 max_pages: Optional[int] = None, pdf_backend: Optional[str] = None) -> str:
+    """Extract plain text from a PDF or text document within a budget"""
+    try:
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == '.pdf':
+            return extract_pdf_text(file_path, max_chars, max_pages, pdf_backend)
+        if extension in ('.doc', '.docx'):
+            return extract_word_text(file_path, max_chars)
+        if extension == '.txt':
+            return _read_text(file_path, max_chars)
+        return ""
+    except Exception as e:
+        print(f"Error extracting text from {file_path}: {str(e)}")
+        return ""
+
+
+def extract_pdf_text(file_path: str, max_chars: Optional[int] = None,
+                     max_pages: Optional[int] = None, backend: Optional[str] = None) -> str:
+    """Extract PDF text page by page, stopping at the budget"""
+    pages = iter_pdf_pages(file_path, backend)
+    try:
+        return take_text(pages, max_chars, max_pages)
+    finally:
+        # Close the file (and pdfminer device) of a partially consumed generator
+        close = getattr(pages, 'close', None)
+        if close is not None:
+            close()
+
+
+# --- Word documents -------------------------------------------------------
+
+_WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_TEXT = _WORD_NS + 't'
+_W_TAB = _WORD_NS + 'tab'
+_W_BREAKS = (_WORD_NS + 'br', _WORD_NS + 'cr')
+_W_PARAGRAPH = _WORD_NS + 'p'
+
+_ZIP_MAGIC = b'PK\x03\x04'
+_OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_RTF_MAGIC = b'{\\rtf'
+
+# Guards against zip bombs and oversized binaries
+_DOCX_MAX_XML_BYTES = 64 * 1024 * 1024
+_LEGACY_DOC_MAX_BYTES = 8 * 1024 * 1024
+_READ_CHUNK = 64 * 1024
+
+
+def extract_word_text(file_path: str, max_chars: Optional[int] = None) -> str:
+    """Extract text from a .docx/.doc file based on its actual format"""
+    with open(file_path, 'rb') as file:
+        head = file.read(8)
+
+    if head.startswith(_ZIP_MAGIC):
+        return take_text(iter_docx_paragraphs(file_path), max_chars)
+    if head.startswith(_OLE_MAGIC):
+        return extract_legacy_doc_text(file_path, max_chars)
+    if head.startswith(_RTF_MAGIC):
+        return _strip_rtf(_read_text(file_path, _LEGACY_DOC_MAX_BYTES))[:max_chars or None]
+
+    # Some ".doc" uploads are really plain text; anything binary is rejected
+    text = _read_text(file_path, max_chars)
+    return "" if '\x00' in text else text
+
+
+def iter_docx_paragraphs(file_path: str) -> Iterator[str]:
+    """Yield the text of each paragraph of a DOCX, streaming the XML"""
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as xml_stream:
+        parser = ElementTree.XMLPullParser(events=('end',))
+        parts = []
+        consumed = 0
+        for chunk in iter(lambda: xml_stream.read(_READ_CHUNK), b''):
+            consumed += len(chunk)
+            if consumed > _DOCX_MAX_XML_BYTES:
+                break
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                tag = element.tag
+                if tag == _W_TEXT:
+                    parts.append(element.text or "")
+                elif tag == _W_TAB:
+                    parts.append("\t")
+                elif tag in _W_BREAKS:
+                    parts.append("\n")
+                elif tag == _W_PARAGRAPH:
+                    yield "".join(parts)
+                    parts = []
+                    # Drop the finished paragraph's subtree
+                    element.clear()
+        if parts:
+            yield "".join(parts)
+
+
+_UTF16_RUN = re.compile(rb'(?:[\x20-\x7e\t\r\n]\x00){4,}')
+_ANSI_RUN = re.compile(rb'[\x20-\x7e\t\r\n]{6,}')
+_WORDS = re.compile(r'[A-Za-z]{2,}')
+
+
+def extract_legacy_doc_text(file_path: str, max_chars: Optional[int] = None) -> str:
+    """Best-effort text from a binary Word 97-2003 file.
+
+    Collects readable 8-bit and UTF-16 runs in file order and keeps the ones
+    that look like prose (at least two words), which drops most of the
+    binary structure, style and font tables.
+    """
+    with open(file_path, 'rb') as file:
+        data = file.read(_LEGACY_DOC_MAX_BYTES)
+
+    runs = [(m.start(), m.group().decode('utf-16-le')) for m in _UTF16_RUN.finditer(data)]
+    runs += [(m.start(), m.group().decode('cp1252')) for m in _ANSI_RUN.finditer(data)]
+    runs.sort()
+
+    lines = (run.strip() for _, run in runs)
+    return take_text((line for line in lines if len(_WORDS.findall(line)) >= 2), max_chars)
+
+
+_RTF_GROUPS = re.compile(r'\{\\\*[^{}]*\}|\{\\(?:fonttbl|colortbl|stylesheet|info)[^{}]*(?:\{[^{}]*\}[^{}]*)*\}')
+_RTF_HEX = re.compile(r"\\'([0-9a-fA-F]{2})")
+_RTF_CONTROL = re.compile(r'\\(par|line)\b ?|\\[a-zA-Z]+-?\d* ?|\\[{}\\]|[{}]')
+
+
+def _strip_rtf(text: str) -> str:
+    """Reduce RTF markup to its visible text"""
+    text = _RTF_GROUPS.sub('', text)
+    text = _RTF_HEX.sub(lambda m: bytes([int(m.group(1), 16)]).decode('cp1252', errors='ignore'), text)
+
+    def control(match):
+        if match.group(1):
+            return "\n"
+        token = match.group()
+        return token[1] if len(token) == 2 and token[1] in '{}\\' else ""
+
+    text = _RTF_CONTROL.sub(control, text)
+    return re.sub(r'\n{3,}', "\n\n", text).strip()
+
+
+def _read_text(file_path: str, max_chars: Optional[int] = None) -> str:
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+        return file.read(max_chars) if max_chars else file.read()
@@ -0,0 +1,169 @@
+"""HTTP conditional GET and response compression.
+
+``@conditional(tables=[...])`` derives a weak ETag from the change-feed
+versions of the tables a response is built from. A request whose
+``If-None-Match`` still matches gets a 304 before the view runs, so the
+refresh costs one primary-key lookup on ``data_versions`` instead of the
+queries and serialization behind the response.
+
+``@coalesce(tables=[...])`` lets concurrent identical requests (same path,
+query and data versions) share one execution of a public view.
+
+``init_compression(app)`` gzip-compresses (or brotli, when installed and
+accepted) JSON and text responses above ``COMPRESS_MIN_SIZE`` bytes. ETags
+are weak, so they stay valid across encodings.
+"""
+import gzip
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import SQLAlchemyError
+
+from services.singleflight import SingleFlight
+from utils.lazy_imports import optional_import
+
+COMPRESSIBLE_MIMETYPES = frozenset([
+    'application/json', 'application/x-ndjson', 'text/html', 'text/plain',
+    'text/csv', 'text/css', 'application/javascript',
+])
+
+
+_response_flight = SingleFlight('http')
+
+
+def compute_etag(tables, per_user=False):
+    """Weak validator for the current request and data versions.
+
+    Memoized on ``g`` so stacked decorators read the versions once.
+    """
+    from services.change_feed import change_feed
+
+    memo = g.setdefault('_etags', {})
+    memo_key = (tuple(sorted(tables)), per_user)
+    if memo_key in memo:
+        return memo[memo_key]
+
+    versions = change_feed.versions(tables)
+    parts = [request.path, request.query_string.decode('latin-1'),
+             # Date-windowed figures ("today", "last 7 days") roll over daily
+             datetime.utcnow().date().isoformat()]
+    parts.extend(f'{table}:{version}' for table, version in versions.items())
+    if per_user:
+        parts.append(f'user:{get_jwt_identity()}')
+    etag = memo[memo_key] = hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return etag
+
+
+def conditional(tables, per_user=False):
+    """Answer ``If-None-Match`` from table versions without running the view.
+
+    Use below ``@jwt_required()`` for authenticated endpoints; with
+    ``per_user=True`` the caller's identity is part of the ETag and the
+    response is marked private.
+    """
+    tables = tuple(tables)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                etag = compute_etag(tables, per_user)
+            except SQLAlchemyError as e:
+                print(f"Error computing ETag: {str(e)}")
+                return view(*args, **kwargs)
+
+            cache_control = 'private, no-cache' if per_user else 'public, no-cache'
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = cache_control
+            if per_user:
+                response.vary.add('Authorization')
+            return response
+        return wrapper
+    return decorator
+
+
+def coalesce(tables):
+    """Share one execution of the view among concurrent identical requests.
+
+    Requests with the same path, query string and table versions wait for
+    the in-flight leader and get a copy of its response. Only for views
+    whose output does not depend on the caller; place it below
+    ``@conditional`` so both use the same version lookup. Waiters give up
+    after ``COALESCE_WAIT_TIMEOUT`` seconds and run the view themselves.
+    """
+    tables = tuple(tables)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                key = compute_etag(tables)
+            except SQLAlchemyError as e:
+                print(f"Error computing coalescing key: {str(e)}")
+                return view(*args, **kwargs)
+
+            def run():
+                response = make_response(view(*args, **kwargs))
+                return response.status_code, response.get_data(), list(response.headers.items())
+
+            # Waiters stuck behind a slow leader render the view themselves
+            status, body, headers = _response_flight.do(
+                key, run, timeout=current_app.config.get('COALESCE_WAIT_TIMEOUT', 10))
+            return current_app.response_class(body, status=status, headers=headers)
+        return wrapper
+    return decorator
+
+
+def _choose_encoding(use_brotli):
+    accepted = request.accept_encodings
+    if use_brotli and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def init_compression(app):
+    """Compress eligible responses in an ``after_request`` hook"""
+    if not app.config.get('COMPRESS_RESPONSES', True):
+        return
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or response.is_streamed or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        brotli = optional_import('brotli')
+        encoding = _choose_encoding(brotli is not None)
+        if encoding is None:
+            return response
+
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,83 @@
+"""orjson-backed JSON provider for Flask.
+
+orjson serializes datetime/date natively in C and is several times faster
+than the stdlib encoder Flask uses by default. Decimal values (Numeric
+columns) are converted to float. When orjson is not installed (or
+``JSON_USE_ORJSON`` is off) the same provider encodes with the stdlib, so
+dates are ISO-8601 either way rather than Flask's HTTP-date strings.
+"""
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+from flask.json.provider import JSONProvider
+from utils.lazy_imports import optional_import
+
+orjson = optional_import('orjson')
+
+
+def _default(value):
+    """Fallback for types orjson does not handle natively (and the stdlib path)"""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    # Types below are native to orjson; the stdlib encoder needs them spelled out
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def loads(data):
+    """Parse JSON text with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _stdlib_dumps_bytes(obj):
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def dumps_bytes(obj):
+    """Serialize to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return _stdlib_dumps_bytes(obj)
+
+
+class BytesJSONProvider(JSONProvider):
+    """Flask JSON provider that encodes responses with ``dumps_bytes``"""
+
+    mimetype = 'application/json'
+
+    def __init__(self, app, use_orjson=True):
+        super().__init__(app)
+        self._dumps_bytes = dumps_bytes if use_orjson else _stdlib_dumps_bytes
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return json.dumps(obj, default=_default, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the JSON provider (orjson when available and enabled)"""
+    app.json = BytesJSONProvider(app, use_orjson=app.config.get('JSON_USE_ORJSON', True))
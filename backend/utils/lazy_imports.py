@@ -0,0 +1,39 @@
+"""Deferred loading of optional, heavy third-party dependencies.
+
+Modules such as openai, PyPDF2, pdfminer, reportlab and xlsxwriter are only
+needed by a handful of endpoints. Importing them at module level adds
+noticeably to worker boot time and resident memory, so services resolve
+them through ``optional_import`` the first time they are actually used.
+"""
+import importlib
+import importlib.util
+import threading
+
+_modules = {}
+_lock = threading.Lock()
+
+
+def is_available(module_name):
+    """Check whether a module can be imported, without importing it"""
+    if module_name in _modules:
+        return _modules[module_name] is not None
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def optional_import(module_name):
+    """Import a module on first use. Returns None if it is not installed."""
+    try:
+        return _modules[module_name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if module_name not in _modules:
+            try:
+                _modules[module_name] = importlib.import_module(module_name)
+            except ImportError:
+                _modules[module_name] = None
+        return _modules[module_name]
@@ -0,0 +1,33 @@
+"""Add columns introduced after a table was first created.
+
+``db.create_all()`` creates missing tables but never alters existing ones,
+so a column added to a model breaks every query on that table in older
+databases ("Unknown column ..."). Columns listed in ``ADDED_COLUMNS`` are
+added at startup when they are missing; the same statements are in
+``database/migrations`` for deployments that prefer to run them by hand.
+"""
+from sqlalchemy import inspect, text
+
+# (table, column, DDL type) in the order they were introduced
+ADDED_COLUMNS = [
+    ('student_applications', 'score_version', 'VARCHAR(40) NULL'),
+    # In schema.sql from the start, but missing from databases built by create_all()
+    ('round_results', 'round_id', 'INTEGER NULL'),
+]
+
+
+def upgrade_schema(engine):
+    """Add missing ``ADDED_COLUMNS``; returns the ``table.column`` names added"""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as connection:
+        for table, column, ddl in ADDED_COLUMNS:
+            if table not in tables:
+                # create_all() builds the table with the column
+                continue
+            if column in {existing['name'] for existing in inspector.get_columns(table)}:
+                continue
+            connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+            added.append(f'{table}.{column}')
+    return added
@@ -0,0 +1,102 @@
+"""Streamed AI responses.
+
+Insight and report endpoints can forward a completion while it is being
+generated instead of holding the request until the whole text exists. A
+client opts in with ``?stream=sse`` / ``?stream=ndjson`` or an ``Accept:
+text/event-stream`` / ``application/x-ndjson`` header; everyone else keeps
+getting the plain JSON body.
+
+A stream carries, in order:
+
+* ``start`` — sent straight away, so the first byte does not wait for the
+  model;
+* ``delta`` — ``{"text": ...}`` for each piece of the completion;
+* ``result`` — the JSON body the non-streaming endpoint would have
+  returned, assembled from the full text once it is complete;
+* ``error`` — instead of ``result`` when the completion fails.
+
+SSE sends the type as the ``event:`` name and the payload as ``data:``;
+NDJSON writes one ``{"type": ..., ...}`` object per line.
+"""
+import json
+import re
+from typing import Any, Callable, Iterable, Optional
+
+from flask import Response, request, stream_with_context
+
+from services.llm_gateway import LLMUnavailable
+
+STREAM_MIMETYPES = {
+    'sse': 'text/event-stream',
+    'ndjson': 'application/x-ndjson',
+}
+
+_CODE_FENCE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
+
+def stream_format() -> Optional[str]:
+    """``'sse'`` or ``'ndjson'`` when the client asked for a stream, else None"""
+    requested = request.args.get('stream', '').lower()
+    if requested in STREAM_MIMETYPES:
+        return requested
+    if requested in ('1', 'true'):
+        return 'sse'
+    accepted = set(request.accept_mimetypes.values())
+    for name, mimetype in STREAM_MIMETYPES.items():
+        if mimetype in accepted:
+            return name
+    return None
+
+
+def parse_json(text: str) -> Optional[Any]:
+    """JSON value of a completion (optionally wrapped in a code fence), or None"""
+    try:
+        return json.loads(_CODE_FENCE.sub('', text))
+    except (TypeError, ValueError):
+        return None
+
+
+def _event(fmt: str, kind: str, payload: dict) -> str:
+    if fmt == 'sse':
+        return f'event: {kind}\ndata: {json.dumps(payload)}\n\n'
+    return json.dumps(dict(payload, type=kind)) + '\n'
+
+
+def stream_response(fmt: str, pieces: Iterable[str], assemble: Callable[[str], Any],
+                    fallback: Optional[Callable[[], Any]] = None) -> Response:
+    """Stream ``pieces`` of a completion and finish with ``assemble(full_text)``.
+
+    If the completion fails and ``fallback`` is given, its body is sent as
+    the result (as the non-streaming endpoint would); otherwise an
+    ``error`` event with the status the plain endpoint would have used.
+    """
+    def generate():
+        yield _event(fmt, 'start', {})
+        parts = []
+        try:
+            for piece in pieces:
+                parts.append(piece)
+                yield _event(fmt, 'delta', {'text': piece})
+            body = assemble(''.join(parts))
+        except Exception as e:
+            if fallback is not None:
+                body = fallback()
+            else:
+                status = e.status_code if isinstance(e, LLMUnavailable) else 500
+                error = {'error': str(e), 'status': status}
+                if isinstance(e, LLMUnavailable):
+                    error['retry_after'] = e.retry_after
+                yield _event(fmt, 'error', error)
+                return
+        yield _event(fmt, 'result', body)
+
+    response = Response(stream_with_context(generate()), mimetype=STREAM_MIMETYPES[fmt])
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies (nginx) from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def static_stream(fmt: str, body: Any) -> Response:
+    """A stream holding just ``body``, for requests answered without the model"""
+    return stream_response(fmt, (), lambda _text: body)
@@ -0,0 +1,33 @@
+"""Per-endpoint request size limits.
+
+``MAX_CONTENT_LENGTH`` caps every request body. Views that legitimately
+accept larger uploads (a batch ZIP of resumes) opt in with
+``@max_upload_size('CONFIG_KEY')``; the request class then applies that
+config value instead of the global limit::
+
+    @bp.route('/resume-imports', methods=['POST'])
+    @max_upload_size('RESUME_IMPORT_MAX_SIZE')
+    @jwt_required()
+    def import_resumes():
+        ...
+"""
+from flask import Request, current_app
+
+
+def max_upload_size(config_key: str):
+    """Use ``app.config[config_key]`` as the body size limit for this view"""
+    def decorator(view):
+        view.max_upload_size_key = config_key
+        return view
+    return decorator
+
+
+class UploadLimitRequest(Request):
+    @property
+    def max_content_length(self):
+        if current_app and self.url_rule is not None:
+            view = current_app.view_functions.get(self.endpoint)
+            config_key = getattr(view, 'max_upload_size_key', None)
+            if config_key:
+                return current_app.config.get(config_key)
+        return super().max_content_length
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Tests for round result uploads and application status transitions.
+
+Run with ``python workflow_test.py`` (or pytest) from the backend directory.
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, select
+
+from app import create_app
+from models import (db, ApplicationStatusHistory, Company, Department, PlacementDrive, RecruitmentRound,
+                    RoundResult, StudentApplication, StudentProfile, User)
+from services.application_status import application_status
+from services.round_results import RoundResultError, round_result_importer
+
+# Roll number -> application status at the start of each test
+STUDENTS = {'S001': 'applied', 'S002': 'under_review', 'S003': 'shortlisted', 'S004': 'rejected'}
+
+
+class WorkflowTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{self.tmp}/test.db',
+            'TESTING': True,
+            'UPLOAD_FOLDER': os.path.join(self.tmp, 'uploads'),
+            'SCORING_INCREMENTAL': False,
+            # Search is not under test; keep the background indexer off the temporary database
+            'SEARCH_INDEX_DELAY': 3600
+        })
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+
+        department = Department(name='Computer Science', code='CSE')
+        company = Company(name='Acme')
+        db.session.add_all([department, company])
+        db.session.flush()
+        drive = PlacementDrive(company_id=company.id, title='SDE Drive', job_role='SDE', status='active')
+        db.session.add(drive)
+        db.session.flush()
+        self.drive_id = drive.id
+
+        self.applications = {}
+        for roll, status in STUDENTS.items():
+            user = User(email=f'{roll.lower()}@example.com', role='student')
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.flush()
+            student = StudentProfile(user_id=user.id, student_id=roll, first_name='Student', last_name=roll,
+                                     department_id=department.id, batch_year=2026, cgpa=8)
+            db.session.add(student)
+            db.session.flush()
+            application = StudentApplication(student_id=student.id, drive_id=drive.id, application_status=status)
+            db.session.add(application)
+            db.session.flush()
+            self.applications[roll] = application.id
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def add_round(self, passing_score=50, order=1):
+        round_ = RecruitmentRound(drive_id=self.drive_id, round_name=f'Round {order}', round_type='online_test',
+                                  max_score=100, passing_score=passing_score, order=order)
+        db.session.add(round_)
+        db.session.commit()
+        return round_.id
+
+    def upload(self, round_id, sheet, **options):
+        options.setdefault('notify', False)
+        return round_result_importer.import_results(round_id, io.BytesIO(sheet.encode()), 'results.csv', **options)
+
+    def status(self, roll):
+        return db.session.execute(select(StudentApplication.application_status).where(
+            StudentApplication.id == self.applications[roll])).scalar()
+
+    def count(self, model):
+        return db.session.execute(select(func.count()).select_from(model)).scalar()
+
+
+class RoundResultImportTest(WorkflowTestCase):
+    def test_missing_passing_score_needs_a_result(self):
+        round_id = self.add_round(passing_score=None)
+        summary = self.upload(round_id, 'student_id,score,result\nS001,70,\nS002,30,fail\n')
+
+        self.assertFalse(summary['applied'])
+        self.assertEqual(summary['error_count'], 1)
+        self.assertIn('result required', summary['errors'][0]['error'])
+        self.assertEqual(self.count(RoundResult), 0)
+
+    def test_missing_passing_score_without_result_column(self):
+        round_id = self.add_round(passing_score=None)
+        with self.assertRaises(RoundResultError):
+            self.upload(round_id, 'student_id,score\nS001,70\n')
+
+    def test_non_finite_scores_are_row_errors(self):
+        round_id = self.add_round()
+        summary = self.upload(round_id, 'student_id,score\nS001,NaN\nS002,inf\nS003,abc\n')
+
+        self.assertFalse(summary['applied'])
+        self.assertEqual(summary['error_count'], 3)
+        self.assertEqual(summary['valid'], 0)
+
+    def test_dry_run_writes_nothing(self):
+        round_id = self.add_round()
+        summary = self.upload(round_id, 'student_id,score\nS001,70\nS002,30\n', dry_run=True)
+
+        self.assertFalse(summary['applied'])
+        self.assertEqual((summary['passed'], summary['failed']), (1, 1))
+        self.assertEqual(self.count(RoundResult), 0)
+        self.assertEqual(self.status('S001'), 'applied')
+
+    def test_errors_reject_the_sheet_unless_partial(self):
+        round_id = self.add_round()
+        sheet = 'student_id,score\nS001,70\nS002,30\nNOBODY,50\n'
+
+        summary = self.upload(round_id, sheet)
+        self.assertFalse(summary['applied'])
+        self.assertEqual(self.count(RoundResult), 0)
+
+        summary = self.upload(round_id, sheet, partial=True)
+        self.assertTrue(summary['applied'])
+        self.assertEqual(summary['error_count'], 1)
+        self.assertEqual(self.count(RoundResult), 2)
+        # Single round: passing means selected
+        self.assertEqual(self.status('S001'), 'selected')
+        self.assertEqual(self.status('S002'), 'rejected')
+
+    def test_passing_candidates_are_shortlisted_for_the_next_round(self):
+        round_id = self.add_round(order=1)
+        self.add_round(order=2)
+        summary = self.upload(round_id, 'student_id,score\nS001,70\nS004,90\n')
+
+        self.assertEqual(summary['shortlisted'], 1)
+        self.assertEqual(self.status('S001'), 'shortlisted')
+        # Already decided applications are left alone
+        self.assertEqual(self.status('S004'), 'rejected')
+
+    def test_reupload_needs_replace_and_corrects_statuses(self):
+        round_id = self.add_round()
+        self.upload(round_id, 'student_id,score\nS001,30\n')
+        self.assertEqual(self.status('S001'), 'rejected')
+
+        with self.assertRaises(RoundResultError):
+            self.upload(round_id, 'student_id,score\nS001,80\n')
+
+        summary = self.upload(round_id, 'student_id,score\nS001,80\n', replace=True)
+        self.assertEqual(summary['corrected'], 1)
+        self.assertEqual(self.status('S001'), 'selected')
+        self.assertEqual(self.count(RoundResult), 1)
+
+
+class ApplicationStatusTransitionTest(WorkflowTestCase):
+    def test_unknown_status_is_rejected(self):
+        with self.assertRaises(ValueError):
+            application_status.transition('hired', [self.applications['S001']])
+        with self.assertRaises(ValueError):
+            application_status.transition('shortlisted')
+
+    def test_disallowed_transition_is_skipped(self):
+        result = application_status.transition('shortlisted', [self.applications['S004']])
+        db.session.commit()
+
+        self.assertEqual((result['updated'], result['skipped']), (0, 1))
+        self.assertEqual(self.status('S004'), 'rejected')
+        self.assertEqual(self.count(ApplicationStatusHistory), 0)
+
+    def test_mixed_ids_move_only_allowed_applications(self):
+        ids = list(self.applications.values()) + [999999]
+        result = application_status.transition('shortlisted', ids, changed_by=1)
+        db.session.commit()
+
+        # applied and under_review move; shortlisted (no-op), rejected and the unknown id are skipped
+        self.assertEqual(result['updated'], 2)
+        self.assertEqual(result['skipped'], 3)
+        self.assertEqual(result['from'], {'applied': 1, 'under_review': 1})
+        self.assertEqual([self.status(roll) for roll in STUDENTS],
+                         ['shortlisted', 'shortlisted', 'shortlisted', 'rejected'])
+
+        history = db.session.execute(select(ApplicationStatusHistory.application_id, ApplicationStatusHistory.from_status,
+                                            ApplicationStatusHistory.to_status)
+                                     .order_by(ApplicationStatusHistory.application_id)).all()
+        self.assertEqual(history, [(self.applications['S001'], 'applied', 'shortlisted'),
+                                   (self.applications['S002'], 'under_review', 'shortlisted')])
+
+
+if __name__ == '__main__':
+    unittest.main()
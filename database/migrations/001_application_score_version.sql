@@ -0,0 +1,4 @@
+-- Scorer that produced student_applications.ai_score (local-N / llm-N:model).
+-- The backend adds this column at startup when SCHEMA_AUTO_UPGRADE is on (the
+-- default); run this by hand if the database user may not ALTER tables.
+ALTER TABLE student_applications ADD COLUMN score_version VARCHAR(40) NULL;
@@ -0,0 +1,5 @@
+-- Round a result belongs to. Part of schema.sql from the start; only databases
+-- created by the backend's create_all() lack it. Added at startup when
+-- SCHEMA_AUTO_UPGRADE is on (the default).
+ALTER TABLE round_results ADD COLUMN round_id INT NULL;
+CREATE INDEX ix_round_results_round_id ON round_results (round_id);
@@ -46,7 +46,8 @@ CREATE TABLE student_profiles (
     FOREIGN KEY (department_id) REFERENCES departments(id),
     INDEX idx_student_id (student_id),
     INDEX idx_department (department_id),
-    INDEX idx_batch (batch_year)
+    INDEX idx_batch (batch_year),
+    INDEX idx_student_search (department_id, batch_year, cgpa)
 );
 
 -- Departments
@@ -152,18 +153,20 @@ CREATE TABLE student_applications (
     id INT AUTO_INCREMENT PRIMARY KEY,
     student_id INT NOT NULL,
     drive_id INT NOT NULL,
-    application_status ENUM('applied', 'under_review', 'shortlisted', 'rejected', 'selected', 'offer_sent', 'offer_accepted') DEFAULT 'applied',
+    application_status ENUM('applied', 'under_review', 'shortlisted', 'interview_scheduled', 'interview_completed', 'rejected', 'selected', 'offer_sent', 'offer_accepted') DEFAULT 'applied',
     applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     notes TEXT,
     ai_score DECIMAL(5,2), -- AI-generated match score
+    score_version VARCHAR(40), -- scorer that produced ai_score (local-N / llm-N:model)
     resume_extracted_data TEXT, -- JSON data from AI resume parsing
     FOREIGN KEY (student_id) REFERENCES student_profiles(id),
     FOREIGN KEY (drive_id) REFERENCES placement_drives(id),
     UNIQUE KEY unique_application (student_id, drive_id),
     INDEX idx_student (student_id),
     INDEX idx_drive (drive_id),
-    INDEX idx_status (application_status)
+    INDEX idx_status (application_status),
+    INDEX idx_application_student_status (student_id, application_status)
 );
 
 -- Round results
@@ -241,6 +244,91 @@ CREATE TABLE email_logs (
     INDEX idx_sent_at (sent_at)
 );
 
+-- Per-table change counters (cache validators)
+CREATE TABLE data_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Daily AI token usage per endpoint, user and model
+CREATE TABLE ai_usage (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    day DATE NOT NULL,
+    endpoint VARCHAR(100) NOT NULL,
+    user_id INT NOT NULL DEFAULT 0,
+    model VARCHAR(50) NOT NULL,
+    calls INT NOT NULL DEFAULT 0,
+    cache_hits INT NOT NULL DEFAULT 0,
+    errors INT NOT NULL DEFAULT 0,
+    throttled INT NOT NULL DEFAULT 0,
+    prompt_tokens BIGINT NOT NULL DEFAULT 0,
+    completion_tokens BIGINT NOT NULL DEFAULT 0,
+    latency_ms BIGINT NOT NULL DEFAULT 0,
+    max_latency_ms INT NOT NULL DEFAULT 0,
+    UNIQUE KEY uq_ai_usage_bucket (day, endpoint, user_id, model),
+    INDEX idx_ai_usage_user_day (user_id, day)
+);
+
+-- Canonical skills per student, mirrored from student_profiles.skills for indexed filtering
+CREATE TABLE student_skills (
+    student_id INT NOT NULL,
+    skill VARCHAR(100) NOT NULL,
+    PRIMARY KEY (student_id, skill),
+    FOREIGN KEY (student_id) REFERENCES student_profiles(id) ON DELETE CASCADE,
+    INDEX idx_student_skills_skill (skill, student_id)
+);
+
+-- Searchable text of drives, companies and student profiles
+CREATE TABLE search_documents (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,
+    ref_id INT NOT NULL,
+    title VARCHAR(300) NOT NULL,
+    body MEDIUMTEXT,
+    status VARCHAR(20),
+    department_id INT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_search_document (kind, ref_id),
+    FULLTEXT KEY ft_search_documents (title, body)
+);
+
+-- Bulk resume import jobs; any backend worker reports their progress
+CREATE TABLE resume_import_jobs (
+    job_id VARCHAR(32) PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    archive_name VARCHAR(255),
+    created_by INT NOT NULL,
+    department_id INT,
+    total INT NOT NULL DEFAULT 0,
+    processed INT NOT NULL DEFAULT 0,
+    matched INT NOT NULL DEFAULT 0,
+    updated INT NOT NULL DEFAULT 0,
+    failed INT NOT NULL DEFAULT 0,
+    report MEDIUMTEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    finished_at TIMESTAMP NULL,
+    FOREIGN KEY (created_by) REFERENCES users(id),
+    FOREIGN KEY (department_id) REFERENCES departments(id),
+    INDEX idx_resume_import_jobs_created_by (created_by),
+    INDEX idx_resume_import_jobs_created_at (created_at)
+);
+
+-- Application status changes, appended on every transition
+CREATE TABLE application_status_history (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    application_id INT NOT NULL,
+    from_status VARCHAR(20),
+    to_status VARCHAR(20) NOT NULL,
+    changed_by INT,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (application_id) REFERENCES student_applications(id) ON DELETE CASCADE,
+    FOREIGN KEY (changed_by) REFERENCES users(id),
+    INDEX idx_status_history_application (application_id, changed_at),
+    INDEX idx_status_history_status (to_status, changed_at)
+);
+
 -- System settings
 CREATE TABLE system_settings (
     id INT AUTO_INCREMENT PRIMARY KEY,